@@ -0,0 +1 @@
+# Pomiary wydajności środowiska - uruchomienie: python -m benchmarks (opis parametrów: python -m benchmarks --help)
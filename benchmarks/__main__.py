@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import tempfile
+from gym_bridge_auction.envs.deal_pool import build_deal_pool
+from benchmarks import common, env, scaling, solver
+
+"""Uruchomienie pomiarów, zapis wyników do pliku JSON i porównanie z wynikami odniesienia.
+
+Przykład:
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --output current.json --baseline baseline.json
+
+Kod wyjścia 1 oznacza, że co najmniej jeden pomiar pogorszył się o więcej niż --tolerance względem wyników
+odniesienia."""
+
+GROUPS = ['env', 'scaling', 'solver']
+
+
+def _print_results(results, baseline):
+    """Wyświetlenie wyników (oraz zmian względem wyników odniesienia)"""
+
+    changes = {} if baseline is None else {name: change for name, _, _, change in common.compare(results, baseline,
+                                                                                                  0)[0]}
+
+    for name in sorted(results):
+        line = '{:<40} {:>16.2f} {:<4}'.format(name, results[name]['value'], results[name]['unit'])
+
+        if name in changes:
+            line += ' {:>+8.1%}'.format(changes[name])
+
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='gym-bridge-auction benchmarks')
+    parser.add_argument('--groups', nargs='+', choices=GROUPS, default=GROUPS, help='benchmark groups to run')
+    parser.add_argument('--deal-pool', help='deal pool file (default - a temporary pool built with the solver)')
+    parser.add_argument('--pool-size', type=int, default=200, help='size of the temporary deal pool')
+    parser.add_argument('--no-solver', action='store_true', help='skip benchmarks calling the solver')
+    parser.add_argument('--scale', type=float, default=1.0, help='repetition/duration multiplier (e.g. 0.1)')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4], help='thread counts for scaling')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4], help='process counts for scaling')
+    parser.add_argument('--solver-deals', type=int, default=20, help='deals per solver setting')
+    parser.add_argument('--output', help='write results to a JSON file')
+    parser.add_argument('--baseline', help='compare with results from a JSON file')
+    parser.add_argument('--tolerance', type=float, default=common.DEFAULT_TOLERANCE,
+                        help='allowed relative regression (default 0.1)')
+    arguments = parser.parse_args()
+
+    groups = [group for group in arguments.groups if not (arguments.no_solver and group == 'solver')]
+    deal_pool = arguments.deal_pool
+    temporary = None
+
+    if deal_pool is None and ('env' in groups or 'scaling' in groups):
+        if arguments.no_solver:
+            parser.error('--deal-pool is required with --no-solver')
+
+        temporary = tempfile.NamedTemporaryFile(suffix='.pool', delete=False)
+        temporary.close()
+        deal_pool = temporary.name
+        build_deal_pool(deal_pool, arguments.pool_size)
+
+    try:
+        results = {}
+
+        if 'env' in groups:
+            results.update(env.run(deal_pool, not arguments.no_solver, arguments.scale))
+
+        if 'scaling' in groups:
+            results.update(scaling.run(deal_pool, arguments.threads, arguments.processes, arguments.scale))
+
+        if 'solver' in groups:
+            results.update(solver.run(arguments.solver_deals))
+
+    finally:
+        if temporary is not None:
+            os.unlink(temporary.name)
+
+    baseline = None if arguments.baseline is None else common.load_results(arguments.baseline)
+    _print_results(results, baseline)
+
+    if arguments.output is not None:
+        common.save_results(arguments.output, results)
+
+    if baseline is not None:
+        regressions = common.compare(results, baseline, arguments.tolerance)[1]
+
+        if regressions:
+            print('Regressions (more than {:.0%} worse): {}'.format(arguments.tolerance, ', '.join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
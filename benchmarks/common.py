@@ -0,0 +1,112 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+# Wynik pomiaru - słownik z wartością, jednostką i kierunkiem (czy większa wartość oznacza lepszy wynik).
+# Wyniki wszystkich pomiarów zapisywane są do pliku JSON:
+# {'meta': {informacje o maszynie i wersji kodu}, 'results': {nazwa pomiaru: wynik}}
+
+RESULTS_VERSION = 1
+DEFAULT_TOLERANCE = 0.1  # dopuszczalne pogorszenie wyniku względem wyniku odniesienia (10%)
+
+
+def result(value, unit, higher_is_better):
+    """Wynik pomiaru,
+    gdzie:
+    value - zmierzona wartość
+    unit - jednostka (np. 'us' - mikrosekundy na wywołanie, '1/s' - liczba operacji na sekundę, 'B' - bajty)
+    higher_is_better - czy większa wartość oznacza lepszy wynik"""
+
+    return {'value': float(value), 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def time_per_call(function, number, repeat=5):
+    """Najkrótszy z repeat pomiarów średniego czasu jednego wywołania funkcji (number wywołań w pomiarze)
+    - wynik w mikrosekundach"""
+
+    best = float('inf')
+
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+
+        for _ in range(0, number):
+            function()
+
+        best = min(best, (time.perf_counter() - start) / number)
+
+    return result(best * 1e6, 'us', False)
+
+
+def rate(count, seconds):
+    """Liczba operacji na sekundę"""
+
+    return result(count / seconds, '1/s', True)
+
+
+def _git_commit():
+    """Skrót bieżącego commita repozytorium (None, gdy niedostępny)"""
+
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    """Informacje o maszynie, wersjach bibliotek i kodu dołączane do wyników"""
+
+    return {'version': RESULTS_VERSION, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': _git_commit(),
+            'python': sys.version.split()[0], 'numpy': np.__version__, 'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+
+
+def save_results(path, results):
+    """Zapisanie wyników z metadanymi do pliku JSON"""
+
+    with open(path, 'w') as file:
+        json.dump({'meta': metadata(), 'results': results}, file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Odczytanie wyników z pliku JSON - zwraca słownik wyników"""
+
+    with open(path) as file:
+        data = json.load(file)
+
+    if data.get('meta', {}).get('version') != RESULTS_VERSION:
+        raise ValueError('Unsupported benchmark results file: ' + path)
+
+    return data['results']
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Porównanie wyników z wynikami odniesienia - zwraca listę krotek (nazwa, wartość odniesienia, wartość, zmiana
+    względna) dla wszystkich wspólnych pomiarów oraz listę nazw pomiarów pogorszonych o więcej niż tolerance.
+    Zmiana względna jest dodatnia, gdy wynik się poprawił."""
+
+    changes = []
+    regressions = []
+
+    for name in sorted(set(results) & set(baseline)):
+        old = baseline[name]['value']
+        new = results[name]['value']
+
+        if old == 0:
+            continue
+
+        change = (new - old) / abs(old)
+
+        if not results[name]['higher_is_better']:
+            change = - change
+
+        changes.append((name, old, new, change))
+
+        if change < - tolerance:
+            regressions.append(name)
+
+    return changes, regressions
@@ -0,0 +1,132 @@
+import contextlib
+import os
+import random
+import time
+import numpy as np
+from gym_bridge_auction.envs import AuctionEnv, auction_core
+from gym_bridge_auction.envs.game import Deck, NAMES, Player, random_deals, hands_to_pbn
+from gym_bridge_auction.envs.hand_features import hand_features
+from gym_bridge_auction.envs.solver_results import get_results_from_solver
+from benchmarks.common import result, time_per_call, rate
+
+"""Pomiary poszczególnych etapów działania środowiska AuctionEnv - tasowanie i rozdanie kart, tworzenie graczy,
+zapis PBN, solver, reset, krok, nagroda i renderowanie w konsoli"""
+
+
+def close_env(env):
+    """Zamknięcie środowiska - AuctionEnv.close() bez renderowania w oknie kończy program"""
+
+    try:
+        env.close()
+    except SystemExit:
+        pass
+
+
+def random_legal_action(env):
+    """Losowe dostępne działanie"""
+
+    return env.action_space.sample()
+
+
+def _step_rate(env, n_steps):
+    """Liczba kroków na sekundę dla losowych dostępnych działań - czas resetu po zakończonej licytacji nie jest
+    wliczany"""
+
+    env.reset()
+    elapsed = 0.0
+
+    for _ in range(0, n_steps):
+        action = random_legal_action(env)
+        start = time.perf_counter()
+        _, _, done, _ = env.step(action)
+        elapsed += time.perf_counter() - start
+
+        if done:
+            env.reset()
+
+    return rate(n_steps, elapsed)
+
+
+def _auction_core_rate(n_auctions):
+    """Liczba przejść rdzenia licytacji (auction_core) na sekundę dla stałej licytacji z odzywkami, kontrą,
+    rekontrą i pasami"""
+
+    actions = [35, 30, 36, 37, 0, 20, 0, 0, 0]
+    start = time.perf_counter()
+
+    for i in range(0, n_auctions):
+        state = auction_core.initial_state(i % 4)
+
+        for action in actions:
+            state = auction_core.next_state(state, action)
+
+    return rate(n_auctions * len(actions), time.perf_counter() - start)
+
+
+def run(deal_pool, use_solver=True, scale=1.0):
+    """Pomiary dla środowiska korzystającego z puli rozdań deal_pool (oraz, gdy use_solver, pomiary wywołań solvera)
+    - zwraca słownik wyników. Parametr scale zmienia liczbę powtórzeń (np. 0.1 - szybki przebieg)."""
+
+    results = {}
+    n = max(1, int(1000 * scale))
+    rng = np.random.default_rng(0)
+    random.seed(0)
+
+    # rozdanie kart
+    deck = Deck()
+    results['deal.deck_shuffle_and_deal'] = time_per_call(lambda: (deck.shuffle(), deck.deal(4)), n)
+    results['deal.random_deals'] = time_per_call(lambda: random_deals(1, rng), n)
+    results['deal.random_deals_batch_1000'] = time_per_call(lambda: random_deals(1000, rng), max(1, n // 100))
+
+    hands = random_deals(1, rng)[0]
+    results['deal.player_construction'] = time_per_call(lambda: [Player(NAMES[i], hands[i]) for i in range(0, 4)], n)
+    batch = random_deals(1000, rng)
+    results['deal.hand_features_batch_1000'] = time_per_call(lambda: hand_features(batch), max(1, n // 100))
+
+    # środowisko z pulą rozdań
+    for mode in ('dict', 'array'):
+        env = AuctionEnv(deal_pool=deal_pool, observation_mode=mode)
+        env.reset()
+        results['env.' + mode + '.reset'] = time_per_call(env.reset, n)
+        results['env.' + mode + '.step_random_legal'] = _step_rate(env, 10 * n)
+        close_env(env)
+
+    results['auction_core.next_state'] = _auction_core_rate(10 * n)
+
+    env = AuctionEnv(deal_pool=deal_pool)
+    env.reset()
+    results['env.pbn_deal_representation'] = time_per_call(env._pbn_deal_representation, n)
+
+    # nagroda dla odzywki 1C (zawsze dostępnej na początku licytacji)
+    state, _, _, _ = env.step(35)
+    results['env.get_reward'] = time_per_call(lambda: env._get_reward(state, 35), 10 * n)
+    results['env.rewards_for_all_actions'] = time_per_call(env.rewards_for_all_actions, n)
+
+    # renderowanie w konsoli (wyjście przekierowane)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        env.render('console')
+        results['env.render_console'] = time_per_call(lambda: env.render('console'), n)
+
+    close_env(env)
+
+    if use_solver:
+        # pojedyncze rozdania rozwiązywane przez solver (różne rozdania - bez pamięci podręcznej)
+        n_deals = max(1, int(10 * scale))
+        pbns = [hands_to_pbn(deal) for deal in random_deals(n_deals, rng)]
+        start = time.perf_counter()
+
+        for pbn in pbns:
+            get_results_from_solver(pbn, 0)
+
+        results['solver.single_deal_latency'] = result((time.perf_counter() - start) / n_deals * 1e6, 'us', False)
+
+        env = AuctionEnv()
+        start = time.perf_counter()
+
+        for _ in range(0, n_deals):
+            env.reset()
+
+        results['env.reset_with_solver'] = result((time.perf_counter() - start) / n_deals * 1e6, 'us', False)
+        close_env(env)
+
+    return results
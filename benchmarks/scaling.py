@@ -0,0 +1,114 @@
+import gc
+import threading
+import time
+import tracemalloc
+import numpy as np
+from gym_bridge_auction.envs import AuctionEnv, BridgeAuctionVecEnv, SubprocAuctionVecEnv
+from benchmarks.common import result, rate
+from benchmarks.env import close_env, random_legal_action
+
+"""Pomiary skalowania - pamięć zajmowana przez jedno środowisko oraz przepustowość wielu środowisk w wątkach,
+procesach (SubprocAuctionVecEnv) i w wersji wektorowej (BridgeAuctionVecEnv)"""
+
+
+def memory_per_env(deal_pool, observation_mode, n_envs):
+    """Średnia pamięć (w bajtach) przydzielona przez Pythona dla jednego środowiska po resecie (tracemalloc)"""
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    envs = [AuctionEnv(deal_pool=deal_pool, observation_mode=observation_mode) for _ in range(0, n_envs)]
+
+    for env in envs:
+        env.reset()
+
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    for env in envs:
+        close_env(env)
+
+    return result(used / n_envs, 'B', False)
+
+
+def _thread_steps(deal_pool, duration, counts, index):
+    """Wątek wykonujący kroki we własnym środowisku przez duration sekund"""
+
+    env = AuctionEnv(deal_pool=deal_pool, observation_mode='array')
+    env.reset()
+    steps = 0
+    end = time.perf_counter() + duration
+
+    while time.perf_counter() < end:
+        _, _, done, _ = env.step(random_legal_action(env))
+        steps += 1
+
+        if done:
+            env.reset()
+
+    counts[index] = steps
+    close_env(env)
+
+
+def thread_rate(deal_pool, n_threads, duration):
+    """Łączna liczba kroków na sekundę dla n_threads wątków, każdy z własnym środowiskiem"""
+
+    counts = [0 for _ in range(0, n_threads)]
+    threads = [threading.Thread(target=_thread_steps, args=(deal_pool, duration, counts, i))
+               for i in range(0, n_threads)]
+    start = time.perf_counter()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return rate(sum(counts), time.perf_counter() - start)
+
+
+def _vec_env_rate(env, duration, seed):
+    """Liczba kroków (sumarycznie we wszystkich środowiskach) na sekundę dla środowiska wektorowego"""
+
+    rng = np.random.default_rng(seed)
+    env.reset()
+    steps = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < duration:
+        masks = env.action_masks
+        env.step((masks * rng.random(masks.shape)).argmax(axis=1))
+        steps += env.num_envs
+
+    return rate(steps, time.perf_counter() - start)
+
+
+def process_rate(deal_pool, n_workers, envs_per_worker, duration):
+    """Łączna liczba kroków na sekundę dla SubprocAuctionVecEnv z n_workers procesami roboczymi"""
+
+    env = SubprocAuctionVecEnv(n_workers * envs_per_worker, {'deal_pool': deal_pool}, num_workers=n_workers, seed=0)
+
+    try:
+        return _vec_env_rate(env, duration, 0)
+    finally:
+        env.close()
+
+
+def run(deal_pool, thread_counts=(1, 2, 4), process_counts=(1, 2, 4), scale=1.0):
+    """Pomiary pamięci i skalowania - zwraca słownik wyników. Parametr scale zmienia czas trwania pomiarów."""
+
+    results = {}
+    duration = max(0.2, 2.0 * scale)
+
+    for mode in ('dict', 'array'):
+        results['memory.per_env.' + mode] = memory_per_env(deal_pool, mode, 100)
+
+    for n_threads in thread_counts:
+        results['scaling.threads.' + str(n_threads)] = thread_rate(deal_pool, n_threads, duration)
+
+    for n_workers in process_counts:
+        results['scaling.processes.' + str(n_workers)] = process_rate(deal_pool, n_workers, 8, duration)
+
+    results['scaling.vec_env.1024'] = _vec_env_rate(BridgeAuctionVecEnv(1024, deal_pool, seed=0), duration, 0)
+
+    return results
@@ -0,0 +1,100 @@
+import multiprocessing
+import sys
+import time
+import numpy as np
+from gym_bridge_auction.envs import solver_binding
+from gym_bridge_auction.envs.game import random_deals, hands_to_pbn
+from benchmarks.common import rate
+
+"""Porównanie wydajności Double Dummy Solver dla różnych ustawień wątków i pamięci (solver_binding.configure).
+Każde ustawienie sprawdzane jest w osobnym procesie, ponieważ solver konfigurowany jest raz na proces.
+
+Użycie: python -m benchmarks.solver [liczba rozdań]"""
+
+# nazwa i parametry funkcji solver_binding.configure
+SETTINGS = [('worker', solver_binding.SOLVER_PRESETS['worker']),
+            ('batch', solver_binding.SOLVER_PRESETS['batch']),
+            ('threads=1', {'threads': 1}),
+            ('threads=2', {'threads': 2}),
+            ('threads=4', {'threads': 4}),
+            ('stl', {'threading': 'stl'}),
+            ('openmp', {'threading': 'openmp'})]
+
+
+def _run(settings, n_deals, queue):
+    """Pomiar dla jednego ustawienia - liczba wywołań dla pojedynczych rozdań i liczba rozdań wsadowo na sekundę"""
+
+    try:
+        info = solver_binding.configure(**settings)
+        pbns = [hands_to_pbn(hands) for hands in random_deals(n_deals, np.random.default_rng(0))]
+
+        start = time.perf_counter()
+        for pbn in pbns:
+            solver_binding.calc_tricks_and_par_table(pbn)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        solver_binding.calc_tricks_and_par_table_batch(pbns)
+        batch = time.perf_counter() - start
+
+        queue.put((info, rate(n_deals, single), rate(n_deals, batch)))
+
+    except Exception as exception:
+        queue.put(exception)
+
+
+def measure(settings, n_deals):
+    """Pomiar dla jednego ustawienia w nowym procesie - zwraca krotkę (konfiguracja solvera, wynik dla pojedynczych
+    rozdań, wynik wsadowy)"""
+
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run, args=(settings, n_deals, queue))
+    process.start()
+    measurement = queue.get()
+    process.join()
+
+    if isinstance(measurement, Exception):
+        raise measurement
+
+    return measurement
+
+
+def run(n_deals=20, settings=SETTINGS):
+    """Pomiary dla wszystkich ustawień - zwraca słownik wyników (ustawienia niedostępne w danej kompilacji
+    biblioteki są pomijane)"""
+
+    results = {}
+
+    for name, configuration in settings:
+        try:
+            _, single, batch = measure(configuration, n_deals)
+        except RuntimeError:
+            continue
+
+        results['solver.' + name + '.single'] = single
+        results['solver.' + name + '.batch'] = batch
+
+    return results
+
+
+def main():
+    n_deals = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    print('{:<10} {:<8} {:>8} {:<24} {:>14} {:>14}'.format('setting', 'backend', 'threads', 'thread sizes',
+                                                          'single [1/s]', 'batch [1/s]'))
+
+    for name, settings in SETTINGS:
+        try:
+            info, single, batch = measure(settings, n_deals)
+        except RuntimeError as exception:
+            print('{:<10} error: {}'.format(name, exception))
+            continue
+
+        print('{:<10} {:<8} {:>8} {:<24} {:>14.1f} {:>14.1f}'.format(name, str(info['threading']), info['threads'],
+                                                                  info['thread_sizes'][:24], single['value'],
+                                                                  batch['value']))
+
+
+if __name__ == '__main__':
+    main()
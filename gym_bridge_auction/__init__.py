@@ -2,4 +2,8 @@ from gym.envs.registration import register
 
 register(id='BridgeAuction-v0',
          entry_point='gym_bridge_auction.envs:AuctionEnv',
+         # parametry środowiska, np. gym.make('BridgeAuction-v0', deal_pool='plik.pool') lub prefetch_depth=8
+         kwargs={'deal_pool': None, 'solver_cache': None, 'prefetch_depth': 0, 'prefetch_workers': 1,
+                 'observation_mode': 'dict', 'solver_service': None, 'profile': False, 'deal_seed': None,
+                 'deal_start': 0, 'deal_step': 1, 'hand_features': False}
          )
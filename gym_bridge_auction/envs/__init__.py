@@ -1 +1,3 @@
 from gym_bridge_auction.envs.bridge_auction_env import AuctionEnv
+from gym_bridge_auction.envs.bridge_auction_vec_env import BridgeAuctionVecEnv
+from gym_bridge_auction.envs.subproc_vec_env import SubprocAuctionVecEnv
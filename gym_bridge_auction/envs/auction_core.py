@@ -0,0 +1,175 @@
+from array import array
+import numpy as np
+
+# Rdzeń licytacji niezależny od gym i pygame - cały stan licytacji to jedna liczba całkowita, a każde działanie to
+# odczyt z tablicy przejść wyznaczonej raz przy imporcie modułu.
+#
+# Pola bitowe stanu:
+# bity 0-1 - gracz licytujący następny (0 - N, 1 - E, 2 - S, 3 - W)
+# bity 2-3 - gracz, który zgłosił najwyższą odzywkę (0, gdy nie zgłoszono odzywki)
+# bity 4-6 - licznik zgłoszonych kolejno pasów (zatrzymuje się na 7)
+# bity 7-8 - kontra/rekontra (0 - brak, 1 - kontra, 2 - rekontra)
+# bity 9-14 - najwyższa zgłoszona odzywka (numeracja jak w przestrzeni akcji AuctionEnv, 0 - brak odzywki)
+# bity 15-38 - ostatnie działanie graczy N, E, S, W (po 6 bitów, NO_CALL - gracz jeszcze nie licytował)
+#
+# Bity 0-14 (kod stanu) wyznaczają przejścia, dostępne działania i koniec licytacji. Ostatnie działania graczy są
+# potrzebne tylko do obserwacji i renderowania.
+
+# Liczba działań w przestrzeni akcji (pas, 35 odzywek, kontra, rekontra) - numeracja jak w AuctionEnv
+N_ACTIONS = 38
+PASS = 0
+DOUBLE = 36
+REDOUBLE = 37
+NO_CALL = 63  # brak działania gracza w ostatnich działaniach graczy
+# najdłuższa możliwa licytacja - trzy pasy, 34 odzywki (od 1C do 7S) z pasami, kontrą i rekontrą (odzywka, pas,
+# pas, kontra, pas, pas, rekontra, pas, pas) oraz 7NT, pas, pas, kontra, pas, pas, rekontra
+MAX_AUCTION_LENGTH = 3 + 34 * 9 + 7
+
+_TURN_SHIFT = 0
+_DECLARER_SHIFT = 2
+_PASSES_SHIFT = 4
+_DOUBLE_SHIFT = 7
+_CONTRACT_SHIFT = 9
+_CALLS_SHIFT = 15
+_CALL_BITS = 6
+_MAX_PASSES = 7
+
+N_CODES = 1 << _CALLS_SHIFT  # liczba kodów stanu
+CODE_MASK = N_CODES - 1
+_NO_CALLS = sum(NO_CALL << (_CALL_BITS * player) for player in range(0, 4))
+ILLEGAL = 0xFFFF  # wartość tablicy przejść dla niedostępnego działania
+
+
+def _create_tables():
+    """Tablice przejść (kod stanu, działanie) -> kod stanu po działaniu (ILLEGAL dla działań niedostępnych),
+    dostępnych działań (kod stanu, działanie) i końca licytacji (kod stanu) - wyznaczone dla wszystkich kodów"""
+
+    codes = np.arange(N_CODES)
+    turn = (codes >> _TURN_SHIFT) & 3
+    declarer = (codes >> _DECLARER_SHIFT) & 3
+    passes = (codes >> _PASSES_SHIFT) & 7
+    double = (codes >> _DOUBLE_SHIFT) & 3
+    contract = (codes >> _CONTRACT_SHIFT) & 63
+    actions = np.arange(N_ACTIONS)
+
+    # dostępne są: pas, odzywki wyższe od najwyższej zgłoszonej (o mniejszym identyfikatorze), kontra dla
+    # przeciwników pary z najwyższą odzywką i rekontra dla tej pary po kontrze przeciwników
+    same_pair = turn % 2 == declarer % 2
+    legal = actions < np.where(contract > 0, contract, DOUBLE)[:, None]
+    legal[:, DOUBLE] = (contract > 0) & (double == 0) & ~same_pair
+    legal[:, REDOUBLE] = (contract > 0) & (double == 1) & same_pair
+
+    is_bid = (actions > PASS) & (actions < DOUBLE)
+    new_contract = np.where(is_bid, actions, contract[:, None])
+    new_declarer = np.where(is_bid, turn[:, None], declarer[:, None])
+    new_double = np.where(is_bid, 0, np.where(actions == DOUBLE, 1, np.where(actions == REDOUBLE, 2, double[:, None])))
+    new_passes = np.where(actions == PASS, np.minimum(passes + 1, _MAX_PASSES)[:, None], 0)
+    new_codes = ((turn + 1) % 4)[:, None] << _TURN_SHIFT | new_declarer << _DECLARER_SHIFT | \
+        new_passes << _PASSES_SHIFT | new_double << _DOUBLE_SHIFT | new_contract << _CONTRACT_SHIFT
+    transitions = np.where(legal, new_codes, ILLEGAL).astype(np.uint16)
+
+    # koniec licytacji: trzy pasy po odzywce, cztery pasy bez odzywki lub rekontra po 7NT
+    over = ((contract > 0) & (passes == 3)) | ((contract == 0) & (passes == 4)) | ((contract == 1) & (double == 2))
+
+    return transitions, legal, over
+
+
+TRANSITIONS, LEGAL, OVER = _create_tables()
+for _table in (TRANSITIONS, LEGAL, OVER):
+    _table.setflags(write=False)
+
+# kopie tablic do odczytu pojedynczych elementów (szybszego niż indeksowanie tablic NumPy)
+_TRANSITIONS = array('H', TRANSITIONS.tobytes())
+_OVER = OVER.tolist()
+# przesunięcia ostatniego działania gracza i maski bitów stanu bez kodu stanu i ostatniego działania gracza
+# (dla kolejnych graczy licytujących)
+_CALL_SHIFTS = [_CALLS_SHIFT + _CALL_BITS * player for player in range(0, 4)]
+_KEPT_BITS = [~(CODE_MASK | NO_CALL << shift) for shift in _CALL_SHIFTS]
+
+
+def initial_state(dealer):
+    """Stan początkowy licytacji, którą rozpoczyna gracz o indeksie dealer"""
+
+    return dealer << _TURN_SHIFT | _NO_CALLS << _CALLS_SHIFT
+
+
+def next_state(state, action):
+    """Stan po zgłoszeniu odzywki/zapowiedzi action przez gracza licytującego w stanie state - działanie musi być
+    dostępne (is_legal)"""
+
+    code = state & CODE_MASK
+
+    return state & _KEPT_BITS[code & 3] | action << _CALL_SHIFTS[code & 3] | _TRANSITIONS[code * N_ACTIONS + action]
+
+
+def is_legal(state, action):
+    """Czy działanie action jest dostępne dla gracza licytującego w stanie state"""
+
+    return 0 <= action < N_ACTIONS and _TRANSITIONS[(state & CODE_MASK) * N_ACTIONS + action] != ILLEGAL
+
+
+def action_mask(state):
+    """Maska logiczna dostępnych działań (widok tylko do odczytu na wiersz tablicy LEGAL)"""
+
+    return LEGAL[state & CODE_MASK]
+
+
+def is_over(state):
+    """Czy licytacja została zakończona"""
+
+    return _OVER[state & CODE_MASK]
+
+
+def next_player(state):
+    """Indeks gracza licytującego następny"""
+
+    return state >> _TURN_SHIFT & 3
+
+
+def last_player(state):
+    """Indeks gracza licytującego w ostatnim kroku"""
+
+    return (state >> _TURN_SHIFT) - 1 & 3
+
+
+def contract(state):
+    """Najwyższa zgłoszona odzywka (0 - nie zgłoszono odzywki)"""
+
+    return state >> _CONTRACT_SHIFT & 63
+
+
+def declarer(state):
+    """Indeks gracza, który zgłosił najwyższą odzywkę (znaczenie ma tylko, gdy contract(state) > 0)"""
+
+    return state >> _DECLARER_SHIFT & 3
+
+
+def double(state):
+    """Kontra/rekontra najwyższej odzywki - 0 (brak), 1 (kontra) lub 2 (rekontra)"""
+
+    return state >> _DOUBLE_SHIFT & 3
+
+
+def passes(state):
+    """Liczba zgłoszonych kolejno pasów (najwyżej 7)"""
+
+    return state >> _PASSES_SHIFT & 7
+
+
+def winning_pair(state):
+    """Para z najwyższą zgłoszoną odzywką (0 - N-S, 1 - E-W) lub None, gdy nie zgłoszono odzywki"""
+
+    return None if state >> _CONTRACT_SHIFT & 63 == 0 else state >> _DECLARER_SHIFT & 1
+
+
+def is_started(state):
+    """Czy w licytacji zgłoszono jakiekolwiek działanie"""
+
+    return state >> _CALLS_SHIFT != _NO_CALLS
+
+
+def player_call(state, player):
+    """Ostatnie działanie gracza o indeksie player (NO_CALL - gracz jeszcze nie licytował)"""
+
+    return state >> (_CALLS_SHIFT + _CALL_BITS * player) & NO_CALL
+
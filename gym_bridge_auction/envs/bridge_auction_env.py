@@ -1,12 +1,54 @@
-import random
+import itertools
 import time
+from collections import namedtuple
 import numpy as np
 import gym
 from gym import error
 from gym import spaces
 from gym_bridge_auction.envs.solver_results import *
+from gym_bridge_auction.envs import auction_core
 from gym_bridge_auction.envs.dynamic_space import Dynamic
-from gym_bridge_auction.envs.render import Window
+from gym_bridge_auction.envs.scoring import deal_score_table
+from gym_bridge_auction.envs.hand_features import N_HAND_FEATURES, hand_features
+from gym_bridge_auction.envs.deal_pool import DealPool, get_deal_pool
+from gym_bridge_auction.envs.deal_source import RandomDealSource, IndexedDealSource, PrefetchDealSource
+from gym_bridge_auction.envs.render import Window, FrameRenderer
+from gym_bridge_auction.envs.profiling import PhaseTimer
+
+# Obserwacja w formie tablicy (observation_mode='array') - kolejne elementy wektora int16:
+# stany licytacji w kolejności OBSERVATION_KEYS (brak wartości - liczba -1), a po nich ręce graczy N, E, S, W w formie
+# 0/1 (4 x 52 elementy)
+OBSERVATION_KEYS = ['whose turn', 'whose next turn', 'LAST_contract', 'Player_contract', 'winning_pair',
+                    'double/redouble']
+OBSERVATION_HANDS_OFFSET = len(OBSERVATION_KEYS)
+OBSERVATION_SIZE = OBSERVATION_HANDS_OFFSET + 4 * 52
+# z włączonymi cechami rąk (hand_features=True) po rękach graczy dołączane są cechy rąk graczy N, E, S, W
+# (4 x N_HAND_FEATURES elementów w kolejności HAND_FEATURES)
+OBSERVATION_FEATURES_OFFSET = OBSERVATION_SIZE
+OBSERVATION_SIZE_WITH_FEATURES = OBSERVATION_FEATURES_OFFSET + 4 * N_HAND_FEATURES
+
+
+class AuctionSnapshot(namedtuple('AuctionSnapshot', ['auction', 'dealer', 'deal'])):
+    """Niezmienny stan środowiska AuctionEnv (get_state/set_state),
+    gdzie:
+    auction - stan licytacji zapisany jako jedna liczba całkowita (auction_core)
+    dealer - indeks rozdającego
+    deal - rozdanie (ten sam obiekt co w środowisku, bez kopiowania)
+
+    Migawki są haszowalne i równe, gdy mają ten sam stan licytacji i rozdającego oraz dotyczą tego samego obiektu
+    rozdania, więc mogą być kluczami tablic transpozycji."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return isinstance(other, AuctionSnapshot) and self.auction == other.auction and \
+            self.dealer == other.dealer and self.deal is other.deal
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.auction, self.dealer, id(self.deal)))
 
 
 class AuctionEnv(gym.Env):
@@ -104,6 +146,13 @@ class AuctionEnv(gym.Env):
                 
                 Karty ustawione są od 2 do A kolejno kolorami trefl, karo, kier i na końcu pik:
                 [2♣, ..., A♣, 2♦, ..., A♦, 2♥, ..., A♥, 2♠, ..., A♠].
+
+            Stan 'Hand features' (tylko z hand_features=True) - cechy rąk graczy N, E, S, W wyznaczone raz na rozdanie:
+                Typ: Box(4, 8)
+
+                Kolejne cechy ręki (HAND_FEATURES): punkty honorowe, długości kolorów trefl, karo, kier i pik, klasa
+                układu (0 - zrównoważony, 1 - półzrównoważony, 2 - niezrównoważony), kontrole i liczba przegrywających
+                lew (losing trick count).
                         
         Nagroda:
             W każdym kroku wyznaczona jest nagroda wartościująca działania agentów.
@@ -138,63 +187,151 @@ class AuctionEnv(gym.Env):
             - nie ustalono kontraktu - na początku licytacji wszyscy gracze spasowali,
             - ostateczny kontrakt to 7NT, a po tym nastąpiła kontra i rekontra."""
 
-    metadata = {'render.modes': ['human', 'console'], 'video.frames_per_second': 0.5}
-
-    def __init__(self):
+    metadata = {'render.modes': ['human', 'console', 'rgb_array'], 'video.frames_per_second': 0.5}
+
+    def __init__(self, deal_pool=None, solver_cache=None, prefetch_depth=0, prefetch_workers=1,
+                 observation_mode='dict', solver_service=None, profile=False, deal_seed=None, deal_start=0,
+                 deal_step=1, hand_features=False):
+        """Parametry:
+            deal_pool (str) - opcjonalna ścieżka do pliku z pulą rozwiązanych rozdań (DealPool), z której losowane są
+            rozdania zamiast tasowania talii i wywoływania solvera
+            solver_cache (str) - opcjonalna ścieżka do pliku pamięci podręcznej wyników Double Dummy Solver
+            (SolverCache), współdzielonego przez środowiska w wielu procesach
+            prefetch_depth (int) - liczba rozwiązanych rozdań przygotowywanych w tle (0 - rozdanie przygotowywane
+            dopiero w reset(); pomijane dla puli rozdań, z której rozdania pobierane są bez solvera)
+            prefetch_workers (int) - liczba wątków przygotowujących rozdania w tle
+            observation_mode (str) - 'dict' (obserwacja jako słownik, opisana wyżej) lub 'array' (obserwacja jako
+            wektor int16 o długości OBSERVATION_SIZE - przestrzeń Box)
+            solver_service (str) - opcjonalna ścieżka do gniazda usługi solvera (SolverService) - rozdania są wtedy
+            rozwiązywane przez usługę, a nie przez solver ładowany w procesie środowiska
+            profile (bool) - pomiar czasu i liczby wywołań poszczególnych etapów działania środowiska (PHASES),
+            odczytywany metodą stats() - bez pomiaru środowisko nie wykonuje żadnych dodatkowych operacji
+            deal_seed (int) - ziarno strumienia rozdań - środowisko rozgrywa kolejno rozdania o numerach deal_start,
+            deal_start + deal_step, ... (deals_by_index), zamiast losowych rozdań (nie można łączyć z deal_pool)
+            deal_start (int), deal_step (int) - numer pierwszego rozdania i odstęp między numerami rozdań
+            hand_features (bool) - dołączenie do obserwacji cech rąk graczy (hand_features.HAND_FEATURES) wyznaczanych
+            raz na rozdanie - w trybie 'dict' stan 'Hand features' (dostępny jak 'Players hands' po reset()), w trybie
+            'array' wektor o długości OBSERVATION_SIZE_WITH_FEATURES
+
+        W trybie 'array' obserwacja i tablice w info są zapisywane do tych samych, utworzonych raz buforów - wartości
+        zwrócone w danym kroku zmieniają się w kolejnych krokach (do przechowywania należy wykonać kopię). Ręce graczy
+        są wpisywane do obserwacji raz na rozdanie i pozostają w niej przez cały epizod.
+
+        Nowe rozdanie losowane jest w każdym wywołaniu reset(), które należy wykonać przed pierwszym krokiem.
+        Rozdania (bez rozdań przygotowywanych w tle) i wybór rozdającego można powtórzyć, ustawiając ziarno metodą
+        seed()."""
 
         self._win = None  # instancja interfejsu graficznego
+        self._frame_renderer = None  # renderowanie do tablicy (tryb 'rgb_array'), tworzone przy pierwszym użyciu
         self._n_players = 4  # liczba graczy
-        self._deck = Deck()  # utworzenie talii
         self._dealer_name = ''  # nazwa gracza, który jest rozdającym
-        self._players_order = []  # lista graczy ustawionych w odpowiedniej kolejności licytowania
-        self._index_order = None  # indeks aktualnie licytującego gracza (według listy self._players_order)
-        self._deck.shuffle()  # tasowanie talii
-        hands = self._deck.deal(self._n_players)  # rozdanie kart dla graczy
-        self._players = [Player(NAMES[i], hands[i]) for i in range(0, self._n_players)]  # utworzenie listy graczy
+        self._players = []  # lista graczy - tworzona dla każdego rozdania
+        self._dealer = None  # indeks rozdającego, który rozpoczyna licytację
+
+        # liczniki czasu etapów działania środowiska (tylko z włączonym pomiarem)
+        self._timer = PhaseTimer() if profile else None
+        # generator liczb losowych środowiska - wybór rozdającego i rozdań z puli
+        self._rng = np.random.default_rng()
+
+        if deal_pool is not None and deal_seed is not None:
+            raise ValueError('deal_seed cannot be used with deal_pool')
 
-        # rozdzielenie rąk graczy ze względu na kolor karty (w każdym wierszu figury/numery w danym kolorze)
-        for j in range(0, len(self._players)):
-            self._players[j].split_hand()
-            for i in range(0, 4):
-                self._players[j].hand_splitted[i] = self._players[j].hand_to_display(self._players[j].hand_splitted[i])
+        # źródło rozwiązanych rozdań - pula rozdań z pliku lub tasowanie talii i solver (z pamięcią podręczną)
+        if deal_pool is None:
+            if solver_service is not None:
+                set_solver_service(solver_service)
 
-        self._choose_dealer_and_order()  # wybór rozdającego i ustalenie kolejności licytacji
+            solver_cache = None if solver_cache is None else get_solver_cache(solver_cache)
+
+            if deal_seed is None:
+                source_factory = lambda: RandomDealSource(solver_cache, self._timer)
+
+            else:
+                # wątki przygotowujące rozdania w tle dzielą się numerami rozdań
+                starts = itertools.count(deal_start, deal_step)
+                workers = max(1, prefetch_workers) if prefetch_depth > 0 else 1
+                source_factory = lambda: IndexedDealSource(deal_seed, next(starts), deal_step * workers,
+                                                           solver_cache, self._timer)
+
+        else:
+            # pobranie rozdania z puli nie wymaga solvera, więc rozdania nie są przygotowywane w tle - wybiera je
+            # generator środowiska (_new_deal), ustawiany metodą seed()
+            pool = get_deal_pool(deal_pool)
+            source_factory = lambda: pool
+            prefetch_depth = 0
+
+        # wątki przygotowujące rozdania w tle
+        self._prefetch = None if prefetch_depth <= 0 else PrefetchDealSource(source_factory, prefetch_depth,
+                                                                             prefetch_workers)
+        self._deal_source = source_factory() if self._prefetch is None else self._prefetch
+        self._deal = None  # bieżące rozdanie - ręce graczy, liczby lew i zapisy optymalne dla każdego rozdającego
 
         # utworzenie dostępnych kontraktów (lista obiektów typu Contract)
         self._available_contracts = create_available_contracts()
 
         self._optimum_contract_score = [None, None]  # optymalne punkty dla par według solvera
-        self._insert_solver_results()  # wstawienie wyników z solvera dla poszczególnych graczy
 
         self._viewer = None  # zmienna pomocnicza do renderowania
-        self._last_contract = None  # najwyższy zgłoszony kontrakt w danym momencie licytacji
-        self._first_bind_pass = False  # czy pierwsza odzywka była pasem
-        self._double = False  # czy była kontra
-        self._redouble = False  # czy była rekontra
-        self._pass_number = 0  # licznik zgłoszonych kolejno pasów
+        self._auction = None  # stan licytacji zapisany jako jedna liczba całkowita (auction_core)
         self._score = [0, 0]  # zapis dla par w danym momencie licytacji
-        # maksymalna odzywka według solvera dla gracza zgłaszającego najwyższy kontrakt w danym momencie licytacji
-        self._max_contract = None
-        # maksymalna liczba lew według solvera, jaką może wziąć gracz zgłaszający najwyższy kontrakt w danym momencie 
-        # licytacji
-        self._max_number_of_tricks = None
+        self._score_table = None  # zapisy dla pary N-S dla wszystkich kontraktów w bieżącym rozdaniu
         self._reward = [None, None]  # nagroda dla par
 
         self.reward_range = (-8520, 8520)  # zakres wartości nagrody
+        self._info = {}  # dodatkowe informacje na temat środowiska nie dostępne dla agenta
+        self.action_space = Dynamic(38)  # przestrzeń dostępnych działań agenta
+
         # przestrzeń obserwacji
-        self.observation_space = spaces.Dict({'whose turn': spaces.Discrete(self._n_players),
+        if observation_mode not in ('dict', 'array'):
+            raise error.Error('Unsupported observation mode: ' + str(observation_mode))
+
+        self._observation_mode = observation_mode
+        self._observation = None  # bufor obserwacji (tryb 'array')
+        self._hands = None  # ręce graczy w formie 0/1 - widok (4, 52) na bufor obserwacji (tryb 'array')
+        # cechy rąk graczy bieżącego rozdania (None - cechy wyłączone), w trybie 'array' widok na bufor obserwacji
+        self._features = np.zeros((self._n_players, N_HAND_FEATURES), dtype=np.int8) if hand_features else None
+        observation_size = OBSERVATION_SIZE_WITH_FEATURES if hand_features else OBSERVATION_SIZE
+
+        if observation_mode == 'array':
+            self._observation = np.full(observation_size, -1, dtype=np.int16)
+            self._hands = self._observation[OBSERVATION_HANDS_OFFSET:OBSERVATION_SIZE].reshape(self._n_players, 52)
+
+            if hand_features:
+                self._features = self._observation[OBSERVATION_FEATURES_OFFSET:].reshape(self._n_players,
+                                                                                         N_HAND_FEATURES)
+
+            self._info['pair score'] = np.zeros(2, dtype=np.int32)
+            self._info['optimum score'] = np.zeros(2, dtype=np.int32)
+            self._info['action mask'] = self.action_space.action_mask
+            self.observation_space = spaces.Box(low=-1, high=37, shape=(observation_size,), dtype=np.int16)
+
+        else:
+            self.observation_space = spaces.Dict({'whose turn': spaces.Discrete(self._n_players),
                                               'whose next turn': spaces.Discrete(self._n_players),
                                               'LAST_contract': spaces.Discrete(36),
                                               'Player_contract': spaces.Discrete(38),
                                               'winning_pair': spaces.Discrete(self._n_players / 2),
                                               'double/redouble': spaces.Discrete(3),
                                               'Players hands': spaces.Tuple(
-                                                  [spaces.MultiDiscrete([2 for _ in range(0, len(self._deck.deck))])
+                                                  [spaces.MultiDiscrete([2 for _ in range(0, N_CARDS)])
                                                    for _ in range(0, self._n_players)])})
-        self.action_space = Dynamic(38)  # przestrzeń dostępnych działań agenta
-        self._info = {}  # dodatkowe informacje na temat środowiska nie dostępne dla agenta
 
-        self.reset()
+            if hand_features:
+                self.observation_space.spaces['Hand features'] = spaces.Box(low=0, high=37,
+                                                                            shape=(self._n_players, N_HAND_FEATURES),
+                                                                            dtype=np.int8)
+
+        if self._timer is not None:
+            # zastąpienie mierzonych metod (tylko dla tej instancji) wersjami dodającymi czas do liczników
+            self.reset = self._timer.wrap('reset', self.reset)
+            self.step = self._timer.wrap('step', self.step)
+            self.render = self._timer.wrap('render', self.render)
+            self._new_deal = self._timer.wrap('deal', self._new_deal)
+            self._get_game_state = self._timer.wrap('state', self._get_game_state)
+            self._get_reward = self._timer.wrap('reward', self._get_reward)
+            self._is_over = self._timer.wrap('termination', self._is_over)
+            self.action_space.set_available_actions = self._timer.wrap('actions',
+                                                                       self.action_space.set_available_actions)
 
     def step(self, action):
         """Przesuwa licytację o krok do gracza następnego w kolejności oraz wyznacza dostępną dla niego przestrzeń 
@@ -221,56 +358,118 @@ class AuctionEnv(gym.Env):
                 
                 Pierwsza z nich, czyli ’pair score’, oznacza zapis brydżowy w danym momencie licytacjidla par. 
                 Natomiast ’optimum score’ określa optymalną wartość zapisu według Double Dummy Solver dla każdej ze 
-                stron. Informacje te zapisano w listach, gdzie indeks 0 to dane dla pary N-S, a 1 - dla pary E-W."""
+                stron. Informacje te zapisano w listach, gdzie indeks 0 to dane dla pary N-S, a 1 - dla pary E-W.
+                Natomiast 'action mask' to maska logiczna (38 elementów) działań dostępnych dla następnego gracza."""
 
         # sprawdzenie czy wykonane działanie przez agenta jest możliwe
         assert self.action_space.contains(action), "%r (%s) invalid" % (action, type(action))
 
-        # wyznaczenie przestrzeni obserwacji i nagrody
+        # wyznaczenie stanu licytacji po działaniu, przestrzeni obserwacji i nagrody
+        action = int(action)
         state = self._get_game_state(action, False)
         self._reward = self._get_reward(state, action)
 
         # dodanie dodatkowych informacji, przydatnych do sprawdzania wyników, dotyczących zapisu oraz optymalnych
         # punktów dla każdej z par
-        self._info['pair score'] = np.array([self._score[0], self._score[1]])
-        self._info['optimum score'] = np.array([self._optimum_contract_score[0], self._optimum_contract_score[1]])
+        if self._observation is not None:
+            # tryb 'array' - zapis do istniejących tablic
+            self._info['pair score'][:] = self._score
+            self._info['optimum score'][:] = self._optimum_contract_score
 
-        self._index_order += 1
-        if self._index_order == 4:
-            self._index_order = 0
+        else:
+            self._info['pair score'] = np.array([self._score[0], self._score[1]])
+            self._info['optimum score'] = np.array([self._optimum_contract_score[0], self._optimum_contract_score[1]])
 
         # zmienna określająca koniec danego epizodu
-        done = self._is_over(action)
+        done = self._is_over()
 
         # wyznaczenie dostępnych działań dla następnego gracza z przestrzeni akcji
-        self.action_space.set_available_actions(action, state)
+        self.action_space.set_available_actions(self._auction)
+
+        if self._observation is not None:
+            state = self._write_observation(state)
+
+        else:
+            self._info['action mask'] = self.action_space.action_mask.copy()
 
         return state, self._reward, done, self._info
 
     def reset(self):
-        """Reset środowiska i przywrócenie początkowego stanu licytacji oraz początkowej przestrzeni akcji (wszystkie
-        odzywki + pas)"""
+        """Reset środowiska - nowe rozdanie oraz przywrócenie początkowego stanu licytacji i początkowej przestrzeni
+        akcji (wszystkie odzywki + pas)"""
 
+        self._new_deal()
         self._viewer = None
-        self._index_order = 0
-        self._first_bind_pass = False
-        self._double = False
-        self._redouble = False
-        self._pass_number = 0
+        self._auction = auction_core.initial_state(self._dealer)
         self._score = [0, 0]
-        self._max_number_of_tricks = None
-        self._max_contract = None
         self._reward = [None, None]
-        self._info = {}
         self.action_space.reset()
 
+        if self._observation is not None:
+            self._info['pair score'][:] = 0
+            self._info['optimum score'][:] = 0
+
+            return self._write_observation(self._get_game_state(None, True))
+
+        self._info = {}
+
         return self._get_game_state(None, True)
 
+    def get_state(self):
+        """Migawka bieżącego stanu środowiska (AuctionSnapshot) - nie kopiuje rozdania ani graczy, więc może być
+        wykonywana w każdym węźle przeszukiwania drzewa licytacji"""
+
+        return AuctionSnapshot(self._auction, self._dealer, self._deal)
+
+    def set_state(self, snapshot):
+        """Przywrócenie stanu środowiska z migawki get_state() - zwraca obserwację stanu licytacji (w trybie 'dict' bez
+        rąk graczy). Rozdanie (gracze i wyniki solvera) ustawiane jest ponownie tylko wtedy, gdy migawka dotyczy innego
+        rozdania lub rozdającego. Informacje w info wyznaczane są w kolejnym kroku."""
+
+        if snapshot.deal is not self._deal or snapshot.dealer != self._dealer:
+            self._set_deal(snapshot.deal, snapshot.dealer)
+            self._viewer = None
+
+        self._auction = snapshot.auction
+        score = self._auction_score()
+        self._score = [score, -score]
+
+        if auction_core.is_started(self._auction):
+            reward = score - self._optimum_contract_score[0]
+            self._reward = [reward, -reward]
+
+        else:
+            self._reward = [None, None]
+
+        self.action_space.set_available_actions(self._auction)
+
+        if self._observation is not None:
+            return self._write_observation(self._auction_observation())
+
+        return self._auction_observation()
+
+    def rewards_for_all_actions(self):
+        """Nagrody dla pary N-S, jakie otrzymałby gracz licytujący następny za każde z działań w bieżącym stanie
+        (dla pary E-W nagrody są przeciwne) - tablica 38 elementów, NaN dla działań niedostępnych. Stan środowiska
+        nie jest zmieniany: stany po działaniach odczytywane są z tablicy przejść, a zapisy z tablicy zapisów
+        rozdania."""
+
+        code = self._auction & auction_core.CODE_MASK
+        legal = auction_core.LEGAL[code]
+        codes = auction_core.TRANSITIONS[code, legal].astype(np.intp)
+        rewards = np.full(auction_core.N_ACTIONS, np.nan)
+        rewards[legal] = self._score_table[auction_core.contract(codes), auction_core.declarer(codes),
+                                           auction_core.double(codes)] - self._optimum_contract_score[0]
+
+        return rewards
+
     def render(self, mode='console'):
         """Renderowanie bieżącego stanu środowiska z wykorzystniem wybranej opcji
         Obsługiwane są następujące tryby:
         - 'human' - interfejs graficzny
-        - 'console' - wersja konsolowa."""
+        - 'console' - wersja konsolowa
+        - 'rgb_array' - obraz interfejsu graficznego zwracany jako tablica NumPy uint8 o wymiarach (850, 1500, 3), tylko
+        do odczytu - bez okna i bez ograniczenia liczby klatek na sekundę."""
 
         if mode == 'human':
             # interfejs graficzny
@@ -280,24 +479,30 @@ class AuctionEnv(gym.Env):
                 self._viewer = True
 
             else:
-                if self._double:
-                    last_contract = self._last_contract.__str__() + 'X'
-
-                elif self._redouble:
-                    last_contract = self._last_contract.__str__() + 'XX'
-
-                else:
-                    last_contract = self._last_contract.__str__()
-
-                self._win.update_view(last_contract, self._players[0].player_contracts.__str__(),
-                                      self._players[1].player_contracts.__str__(),
-                                      self._players[2].player_contracts.__str__(),
-                                      self._players[3].player_contracts.__str__(),
+                self._win.update_view(self._last_contract_label(), self._player_call_label(0),
+                                      self._player_call_label(1), self._player_call_label(2),
+                                      self._player_call_label(3),
                                       PAIR,
                                       self._score,
                                       self._optimum_contract_score,
                                       self.metadata['video.frames_per_second'])
 
+        elif mode == 'rgb_array':
+            # obraz interfejsu graficznego w pamięci - tło i ręce rysowane są raz na rozdanie
+            if self._frame_renderer is None:
+                self._frame_renderer = FrameRenderer()
+
+            if self._frame_renderer.deal is not self._deal:
+                self._frame_renderer.new_deal(self._deal, [player.hand_splitted for player in self._players],
+                                              self._dealer_name)
+
+            return self._frame_renderer.update_view(self._last_contract_label(), self._player_call_label(0),
+                                                    self._player_call_label(1), self._player_call_label(2),
+                                                    self._player_call_label(3),
+                                                    PAIR,
+                                                    self._score,
+                                                    self._optimum_contract_score)
+
         elif mode == 'console':
             # wersja konsolowa
             if self._viewer is None:
@@ -317,33 +522,79 @@ class AuctionEnv(gym.Env):
 
             else:
                 print('')
-                if self._double:
-                    print('LAST_contract: ' + self._last_contract.__str__() + ' X')
-
-                elif self._redouble:
-                    print('LAST_contract: ' + self._last_contract.__str__() + ' XX')
-
-                else:
-                    print('LAST_contract: ' + self._last_contract.__str__())
+                print('LAST_contract: ' + self._last_contract_label(' '))
 
                 print('Pair: ' + PAIR[0] + '  ' + PAIR[1])
                 print('Score: ' + str(self._score[0]) + '  ' + str(self._score[1]))
                 print('Optimum score: ' + str(self._optimum_contract_score[0]) + '  ' +
                       str(self._optimum_contract_score[1]))
                 print(' ')
-                print('NORTH_contract: ' + self._players[0].player_contracts.__str__())
-                print('EAST_contract: ' + self._players[1].player_contracts.__str__())
-                print('SOUTH_contract: ' + self._players[2].player_contracts.__str__())
-                print('WEST_contract: ' + self._players[3].player_contracts.__str__())
+                print('NORTH_contract: ' + self._player_call_label(0))
+                print('EAST_contract: ' + self._player_call_label(1))
+                print('SOUTH_contract: ' + self._player_call_label(2))
+                print('WEST_contract: ' + self._player_call_label(3))
                 print(' ')
 
         else:
             # błąd przy wpisaniu niedostępnej opcji
             raise error.UnsupportedMode('Unsupported render mode' + mode)
 
+    def _last_contract_label(self, separator=''):
+        """Napis z najwyższym zgłoszonym kontraktem (z kontrą lub rekontrą oddzieloną napisem separator) - 'None' przed
+        pierwszym działaniem, 'pass', gdy nie zgłoszono odzywki"""
+
+        if not auction_core.is_started(self._auction):
+            return str(None)
+
+        label = str(self._available_contracts[auction_core.contract(self._auction)])
+        double = auction_core.double(self._auction)
+
+        if double == 0:
+            return label
+
+        return label + separator + ('X' if double == 1 else 'XX')
+
+    def _player_call_label(self, player):
+        """Napis z ostatnią odzywką/zapowiedzią gracza o indeksie player ('None', gdy gracz jeszcze nie licytował)"""
+
+        call = auction_core.player_call(self._auction, player)
+
+        return str(None if call == auction_core.NO_CALL else self._available_contracts[call])
+
+    def seed(self, seed=None):
+        """Ustawienie ziarna generatorów liczb losowych środowiska (wybór rozdającego, rozdania z puli) i źródła
+        rozdań - zwraca listę z ziarnem (wylosowanym, gdy seed jest None). Ziarnem może być też obiekt SeedSequence.
+        Źródło rozdań przygotowywanych w tle nie jest ustawiane, bo kolejność rozdań zależy wtedy od pracy wątków."""
+
+        sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        env_sequence, source_sequence = sequence.spawn(2)
+        self._rng = np.random.default_rng(env_sequence)
+
+        if hasattr(self._deal_source, 'seed'):
+            self._deal_source.seed(source_sequence)
+
+        return [sequence.entropy]
+
+    def stats(self):
+        """Liczniki czasu i liczby wywołań etapów działania środowiska (PhaseTimer.stats) - None, gdy pomiar nie został
+        włączony parametrem profile"""
+
+        return None if self._timer is None else self._timer.stats()
+
+    def reset_stats(self):
+        """Wyzerowanie liczników czasu etapów działania środowiska"""
+
+        if self._timer is not None:
+            self._timer.reset()
+
     def close(self):
         """Zamknięcie środowiska i zakończenie programu"""
 
+        if self._prefetch is not None:
+            # zatrzymanie wątków przygotowujących rozdania
+            self._prefetch.close()
+            self._prefetch = None
+
         if self._viewer is True:
             # jak mode == 'human'
             self._viewer = None
@@ -354,338 +605,136 @@ class AuctionEnv(gym.Env):
             self._viewer = None
             quit()
 
-    def _choose_dealer_and_order(self):
-        """Wybór rozdającego oraz ustalenie kolejności licytacji"""
-
-        # wylosowanie rozdającego
-        dealer = random.choice(range(len(self._players)))
-        self._dealer_name = self._players[dealer].name
+    def _new_deal(self):
+        """Pobranie nowego rozwiązanego rozdania ze źródła rozdań i wylosowanie rozdającego, który rozpoczyna
+        licytację"""
 
-        # ustawienie graczy w odpowiedniej kolejności podczas licytacji
-        self._index_order = 0
-        self._players_order.append(self._players[dealer])
+        if isinstance(self._deal_source, DealPool):
+            deal = self._deal_source.get(int(self._rng.integers(len(self._deal_source))))
 
-        if dealer < len(self._players) - 1:
-            for i in range(dealer + 1, len(self._players)):
-                self._players_order.append(self._players[i])
-        if dealer > 0:
-            for i in range(0, dealer):
-                self._players_order.append(self._players[i])
+        else:
+            deal = self._deal_source.next_deals(1)[0]
 
-    def _pbn_deal_representation(self):
-        """Dane rozdanie w formacie PBN"""
+        self._set_deal(deal, int(self._rng.integers(self._n_players)))
 
-        pbn = ""
-        pbn += self._dealer_name
-        pbn += ':'
+    def _set_deal(self, deal, dealer):
+        """Ustawienie rozdania i rozdającego - utworzenie graczy i wstawienie wyników z solvera"""
 
-        for j in range(0, self._n_players):
+        self._deal = deal
+        self._dealer = dealer
 
-            for i in range(0, 4):
-                list_pom = self._players[j].hand_splitted[i].split()
+        # utworzenie listy graczy - napisy z rękami do wyświetlania wyznaczane są dopiero podczas renderowania
+        self._players = [Player(NAMES[i], deal[0][i]) for i in range(0, self._n_players)]
+        self._dealer_name = self._players[dealer].name
+        self._insert_solver_results()  # wstawienie wyników z solvera dla poszczególnych graczy
 
-                for k in list_pom:
-                    if k == '10':
-                        pbn += 'T'
-                    else:
-                        pbn += k
+        if self._observation is not None:
+            # tryb 'array' - ręce graczy wpisywane do bufora obserwacji raz na rozdanie
+            self._hands[:] = deal[0]
 
-                if i < 3:
-                    pbn += '.'
+        if self._features is not None:
+            # cechy rąk wyznaczane raz na rozdanie (w trybie 'array' wpisywane do bufora obserwacji)
+            self._features[:] = hand_features(deal[0])
 
-            if j < 3:
-                pbn += " "
+    def _pbn_deal_representation(self):
+        """Dane rozdanie w formacie PBN - ręce podawane są kolejno od gracza N, więc rozdanie zaczyna się od 'N:'
+        (wyniki solvera nie zależą od tego, kto jest rozdającym)"""
 
-        return pbn
+        return hands_to_pbn(self._deal[0])
 
     def _insert_solver_results(self):
         """Przypisanie wszystkim graczom odpowiednich rezultatów o maksymalnej ilości wziętych lew oraz wartości
         punktowych za optymalne kontrakty dla par otrzymanych z Dummy Double Solver"""
 
-        pbn_repr = self._pbn_deal_representation()
-        solver_results = get_results_from_solver(pbn_repr, self._players.index(self._players_order[0]))
+        # wyniki solvera zapisane razem z rozdaniem (przez źródło rozdań)
+        solver_results = (self._deal[1], self._deal[2][self._dealer])
 
         # maksymalna ilość wziętych lew dla danego miana
         for i in range(0, self._n_players):
-            self._players[i].number_of_trick = get_solver_result_for_player(i, solver_results[0])
-            self._players[i].makeable_contracts = max_contract_for_suit(self._players[i].number_of_trick)
+            self._players[i].number_of_tricks = get_solver_result_for_player(i, solver_results[0])
+            self._players[i].makeable_contracts = max_contract_for_suit(self._players[i].number_of_tricks)
+
+        # zapisy dla wszystkich kontraktów, rozgrywających i stanów kontry/rekontry
+        self._score_table = deal_score_table(solver_results[0])
 
         # wartości punktowe za optymalny kontrakt dla każdej z par
         self._optimum_contract_score[0] = solver_results[1]
         self._optimum_contract_score[1] = - self._optimum_contract_score[0]
 
     def _get_game_state(self, action, reset):
-        """Wyznaczenie przestrzeni obserwacji"""
-
-        state = {}
+        """Wyznaczenie przestrzeni obserwacji - po działaniu agenta (reset = False) najpierw wyznaczany jest nowy stan
+        licytacji"""
 
         if reset:
-            # przestrzeń obserwacji dla funkcji reset
-            # ustawienie stanu początkowego środowiska
-            for i in range(0, len(self._players)):
-                self._players[i].player_contracts = None
-                self._players[i].win_auction = False
-
-            state['whose turn'] = None
-            state['whose next turn'] = self._players.index(self._players_order[0])
-            state['LAST_contract'] = None
-            state['Player_contract'] = None
-            state['winning_pair'] = None
-            state['double/redouble'] = 0
-            self._last_contract = None
-            state['Players hands'] = [[] for _ in range(0, self._n_players)]
+            # przestrzeń obserwacji dla funkcji reset - stan początkowy środowiska
+            state = self._auction_observation()
 
             # reprezentacja rąk graczy w formie 0/1 jest dostępna tylko zaraz po zresetowaniu stanu środowiska
-            for player in enumerate(self._players):
-                state['Players hands'][player[0]] = player[1].hand_representation
+            state['Players hands'] = [player.hand_representation for player in self._players]
 
-        else:
-            # przestrzeń obserwacji po wykonaniu akcji przez agenta
-            # indeks gracza aktualnie licytującego
-            player_index = self._players.index(self._players_order[self._index_order])
-            state['whose turn'] = player_index
+            if self._features is not None:
+                state['Hand features'] = self._features.copy()
 
-            # indeks gracza, który jest następny w kolejności do licytacji
-            if player_index == 3:
-                state['whose next turn'] = 0
+            return state
 
-            else:
-                state['whose next turn'] = player_index + 1
+        # przejście licytacji do nowego stanu (odczyt z tablicy przejść)
+        self._auction = auction_core.next_state(self._auction, action)
 
-            # ustalenie stanów określających najwyższą zgłoszoną odzywkę, która może być z kontrą, rekontrą lub bez
-            if self._last_contract is None:
-                # początek licytacji
-                state['LAST_contract'] = action
-                self._last_contract = self._available_contracts[action]
-                state['double/redouble'] = 0
+        return self._auction_observation()
 
-                if action == 0:
-                    # działanie to pas
-                    self._first_bind_pass = True
-                    self._players[player_index].win_auction = False
+    def _auction_observation(self):
+        """Stany licytacji (bez rąk graczy) wyznaczone z bieżącego stanu licytacji - gdy nie zgłoszono żadnej odzywki,
+        najwyższy kontrakt to pas i żadna z par nie wygrywa"""
 
-                else:
-                    # działanie jest jakąlkolwiek odzywką
-                    self._players[player_index].win_auction = True
+        auction = self._auction
 
-            elif (action < self._last_contract.value or self._last_contract.value == 0) and action != 0:
-                # dalszy przebieg licytacji
-                # działanie to nie kontra/rekontra/pas lub wszyscy gracze od początku licytacji spasowali
-                # i obecne działanie nie jest pasem
+        if not auction_core.is_started(auction):
+            # stan początkowy - licytację rozpoczyna rozdający
+            return {'whose turn': None, 'whose next turn': auction_core.next_player(auction), 'LAST_contract': None,
+                    'Player_contract': None, 'winning_pair': None, 'double/redouble': 0}
 
-                state['LAST_contract'] = action
-                self._last_contract = self._available_contracts[action]
-                self._first_bind_pass = False
+        player = auction_core.last_player(auction)
 
-                for i in range(0, len(self._players)):
-                    self._players[i].win_auction = False
+        return {'whose turn': player, 'whose next turn': auction_core.next_player(auction),
+                'LAST_contract': auction_core.contract(auction),
+                'Player_contract': auction_core.player_call(auction, player),
+                'winning_pair': auction_core.winning_pair(auction), 'double/redouble': auction_core.double(auction)}
 
-                self._players[player_index].win_auction = True
+    def _write_observation(self, state):
+        """Zapisanie stanów licytacji do bufora obserwacji (tryb 'array') - zwraca bufor"""
 
-                # nowa odzywka kasuje zgłoszoną kontrę lub rekontrę
-                state['double/redouble'] = 0
-                self._redouble = False
-                self._double = False
+        self._observation[:OBSERVATION_HANDS_OFFSET] = [-1 if state[key] is None else state[key]
+                                                        for key in OBSERVATION_KEYS]
 
-            else:
-                # jeśli działanie to kontra/rekontra/pas
-                state['LAST_contract'] = self._last_contract.value
-
-                if action == 36:
-                    # kontra
-                    state['double/redouble'] = 1
-                    self._double = True
-                    self._first_bind_pass = False
-
-                elif action == 37:
-                    # rekontra
-                    state['double/redouble'] = 2
-                    self._redouble = True
-                    self._double = False
-                    self._first_bind_pass = False
-
-                else:
-                    # pas
-                    if self._double:
-                        state['double/redouble'] = 1
-
-                    elif self._redouble:
-                        state['double/redouble'] = 2
-
-                    else:
-                        state['double/redouble'] = 0
-
-            # odzywka/zapowiedź zgłoszona przez aktualnie licytującego agenta
-            self._players[player_index].player_contracts = self._available_contracts[action]
-            state['Player_contract'] = action
-
-            # ustalenie do której z par należy najwyższy zgłoszony kontrakt w danym momencie
-            # na koniec epizodu jest to para wygrywająca licytację
-            for player in self._players:
-                if player.win_auction is True:
-                    if self._players.index(player) in WIN_PAIR[0]:
-                        state['winning_pair'] = 0
-
-                    elif self._players.index(player) in WIN_PAIR[1]:
-                        state['winning_pair'] = 1
-
-            if state['LAST_contract'] == 0:
-                # przypadek gdy na początku licytacji (lub w kolejnych dalszych krokach) zgłoszono pas
-                # wtedy żadna z par nie wygrywa licytacji
-                state['winning_pair'] = None
-
-        return state
+        return self._observation
 
     def _get_reward(self, state, action):
-        """Wyznaczenie nagrody za wykonane działanie przez jednego z agentów"""
-
-        reward = [None, None]
+        """Wyznaczenie nagrody za wykonane działanie przez jednego z agentów - zapis odczytywany jest z tablicy zapisów
+        dla rozdania (deal_score_table)"""
 
-        if self._last_contract.value == 0:
-            # przypadek gdy na początku licytacji (lub ewentualnie w dalszych krokach) zgłoszono pas
-            # - nie ustalono kontraktu
-            self._score = [0, 0]
-            reward[0] = self._score[0] - self._optimum_contract_score[0]
-            reward[1] = - reward[0]
+        if action == 0 and state['LAST_contract'] > 0:
+            # działanie agenta to pas po zgłoszonej odzywce - nagroda się nie zmienia
+            return self._reward
 
-        else:
-            # ustalono jakiś kontrakt
-            ind_w = state['winning_pair']  # indeks pary z najwyższym zgłoszonym kontraktem
-            ind_o = None  # indeks pary przeciwnej
-
-            for i in enumerate(WIN_PAIR):
-                if i[0] != ind_w:
-                    ind_o = i[0]
-
-            optimum_contract_score = self._optimum_contract_score[ind_w]
+        score = self._auction_score()
+        self._score = [score, -score]
+        reward = score - self._optimum_contract_score[0]
 
-            if action == 0:  # działanie agenta to pas
-                reward = self._reward
+        return [reward, -reward]
 
-            else:
-                # działanie agenta to odzywka licytacyjna lub kontra/rekontra
-                bind_trump = self._last_contract.suit
-                bind_number = self._last_contract.number
-
-                if action != 36 and action != 37:
-                    self._max_contract = self._players[state['whose turn']].makeable_contracts[bind_trump]
-                    self._max_number_of_tricks = self._players[state['whose turn']].number_of_trick[bind_trump]
-
-                number_of_tricks = bind_number + 6
-                trick_difference = number_of_tricks - self._max_number_of_tricks
-
-                if bind_number <= self._max_contract:
-                    # kontrakt jest realizowalny
-                    # punkty za lewy
-                    if bind_trump == 'NT':
-                        self._score[ind_w] = CONTRACT_POINTS['NT'][0] + (bind_number - 1) * CONTRACT_POINTS['NT'][1]
-
-                    else:
-                        self._score[ind_w] = bind_number * CONTRACT_POINTS[bind_trump]
-
-                    # punkty za kontrę lub rekontrę plus premie
-                    if state['double/redouble'] == 1:
-                        # kontra
-                        self._score[ind_w] *= CONTRACT_POINTS['X']
-                        self._score[ind_w] += BONUS['DOUBLE']
-
-                    elif state['double/redouble'] == 2:
-                        # rekontra
-                        self._score[ind_w] *= CONTRACT_POINTS['XX']
-                        self._score[ind_w] += BONUS['REDOUBLE']
-
-                    # premie za częściówki, dograne
-                    if self._score[ind_w] < 100:
-                        # częściówki
-                        self._score[ind_w] += BONUS['PARTIAL-GAME']
-
-                    else:
-                        # dograne
-                        self._score[ind_w] += BONUS['GAME']
-
-                    # premie szlemiki, szlemy
-                    if bind_number == 6:
-                        # szlemiki
-                        self._score[ind_w] += BONUS['SLAM']
-
-                    elif bind_number == 7:
-                        # szlemy
-                        self._score[ind_w] += BONUS['GRAND_SLAM']
-
-                    # premie za nadróbki
-                    if bind_number != self._max_contract:
-                        if state['double/redouble'] == 0:
-                            # nadróbki bez kontry/rekontry
-                            if bind_trump == 'NT':
-                                self._score[ind_w] += CONTRACT_POINTS['NT'][1] * (self._max_contract - bind_number)
-
-                            else:
-                                self._score[ind_w] += CONTRACT_POINTS[bind_trump] * (self._max_contract - bind_number)
-
-                        elif state['double/redouble'] == 1:
-                            # nadróbki z kontrą
-                            self._score[ind_w] += BONUS['OVERTRICKS_DOUBLE'] * (self._max_contract - bind_number)
-
-                        elif state['double/redouble'] == 2:
-                            # nadróbki z rekontrą
-                            self._score[ind_w] += BONUS['OVERTRICKS_REDOUBLE'] * (self._max_contract - bind_number)
-
-                    self._score[ind_o] = -self._score[ind_w]
-                    reward[ind_w] = self._score[ind_w] - optimum_contract_score
-                    reward[ind_o] = -reward[ind_w]
-
-                else:
-                    # kontrakt nie jest realizowalny
-                    if state['double/redouble'] == 0:
-                        # nie było kontry lub rekontry
-                        self._score[ind_o] = PENALTY_POINTS['NO DOUBLE/REDOUBLE'] * trick_difference
-
-                    elif state['double/redouble'] == 1:
-                        # była kontra
-                        self._score[ind_o] = PENALTY_POINTS['DOUBLE'][0] + \
-                                             PENALTY_POINTS['DOUBLE'][0] * PENALTY_POINTS['DOUBLE'][1] * \
-                                             (trick_difference - 1)
-
-                        # premia za czwartą i każdą następną lewę wpadkową
-                        if trick_difference >= 4:
-                            self._score[ind_o] += PENALTY_POINTS['DOUBLE'][0] * (trick_difference - 3)
-
-                    elif state['double/redouble'] == 2:
-                        # była rekonta
-                        self._score[ind_o] = PENALTY_POINTS['REDOUBLE'][0] + \
-                                             PENALTY_POINTS['REDOUBLE'][0] * PENALTY_POINTS['REDOUBLE'][1] \
-                                             * (trick_difference - 1)
-
-                        # premia za czwartą i każdą następną lewę wpadkową
-                        if trick_difference >= 4:
-                            self._score[ind_o] += PENALTY_POINTS['REDOUBLE'][0] * (trick_difference - 3)
-
-                    self._score[ind_w] = -self._score[ind_o]
-                    reward[ind_w] = self._score[ind_w] - optimum_contract_score
-                    reward[ind_o] = - reward[ind_w]
-
-        return reward
-
-    def _is_over(self, action):
-        """Wyznaczenie warunku końca licytacji"""
-
-        if action == 0:
-            self._pass_number += 1
+    def _auction_score(self):
+        """Zapis pary N-S dla najwyższej zgłoszonej odzywki w bieżącym stanie licytacji (z kontrą/rekontrą, rozgrywa
+        gracz, który zgłosił tę odzywkę) - 0, gdy nie zgłoszono odzywki"""
 
-        else:
-            self._pass_number = 0
+        contract = auction_core.contract(self._auction)
 
-        if self._pass_number == 3 and (not self._first_bind_pass):
-            # kolejno troje graczy pasuje po ustalonym kontrakcie
-            return True
+        if contract == 0:
+            return 0
 
-        elif self._first_bind_pass and self._pass_number == 4:
-            # nie ustalono kontraktu - na początku licytacji wszyscy gracze spasowali
-            return True
+        return int(self._score_table[contract, auction_core.declarer(self._auction),
+                                     auction_core.double(self._auction)])
 
-        elif self._last_contract.value == 1 and self._redouble:
-            # ostateczny kontrakt to 7NT, a po tym nastąpiła kontra i rekontra
-            return True
+    def _is_over(self):
+        """Wyznaczenie warunku końca licytacji (trzy pasy po odzywce, cztery pasy bez odzywki lub rekontra po 7NT)"""
 
-        else:
-            return False
+        return auction_core.is_over(self._auction)
@@ -0,0 +1,174 @@
+import numpy as np
+from gym_bridge_auction.envs import auction_core
+from gym_bridge_auction.envs.auction_core import N_ACTIONS, TRANSITIONS, LEGAL, OVER
+from gym_bridge_auction.envs.deal_pool import DealPool, get_deal_pool
+from gym_bridge_auction.envs.hand_features import N_HAND_FEATURES, hand_features
+from gym_bridge_auction.envs.scoring import deal_scores
+
+
+class BridgeAuctionVecEnv:
+    """Wektorowa wersja środowiska AuctionEnv - N niezależnych licytacji przechowywanych jako tablice NumPy
+    kodów stanu auction_core. Krok przyjmuje tablicę N działań i aktualizuje wszystkie licytacje odczytem z tablic
+    przejść, dostępnych działań i końca licytacji auction_core, bez pętli Pythona po poszczególnych stołach.
+
+    Zasady licytacji są wspólne z AuctionEnv (auction_core), a obserwacje i nagrody są takie same jak w AuctionEnv.
+    Zakończone licytacje są automatycznie rozpoczynane od nowa z nowym rozdaniem pobranym z puli rozwiązanych rozdań
+    (DealPool) lub innego źródła rozdań (obiekt z metodą next_deals).
+
+    Obserwacja to słownik tablic o długości N z kluczami jak w AuctionEnv, gdzie brak wartości (None) oznaczono
+    liczbą -1, oraz 'Players hands' - ręce graczy w formie 0/1 o wymiarach (N, 4, 52) i opcjonalnie 'Hand features'
+    - cechy rąk graczy (hand_features.HAND_FEATURES) o wymiarach (N, 4, N_HAND_FEATURES), wyznaczane wsadowo dla
+    nowych rozdań. Nagroda to tablica (N, 2) - kolumna 0 dla pary N-S, a 1 dla pary E-W. Dla zakończonych licytacji
+    zwracana jest obserwacja początkowa nowego rozdania, a nagroda i informacje w info dotyczą ostatniego kroku
+    zakończonej licytacji.
+
+    Tablice 'Players hands' i 'Hand features' obserwacji oraz info['action mask'] (action_masks) to bufory środowiska
+    zmieniane w miejscu przez kolejne wywołania step() i reset() - są aktualne tylko do następnego wywołania (do
+    przechowywania należy wykonać kopię). Pozostałe tablice obserwacji, nagrody, done i info tworzone są w każdym
+    wywołaniu od nowa."""
+
+    def __init__(self, num_envs, deal_source, seed=None, hand_features=False):
+        """Parametry:
+            num_envs (int) - liczba równoległych licytacji
+            deal_source - pula rozwiązanych rozdań (DealPool lub ścieżka do pliku) albo inne źródło rozdań
+            seed (int) - ziarno generatora liczb losowych (wybór rozdań z puli i rozdających)
+            hand_features (bool) - dołączenie do obserwacji cech rąk graczy ('Hand features')"""
+
+        self.num_envs = num_envs
+        self._deal_source = get_deal_pool(deal_source) if isinstance(deal_source, str) else deal_source
+        self._rng = np.random.default_rng(seed)
+        self._rows = np.arange(num_envs)
+
+        # rozdania
+        self._hands = np.zeros((num_envs, 4, 52), dtype=np.uint8)  # ręce graczy N, E, S, W
+        self._tricks = np.zeros((num_envs, 20), dtype=np.intp)  # liczby lew (kolejność jak w wynikach solvera)
+        self._par = np.zeros(num_envs, dtype=np.int32)  # zapis optymalny dla pary N-S
+        self._dealer = np.zeros(num_envs, dtype=np.int32)  # indeks rozdającego
+        # cechy rąk graczy (None - cechy wyłączone)
+        self._features = np.zeros((num_envs, 4, N_HAND_FEATURES), dtype=np.int8) if hand_features else None
+
+        # stan licytacji
+        self._codes = np.zeros(num_envs, dtype=np.int32)  # kody stanu licytacji (auction_core)
+        self._whose_turn = np.full(num_envs, -1, dtype=np.int32)  # gracz licytujący w ostatnim kroku (-1 - brak)
+        self._player_contract = np.full(num_envs, -1, dtype=np.int32)  # ostatnia odzywka/zapowiedź
+        self._score = np.zeros(num_envs, dtype=np.int32)  # zapis dla pary N-S
+        self._reward = np.zeros(num_envs, dtype=np.int32)  # nagroda dla pary N-S
+        self.action_masks = np.zeros((num_envs, N_ACTIONS), dtype=bool)  # dostępne działania dla każdej licytacji
+
+    def reset(self):
+        """Nowe rozdania i początkowy stan wszystkich licytacji - 'Players hands', 'Hand features' i action_masks
+        to bufory zmieniane przez kolejne wywołania step() i reset()"""
+
+        # nowe tablice stanu - obserwacja zwrócona przez poprzedni krok nie jest zmieniana
+        self._whose_turn = np.empty(self.num_envs, dtype=np.int32)
+        self._player_contract = np.empty(self.num_envs, dtype=np.int32)
+        self._reset_tables(self._rows)
+
+        return self._get_observation()
+
+    def step(self, actions):
+        """Wykonanie po jednym działaniu w każdej z licytacji.
+
+        Parametr:
+            actions - tablica N działań (numeracja jak w przestrzeni akcji AuctionEnv)
+
+        Zwraca:
+            observation, reward, done, info : tuple
+                observation (dict) - słownik tablic ze stanem licytacji
+                reward (np.ndarray) - nagrody dla par N-S i E-W, wymiary (N, 2)
+                done (np.ndarray) - informacja o końcu licytacji dla każdego stołu
+                info (dict) - 'pair score' i 'optimum score' (wymiary (N, 2)) oraz 'action mask' - dostępne działania
+                po kroku, wymiary (N, 38)
+
+        Tablice observation['Players hands'], observation['Hand features'] i info['action mask'] to bufory środowiska
+        aktualne tylko do następnego wywołania step() lub reset()."""
+
+        # kopia - tablica działań staje się tablicą 'Player_contract' zmienianą przy automatycznym resecie
+        actions = np.array(actions, dtype=np.int32)
+        assert self.action_masks[self._rows, actions].all(), "invalid actions"
+
+        # stan licytacji po działaniu - odczyt z tablicy przejść auction_core
+        self._whose_turn = auction_core.next_player(self._codes)
+        self._player_contract = actions
+        self._codes = TRANSITIONS[self._codes, actions].astype(np.int32)
+        contracts = auction_core.contract(self._codes)
+
+        # zapis i nagroda (jak w AuctionEnv._get_reward) - pas po ustalonym kontrakcie nie zmienia nagrody
+        score = deal_scores(self._tricks, contracts, auction_core.declarer(self._codes),
+                            auction_core.double(self._codes))
+        unchanged = (actions == auction_core.PASS) & (contracts > 0)
+        self._score = np.where(unchanged, self._score, score)
+        self._reward = np.where(unchanged, self._reward, self._score - self._par)
+
+        reward = np.stack([self._reward, -self._reward], axis=1)
+        info = {'pair score': np.stack([self._score, -self._score], axis=1),
+                'optimum score': np.stack([self._par, -self._par], axis=1)}
+
+        # koniec licytacji (auction_core.OVER) i dostępne działania w nowym stanie
+        done = OVER[self._codes]
+        self.action_masks[:] = LEGAL[self._codes]
+
+        # automatyczny reset zakończonych licytacji
+        finished = np.flatnonzero(done)
+        if len(finished) > 0:
+            self._reset_tables(finished)
+
+        info['action mask'] = self.action_masks
+
+        return self._get_observation(), reward, done, info
+
+    def close(self):
+        """Zamknięcie środowiska"""
+
+        pass
+
+    def _draw_deals(self, count):
+        """Pobranie count rozwiązanych rozdań - ręce, liczby lew i zapisy optymalne dla każdego rozdającego"""
+
+        if isinstance(self._deal_source, DealPool):
+            return self._deal_source.get_arrays(self._rng.integers(len(self._deal_source), size=count))
+
+        deals = self._deal_source.next_deals(count)
+
+        return np.array([deal[0] for deal in deals], dtype=np.uint8).reshape(count, 4, 52), \
+            np.array([deal[1] for deal in deals], dtype=np.int32).reshape(count, 20), \
+            np.array([deal[2] for deal in deals], dtype=np.int32).reshape(count, -1)
+
+    def _reset_tables(self, rows):
+        """Nowe rozdania i początkowy stan licytacji dla stołów o podanych indeksach"""
+
+        hands, tricks, pars = self._draw_deals(len(rows))
+        dealer = self._rng.integers(4, size=len(rows))
+
+        self._hands[rows] = hands
+        self._tricks[rows] = tricks
+        self._dealer[rows] = dealer
+        self._par[rows] = pars[np.arange(len(rows)), dealer]
+
+        if self._features is not None:
+            self._features[rows] = hand_features(hands)
+
+        self._codes[rows] = auction_core.initial_state(dealer) & auction_core.CODE_MASK
+        self._whose_turn[rows] = -1
+        self._player_contract[rows] = -1
+        self._score[rows] = 0
+        self._reward[rows] = 0
+        self.action_masks[rows] = LEGAL[self._codes[rows]]
+
+    def _get_observation(self):
+        """Obserwacja dla wszystkich licytacji"""
+
+        contracts = auction_core.contract(self._codes)
+        # przed pierwszym działaniem najwyższa odzywka nie jest określona (-1), a po pasach wynosi 0
+        observation = {'whose turn': self._whose_turn,
+                       'whose next turn': auction_core.next_player(self._codes),
+                       'LAST_contract': np.where(self._whose_turn >= 0, contracts, -1),
+                       'Player_contract': self._player_contract,
+                       'winning_pair': np.where(contracts > 0, auction_core.declarer(self._codes) % 2, -1),
+                       'double/redouble': auction_core.double(self._codes),
+                       'Players hands': self._hands}
+
+        if self._features is not None:
+            observation['Hand features'] = self._features
+
+        return observation
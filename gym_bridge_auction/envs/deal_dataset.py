@@ -0,0 +1,268 @@
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+from gym_bridge_auction.envs import solver_binding
+from gym_bridge_auction.envs.game import random_deals, hands_to_pbn
+from gym_bridge_auction.envs.deal_pool import POOL_HEADER_SIZE, pack_hands, read_pool_header, write_deal_pool
+
+# Zbiór rozwiązanych rozdań generowany poza środowiskiem - katalog z częściami (shards) w formacie puli rozdań
+# (każdą część można otworzyć jako DealPool, zapisy optymalne dla każdego rozdającego i strefy) oraz plik
+# manifest.json z parametrami generowania, liczbą rozdań i sumą kontrolną SHA-256 każdej zakończonej części.
+#
+# Rozdania części i wyznaczane są przez generator NumPy z ziarnem (seed, i), więc przerwane generowanie można
+# wznowić od pierwszej niezakończonej części z takim samym wynikiem. Rozdania powtórzone (w tej samej lub we
+# wcześniejszych częściach) są pomijane i zastępowane kolejnymi losowymi rozdaniami.
+MANIFEST = 'manifest.json'
+SHARD_PATTERN = 'deals-{:05d}.pool'
+DEFAULT_SHARD_SIZE = 100000
+CHUNK_SIZE = 200  # liczba rozdań rozwiązywanych przez proces roboczy jednym wywołaniem
+
+_MIX = [np.uint64(0x9E3779B97F4A7C15), np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB)]
+
+
+def deal_keys(packed_hands):
+    """64-bitowe skróty rozdań (mieszanie typu splitmix64) wyznaczone ze spakowanych rąk (liczba rozdań, 26) -
+    różne skróty oznaczają różne rozdania"""
+
+    packed_hands = np.asarray(packed_hands, dtype=np.uint8)
+    words = np.zeros((len(packed_hands), 32), dtype=np.uint8)
+    words[:, :packed_hands.shape[1]] = packed_hands
+    words = words.view('<u8')
+    keys = np.zeros(len(packed_hands), dtype=np.uint64)
+
+    for i in range(0, words.shape[1]):
+        keys ^= words[:, i]
+        keys += _MIX[0]
+        keys = (keys ^ (keys >> np.uint64(30))) * _MIX[1]
+        keys = (keys ^ (keys >> np.uint64(27))) * _MIX[2]
+        keys ^= keys >> np.uint64(31)
+
+    return keys
+
+
+def _file_checksum(path):
+    """Suma kontrolna SHA-256 pliku"""
+
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _read_packed_hands(path):
+    """Spakowane ręce wszystkich rozdań z pliku części"""
+
+    record, count = read_pool_header(path)
+
+    return np.fromfile(path, dtype=record, count=count, offset=POOL_HEADER_SIZE)['hands']
+
+
+def _write_json(path, data):
+    """Zapisanie pliku JSON w sposób niepodzielny (zapis do pliku tymczasowego i zmiana nazwy)"""
+
+    with open(path + '.tmp', 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(path + '.tmp', path)
+
+
+def dataset_shards(directory):
+    """Ścieżki zakończonych części zbioru (według manifestu), w kolejności numerów"""
+
+    with open(os.path.join(directory, MANIFEST)) as file:
+        manifest = json.load(file)
+
+    return [os.path.join(directory, name) for name in sorted(manifest['shards'])]
+
+
+def _new_deals(rng, count, seen):
+    """count losowych rozdań nieobecnych w zbiorze skrótów seen (posortowana tablica) i różnych od siebie - zwraca
+    ręce w formie 0/1 i skróty rozdań"""
+
+    hands = np.zeros((0, 4, 52), dtype=np.uint8)
+    keys = np.zeros(0, dtype=np.uint64)
+
+    while len(hands) < count:
+        candidates = random_deals(count - len(hands), rng)
+        candidate_keys = deal_keys(pack_hands(candidates))
+        _, first = np.unique(candidate_keys, return_index=True)
+        fresh = np.zeros(len(candidates), dtype=bool)
+        fresh[first] = True
+        fresh &= ~np.isin(candidate_keys, keys)
+
+        if len(seen) > 0:
+            position = np.minimum(np.searchsorted(seen, candidate_keys), len(seen) - 1)
+            fresh &= seen[position] != candidate_keys
+
+        hands = np.concatenate([hands, candidates[fresh]])
+        keys = np.concatenate([keys, candidate_keys[fresh]])
+
+    return hands, keys
+
+
+def _init_worker(preset):
+    """Konfiguracja solvera w procesie roboczym"""
+
+    solver_binding.configure_preset(preset)
+
+
+def _solve(pbns):
+    """Rozwiązanie paczki rozdań - liczby lew i zapisy optymalne dla każdego rozdającego i strefy (liczba rozdań, 36)"""
+
+    return solver_binding.calc_tricks_and_par_table_batch(pbns)
+
+
+def generate_dataset(directory, n_deals, shard_size=DEFAULT_SHARD_SIZE, workers=None, seed=0, log=print):
+    """Wygenerowanie (lub dokończenie przerwanego generowania) zbioru n_deals rozwiązanych rozdań w katalogu
+    directory,
+    gdzie:
+    shard_size - liczba rozdań w jednej części
+    workers - liczba procesów roboczych z jednym wątkiem solvera (domyślnie liczba rdzeni; 0 - rozwiązywanie
+    w bieżącym procesie na wszystkich wątkach solvera)
+    seed - ziarno generatora rozdań
+    log - funkcja wyświetlająca postęp (None - bez komunikatów)
+
+    Zwraca listę ścieżek wszystkich części zbioru."""
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST)
+    parameters = {'shard_size': shard_size, 'seed': seed}
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+        if {key: manifest[key] for key in parameters} != parameters:
+            raise ValueError('Dataset in ' + directory + ' was generated with different parameters: ' +
+                             str({key: manifest[key] for key in parameters}))
+
+    else:
+        manifest = dict(parameters, shards={})
+
+    # zbiór można powiększyć, o ile zakończone części nie zmieniają rozmiaru
+    for shard, name in enumerate(sorted(manifest['shards'])):
+        if manifest['shards'][name]['deals'] != min(shard_size, n_deals - shard * shard_size):
+            raise ValueError('Dataset in ' + directory + ' has ' + name + ' of a different size')
+
+    manifest['n_deals'] = n_deals
+    _write_json(manifest_path, manifest)
+
+    # pozostałości przerwanego zapisu części
+    for path in glob.glob(os.path.join(directory, '*.tmp')):
+        os.remove(path)
+
+    # skróty rozdań z zakończonych części (sprawdzenie sum kontrolnych)
+    seen = [np.zeros(0, dtype=np.uint64)]
+
+    for name, entry in sorted(manifest['shards'].items()):
+        path = os.path.join(directory, name)
+
+        if not os.path.exists(path) or _file_checksum(path) != entry['sha256']:
+            raise ValueError('Checksum mismatch in ' + path)
+
+        seen.append(deal_keys(_read_packed_hands(path)))
+
+    seen = np.sort(np.concatenate(seen))
+    n_shards = -(-n_deals // shard_size)
+    pool = None
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers > 0:
+        pool = multiprocessing.get_context('fork').Pool(workers, initializer=_init_worker, initargs=('worker',))
+    else:
+        solver_binding.configure_preset('batch')
+
+    try:
+        for shard in range(0, n_shards):
+            name = SHARD_PATTERN.format(shard)
+
+            if name in manifest['shards']:
+                continue
+
+            start = time.perf_counter()
+            count = min(shard_size, n_deals - shard * shard_size)
+            hands, keys = _new_deals(np.random.default_rng([seed, shard]), count, seen)
+            pbns = [hands_to_pbn(deal) for deal in hands]
+            chunks = [pbns[i:i + CHUNK_SIZE] for i in range(0, count, CHUNK_SIZE)]
+            solved = np.concatenate(list(pool.imap(_solve, chunks)) if pool is not None else
+                                    [_solve(chunk) for chunk in chunks])
+
+            # część zapisywana jest do pliku tymczasowego, a po zmianie nazwy dopisywana do manifestu
+            path = os.path.join(directory, name)
+            write_deal_pool(path + '.tmp', hands, solved[:, :20], solved[:, 20:])
+            os.replace(path + '.tmp', path)
+            manifest['shards'][name] = {'deals': count, 'sha256': _file_checksum(path)}
+            _write_json(manifest_path, manifest)
+            seen = np.sort(np.concatenate([seen, keys]))
+
+            if log is not None:
+                log('{} - {} deals, {:.1f} deals/s'.format(name, count, count / (time.perf_counter() - start)))
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return dataset_shards(directory)
+
+
+def verify_dataset(directory):
+    """Sprawdzenie sum kontrolnych wszystkich części i braku powtórzonych rozdań - zwraca liczbę rozdań"""
+
+    keys = []
+
+    for path in dataset_shards(directory):
+        with open(os.path.join(directory, MANIFEST)) as file:
+            entry = json.load(file)['shards'][os.path.basename(path)]
+
+        if _file_checksum(path) != entry['sha256']:
+            raise ValueError('Checksum mismatch in ' + path)
+
+        keys.append(deal_keys(_read_packed_hands(path)))
+
+    keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.uint64)
+
+    if len(np.unique(keys)) != len(keys):
+        raise ValueError('Duplicate deals in ' + directory)
+
+    return len(keys)
+
+
+def main():
+    """Generowanie zbioru rozdań z wiersza poleceń:
+    python -m gym_bridge_auction.envs.deal_dataset katalog --deals 1000000"""
+
+    parser = argparse.ArgumentParser(description='Generate solved bridge deals (hands, trick tables, par scores)')
+    parser.add_argument('directory', help='output directory (an interrupted run is resumed)')
+    parser.add_argument('--deals', type=int, help='total number of deals (required unless --verify)')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='deals per shard file')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='solver processes (default - number of cores, 0 - solve in this process)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--verify', action='store_true', help='only verify checksums and uniqueness')
+    arguments = parser.parse_args()
+
+    if arguments.verify:
+        print('{} deals OK'.format(verify_dataset(arguments.directory)))
+        return
+
+    if arguments.deals is None:
+        parser.error('--deals is required')
+
+    generate_dataset(arguments.directory, arguments.deals, arguments.shard_size, arguments.workers, arguments.seed)
+
+
+if __name__ == '__main__':
+    main()
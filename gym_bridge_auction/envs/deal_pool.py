@@ -0,0 +1,168 @@
+import os
+import numpy as np
+from gym_bridge_auction.envs.deal_source import RandomDealSource
+
+# Format pliku z pulą rozwiązanych rozdań:
+# nagłówek o stałym rozmiarze, a po nim rekordy o stałym rozmiarze (po jednym na rozdanie)
+POOL_MAGIC = b'BRDGPOOL'
+POOL_VERSION = 2
+POOL_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4'), ('n_deals', '<u8')])
+POOL_HEADER_SIZE = 64
+# rekord - ręce graczy N, E, S, W (4 x 52 bity), 20 liczb lew (po 4 bity, kolejność jak w get_results_from_solver)
+# oraz zapisy dla pary N-S za optymalny kontrakt dla każdego rozdającego i strefy (kolejność jak w
+# solver_binding.par_index)
+POOL_RECORD = np.dtype([('hands', 'u1', (26,)), ('tricks', 'u1', (10,)), ('par', '<i2', (16,))])
+# rekordy kolejnych wersji formatu - wersja 1 zawiera tylko zapisy optymalne dla rozdających N, E, S, W (obie pary
+# przed partią) i jest nadal odczytywana
+POOL_RECORDS = {1: np.dtype([('hands', 'u1', (26,)), ('tricks', 'u1', (10,)), ('par', '<i2', (4,))]),
+                POOL_VERSION: POOL_RECORD}
+
+
+def pack_hands(hands):
+    """Zamiana rąk w formie 0/1 o wymiarach (liczba rozdań, 4, 52) na 26 bajtów na rozdanie"""
+
+    hands = np.asarray(hands, dtype=np.uint8)
+
+    return np.packbits(hands.reshape(len(hands), 4 * 52), axis=1)
+
+
+def unpack_hands(packed):
+    """Zamiana spakowanych rąk na reprezentację 0/1 o wymiarach (liczba rozdań, 4, 52)"""
+
+    packed = np.asarray(packed, dtype=np.uint8)
+
+    return np.unpackbits(packed, axis=1).reshape(len(packed), 4, 52)
+
+
+def pack_tricks(tricks):
+    """Zapisanie 20 liczb lew (wartości od 0 do 13) po 4 bity - 10 bajtów na rozdanie"""
+
+    tricks = np.asarray(tricks, dtype=np.uint8)
+
+    return (tricks[:, 0::2] << 4) | tricks[:, 1::2]
+
+
+def unpack_tricks(packed):
+    """Odtworzenie 20 liczb lew z postaci spakowanej po 4 bity"""
+
+    packed = np.asarray(packed, dtype=np.uint8)
+    tricks = np.empty((len(packed), 20), dtype=np.uint8)
+    tricks[:, 0::2] = packed >> 4
+    tricks[:, 1::2] = packed & 0x0F
+
+    return tricks
+
+
+def write_deal_pool(path, hands, tricks, pars):
+    """Zapisanie puli rozwiązanych rozdań do pliku,
+    gdzie:
+    hands - ręce graczy w formie 0/1, wymiary (liczba rozdań, 4, 52)
+    tricks - liczby lew z solvera, wymiary (liczba rozdań, 20)
+    pars - zapisy optymalne dla pary N-S dla każdego rozdającego i strefy, wymiary (liczba rozdań, 16)"""
+
+    records = np.zeros(len(hands), dtype=POOL_RECORD)
+    records['hands'] = pack_hands(hands)
+    records['tricks'] = pack_tricks(tricks)
+    records['par'] = pars
+
+    header = np.zeros(1, dtype=POOL_HEADER)
+    header['magic'] = POOL_MAGIC
+    header['version'] = POOL_VERSION
+    header['record_size'] = POOL_RECORD.itemsize
+    header['n_deals'] = len(records)
+
+    with open(path, 'wb') as pool_file:
+        pool_file.write(header.tobytes().ljust(POOL_HEADER_SIZE, b'\0'))
+        pool_file.write(records.tobytes())
+
+
+def build_deal_pool(path, n_deals, batch_size=200):
+    """Wygenerowanie n_deals losowych rozdań, rozwiązanie ich wsadowo za pomocą Double Dummy Solver i zapisanie puli
+    do pliku path. Koszt solvera ponoszony jest tylko raz, poza właściwym działaniem środowiska."""
+
+    source = RandomDealSource()
+    deals = []
+
+    for start in range(0, n_deals, batch_size):
+        deals += source.next_deals(min(batch_size, n_deals - start))
+
+    write_deal_pool(path, np.array([deal[0] for deal in deals], dtype=np.uint8).reshape(n_deals, 4, 52),
+                    np.array([deal[1] for deal in deals], dtype=np.uint8).reshape(n_deals, 20),
+                    np.array([deal[2] for deal in deals], dtype=np.int16).reshape(n_deals, 16))
+
+
+def read_pool_header(path):
+    """Sprawdzenie nagłówka pliku z pulą rozdań - zwraca typ rekordu wersji formatu zapisanej w pliku i liczbę
+    rozdań"""
+
+    header = np.fromfile(path, dtype=POOL_HEADER, count=1)
+
+    if len(header) == 0 or header[0]['magic'] != POOL_MAGIC or int(header[0]['version']) not in POOL_RECORDS or \
+            header[0]['record_size'] != POOL_RECORDS[int(header[0]['version'])].itemsize:
+        raise ValueError('Invalid deal pool file: ' + path)
+
+    return POOL_RECORDS[int(header[0]['version'])], int(header[0]['n_deals'])
+
+
+class DealPool:
+    """Pula rozwiązanych rozdań odczytywana z pliku odwzorowanego w pamięci (mmap) - pobranie rozdania to kilka
+    odczytów z tablicy, bez tasowania kart i wywoływania solvera"""
+
+    def __init__(self, path):
+        """Otwarcie pliku z pulą rozdań"""
+
+        record, n_deals = read_pool_header(path)
+        self.path = path
+        self._records = np.memmap(path, dtype=record, mode='r', offset=POOL_HEADER_SIZE, shape=(n_deals,))
+
+    def __len__(self):
+        """Liczba rozdań w puli"""
+
+        return len(self._records)
+
+    def get(self, index):
+        """Rozdanie o danym indeksie - krotka (ręce graczy N, E, S, W w formie 0/1 o wymiarach (4, 52),
+        lista 20 liczb lew, lista zapisów optymalnych dla każdego rozdającego i strefy - jak w źródłach rozdań;
+        dla puli w wersji 1 tylko 4 zapisy dla rozdających N, E, S, W)"""
+
+        hands, tricks, pars = self.get_arrays([index])
+
+        return hands[0], tricks[0].tolist(), pars[0].tolist()
+
+    def get_arrays(self, indices):
+        """Rozdania o podanych indeksach jako tablice NumPy - ręce graczy (liczba rozdań, 4, 52), liczby lew
+        (liczba rozdań, 20) oraz zapisy optymalne dla każdego rozdającego i strefy (liczba rozdań, 16; dla puli
+        w wersji 1 - (liczba rozdań, 4))"""
+
+        records = self._records[np.asarray(indices, dtype=np.int64)]
+
+        return unpack_hands(records['hands']), unpack_tricks(records['tricks']), records['par'].astype(np.int32)
+
+    def sample(self, rng=None):
+        """Losowe rozdanie z puli wybrane generatorem NumPy rng (domyślnie nowy generator z losowym ziarnem)"""
+
+        rng = np.random.default_rng() if rng is None else rng
+
+        return self.get(int(rng.integers(len(self._records))))
+
+    def next_deals(self, n_deals, rng=None):
+        """Lista n_deals losowych rozdań z puli wybranych generatorem NumPy rng (interfejs źródła rozdań, jak
+        w RandomDealSource)"""
+
+        rng = np.random.default_rng() if rng is None else rng
+
+        return [self.get(int(index)) for index in rng.integers(len(self._records), size=n_deals)]
+
+
+_deal_pools = {}  # otwarte pliki z pulami rozdań (jedno odwzorowanie pliku na proces)
+
+
+def get_deal_pool(path):
+    """Zwraca obiekt DealPool dla danej ścieżki, współdzielony przez wszystkie środowiska w procesie"""
+
+    path = os.path.abspath(path)
+
+    if path not in _deal_pools:
+        _deal_pools[path] = DealPool(path)
+
+    return _deal_pools[path]
@@ -0,0 +1,163 @@
+import queue
+import threading
+import numpy as np
+from gym_bridge_auction.envs.game import random_deals, deals_by_index, hands_to_pbn
+from gym_bridge_auction.envs.solver_results import get_results_from_solver_par_table_batch, hand_mask
+
+# Źródło rozdań to obiekt z metodą next_deals(n_deals), zwracającą listę rozwiązanych rozdań. Każde rozdanie to krotka:
+# (ręce graczy N, E, S, W w formie 0/1 o wymiarach (4, 52), lista 20 liczb lew z solvera,
+# lista zapisów dla pary N-S za optymalny kontrakt dla każdego rozdającego i strefy - kolejność jak w
+# solver_binding.par_index, pierwsze 4 zapisy dla rozdających N, E, S, W, gdy obie pary są przed partią)
+
+
+class RandomDealSource:
+    """Losowe rozdania - permutacje talii i rozwiązanie rozdań za pomocą Double Dummy Solver
+    (z wykorzystaniem pamięci podręcznej SolverCache, jeśli została podana)"""
+
+    def __init__(self, solver_cache=None, timer=None, seed=None):
+        """Utworzenie generatora liczb losowych i przypisanie pamięci podręcznej wyników solvera
+        (timer - opcjonalne liczniki PhaseTimer, do których dodawany jest czas wywołań solvera,
+        seed - ziarno generatora liczb losowych, domyślnie losowe)"""
+
+        self._rng = np.random.default_rng(seed)
+        self._solver_cache = solver_cache
+        self._solve = get_results_from_solver_par_table_batch if timer is None else \
+            timer.wrap('solve', get_results_from_solver_par_table_batch)
+
+    def seed(self, seed=None):
+        """Ustawienie ziarna generatora liczb losowych"""
+
+        self._rng = np.random.default_rng(seed)
+
+    def _next_hands(self, n_deals):
+        """Ręce graczy n_deals kolejnych rozdań w formie 0/1, wymiary (n_deals, 4, 52)"""
+
+        return random_deals(n_deals, self._rng)
+
+    def next_deals(self, n_deals):
+        """Lista n_deals nowych rozdań - wszystkie rozdania nieobecne w pamięci podręcznej są rozwiązywane
+        jednym wsadowym wywołaniem solvera"""
+
+        hands = self._next_hands(n_deals)
+        results = [None for _ in range(0, n_deals)]
+        hand_masks = [[hand_mask(hand) for hand in deal] for deal in hands]
+
+        if self._solver_cache is not None:
+            results = [self._solver_cache.get(masks) for masks in hand_masks]
+
+        to_solve = [i for i in range(0, n_deals) if results[i] is None]
+        solved = self._solve([hands_to_pbn(hands[i]) for i in to_solve]) if to_solve else []
+
+        for i, solver_result in zip(to_solve, solved):
+            results[i] = ([int(t) for t in solver_result[:20]], [int(p) for p in solver_result[20:]])
+
+            if self._solver_cache is not None:
+                self._solver_cache.put(hand_masks[i], results[i][0], results[i][1])
+
+        return [(hands[i], results[i][0], results[i][1]) for i in range(0, n_deals)]
+
+
+class IndexedDealSource(RandomDealSource):
+    """Rozdania o kolejnych numerach start, start + step, start + 2 * step, ... w strumieniu rozdań o ziarnie seed
+    (deals_by_index) - źródła z tym samym ziarnem, różnymi wartościami start i wspólnym krokiem step zwracają rozłączne
+    ciągi rozdań, a ponowne uruchomienie zwraca te same rozdania"""
+
+    def __init__(self, seed, start=0, step=1, solver_cache=None, timer=None):
+        """Parametry:
+            seed (int) - ziarno strumienia rozdań
+            start (int) - numer pierwszego rozdania
+            step (int) - odstęp między numerami kolejnych rozdań
+            solver_cache, timer - jak w RandomDealSource"""
+
+        super().__init__(solver_cache, timer)
+        self.deal_seed = seed
+        self.index = start  # numer następnego rozdania
+        self.step = step
+
+    def seed(self, seed=None):
+        """Rozdania zależą tylko od ziarna strumienia i numeru - ziarno generatora liczb losowych nie jest używane"""
+
+    def _next_hands(self, n_deals):
+        """Ręce graczy n_deals kolejnych rozdań strumienia"""
+
+        indices = range(self.index, self.index + n_deals * self.step, self.step)
+        self.index += n_deals * self.step
+
+        return deals_by_index(self.deal_seed, indices)
+
+
+class PrefetchDealSource:
+    """Źródło rozdań z wątkami działającymi w tle, które utrzymują ograniczoną kolejkę gotowych, rozwiązanych rozdań.
+    Pobranie rozdania nie obejmuje czasu pracy solvera, dopóki kolejka nie jest pusta. Błąd w wątku (np. błąd solvera
+    lub utrata połączenia z usługą solvera) zatrzymuje wątek i jest zgłaszany przy kolejnym pobraniu rozdań."""
+
+    # czas oczekiwania na rozdanie z kolejki, po którym sprawdzany jest stan wątków (s)
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, source_factory, depth, workers=1):
+        """Uruchomienie wątków przygotowujących rozdania,
+        gdzie:
+        source_factory - funkcja tworząca źródło rozdań (osobne dla każdego wątku)
+        depth - maksymalna liczba przygotowanych rozdań w kolejce
+        workers - liczba wątków przygotowujących rozdania"""
+
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._error = None  # pierwszy wyjątek zgłoszony w wątku przygotowującym rozdania
+        # rozdania rozwiązywane są w paczkach, aby solver mógł wykorzystać wszystkie swoje wątki
+        self._batch_size = max(1, min(depth, 40))
+        self._workers = [threading.Thread(target=self._work, args=(source_factory(),), daemon=True)
+                         for _ in range(0, workers)]
+
+        for worker in self._workers:
+            worker.start()
+
+    def _work(self, source):
+        """Pętla wątku - przygotowanie kolejnych paczek rozdań i umieszczanie ich w kolejce"""
+
+        try:
+            while not self._stop.is_set():
+                for deal in source.next_deals(self._batch_size):
+                    while not self._stop.is_set():
+                        try:
+                            self._queue.put(deal, timeout=self.POLL_INTERVAL)
+                            break
+                        except queue.Full:
+                            continue
+
+        # także SystemExit z obsługi błędów solvera (quit()), który zakończyłby wątek bez żadnej informacji
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+
+    def _check_workers(self):
+        """Zgłoszenie błędu wątku przygotowującego rozdania lub zatrzymania wszystkich wątków"""
+
+        if self._error is not None:
+            raise RuntimeError('Deal prefetch worker failed: ' + repr(self._error)) from self._error
+
+        if not any(worker.is_alive() for worker in self._workers):
+            raise RuntimeError('Deal prefetch workers are not running')
+
+    def next_deals(self, n_deals):
+        """Lista n_deals rozdań pobranych z kolejki (oczekiwanie tylko wtedy, gdy kolejka jest pusta) - błąd wątku
+        przygotowującego rozdania powoduje RuntimeError zamiast oczekiwania na rozdania, które nie powstaną"""
+
+        self._check_workers()
+        deals = []
+
+        while len(deals) < n_deals:
+            try:
+                deals.append(self._queue.get(timeout=self.POLL_INTERVAL))
+            except queue.Empty:
+                self._check_workers()
+
+        return deals
+
+    def close(self):
+        """Zatrzymanie wątków przygotowujących rozdania"""
+
+        self._stop.set()
+
+        for worker in self._workers:
+            worker.join()
@@ -1,54 +1,81 @@
 from gym import spaces
 import numpy as np
-from gym_bridge_auction.envs.game import WIN_PAIR
+from gym_bridge_auction.envs.auction_core import DOUBLE, REDOUBLE, action_mask, contract
 
 
 class Dynamic(spaces.Discrete):
-    """Zmieniająca się przestrzeń akcji po wykonaniu kolejnych kroków"""
+    """Zmieniająca się przestrzeń akcji po wykonaniu kolejnych kroków.
+
+    Dostępne działania przechowywane są w masce logicznej action_mask (tablica NumPy o długości n, tworzona raz
+    i aktualizowana w każdym kroku kopią wiersza tablicy auction_core.LEGAL) - element True oznacza działanie
+    dostępne dla gracza następnego w kolejności.
+    Dostępne odzywki tworzą zawsze ciągły zakres od 0 (pas) do new_n - 1, do którego może zostać dołączona kontra
+    lub rekontra, dzięki czemu sprawdzenie i losowanie działania wymagają stałej liczby operacji."""
 
     def __init__(self, max_space):
         super().__init__(max_space)
         self.new_n = self.n - 2  # rozmiar przestrzeni akcji bez kontry i rekontry
-        self.available_actions = list(range(0, self.new_n))  # początkowa przestrzeń akcji bez kontry i rekontry
+        self.action_mask = np.zeros(self.n, dtype=bool)  # maska dostępnych działań
+        self.action_mask[0:self.new_n] = True  # początkowa przestrzeń akcji bez kontry i rekontry
+        self._extra_action = None  # dostępna kontra (36) lub rekontra (37)
+
+    @property
+    def available_actions(self):
+        """Lista dostępnych działań (wyznaczana z maski)"""
+
+        return np.flatnonzero(self.action_mask).tolist()
 
     def sample(self):
         """Wybór losowego działania z dostępnej przestrzeni akcji"""
 
-        return self.np_random.choice(self.available_actions)
+        if self._extra_action is None:
+            return self.np_random.randint(self.new_n)
+
+        index = self.np_random.randint(self.new_n + 1)
+
+        return index if index < self.new_n else self._extra_action
 
     def __repr__(self):
         """Reprezentacja klasy"""
 
         return "Dynamic({})".format(self.n)
 
-    def set_available_actions(self, action, state):
-        """Zdefiniowanie dostępnych działań dla agenta w danym kroku"""
+    def set_available_actions(self, auction):
+        """Zdefiniowanie dostępnych działań dla agenta w danym kroku - auction to stan licytacji (auction_core)"""
 
-        if not (action in (0, 36, 37)):
-            # zmniejszanie się dostępnych odzywek licytacyjnych
-            self.new_n = action
+        mask = action_mask(auction)
+        self.action_mask[:] = mask
 
-        self.available_actions = list(range(0, self.new_n))
+        # odzywki dostępne są poniżej najwyższej zgłoszonej (na początku licytacji - wszystkie)
+        last = contract(auction)
+        self.new_n = last if last > 0 else self.n - 2
 
-        if (not (state['winning_pair'] is None)) and state['double/redouble'] == 0 and \
-                not (state['whose next turn'] in WIN_PAIR[state['winning_pair']]):
+        if mask[DOUBLE]:
             # dostępna kontra
-            self.available_actions.append(36)
+            self._extra_action = DOUBLE
 
-        elif state['double/redouble'] == 1 and (state['whose next turn'] in WIN_PAIR[state['winning_pair']]):
+        elif mask[REDOUBLE]:
             # dostępna rekontra
-            self.available_actions.append(37)
+            self._extra_action = REDOUBLE
+
+        else:
+            self._extra_action = None
 
     def reset(self):
         """Przywrócenie początkowej przestrzeni akcji"""
 
         self.new_n = self.n - 2
-        self.available_actions = list(range(0, self.new_n))
+        self.action_mask[0:self.new_n] = True
+        self.action_mask[self.new_n:] = False
+        self._extra_action = None
 
     def contains(self, x):
-        """Sprawdzenie czy wprowadzone działanie jest poprawnego typu"""
+        """Sprawdzenie czy wprowadzone działanie jest poprawnego typu i jest dostępne"""
+
+        if isinstance(x, (int, np.integer)) and 0 <= x < self.n:
+            return bool(self.action_mask[x])
 
-        return x in self.available_actions
+        return False
 
     def __eq__(self, other):
         """Porównanie obiektów"""
@@ -0,0 +1,252 @@
+import glob
+import os
+import gym
+import numpy as np
+from gym_bridge_auction.envs.bridge_auction_env import OBSERVATION_KEYS, OBSERVATION_HANDS_OFFSET, OBSERVATION_SIZE
+from gym_bridge_auction.envs.deal_pool import pack_hands
+
+# Zapis przebiegu licytacji (epizodów) do plików podzielonych na części (shards). Każda część to dwa pliki:
+# - prefix-NNNNN.episodes - rekordy epizodów o stałym rozmiarze,
+# - prefix-NNNNN.steps - rekordy kroków o stałym rozmiarze (kroki kolejnych epizodów jeden po drugim).
+# Oba pliki zaczynają się nagłówkiem o stałym rozmiarze. Liczba rekordów wynika z rozmiaru pliku, więc pliki są
+# tylko dopisywane, a niekompletny rekord na końcu (przerwany zapis) jest pomijany przy odczycie.
+LOG_MAGIC = b'BRDGEPIS'
+LOG_VERSION = 1
+LOG_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4'), ('kind', 'S8')])
+LOG_HEADER_SIZE = 64
+EPISODES_SUFFIX = '.episodes'
+STEPS_SUFFIX = '.steps'
+# rekord epizodu - ręce graczy N, E, S, W (4 x 52 bity, jak w puli rozdań), indeks rozdającego, liczba kroków,
+# zapis optymalny dla pary N-S oraz indeks pierwszego kroku epizodu w pliku kroków
+EPISODE_RECORD = np.dtype([('hands', 'u1', (26,)), ('dealer', 'u1'), ('length', '<u2'), ('optimum_score', '<i2'),
+                           ('step_offset', '<u8')])
+# rekord kroku - działanie (odzywka/zapowiedź) i nagroda dla pary N-S (dla E-W jest przeciwna)
+STEP_RECORD = np.dtype([('bid', 'i1'), ('reward', '<i2')])
+
+DEFAULT_SHARD_SIZE = 1 << 20  # liczba epizodów w jednej części
+DEFAULT_BUFFER_SIZE = 4096  # liczba epizodów zapisywanych do plików jednym wywołaniem
+
+
+def _header(record, kind):
+    """Nagłówek pliku z rekordami danego typu"""
+
+    header = np.zeros(1, dtype=LOG_HEADER)
+    header['magic'] = LOG_MAGIC
+    header['version'] = LOG_VERSION
+    header['record_size'] = record.itemsize
+    header['kind'] = kind
+
+    return header.tobytes().ljust(LOG_HEADER_SIZE, b'\0')
+
+
+def _open_records(path, record, kind):
+    """Odwzorowanie pliku z rekordami w pamięci (tylko pełne rekordy) - tablica rekordów"""
+
+    header = np.fromfile(path, dtype=LOG_HEADER, count=1)
+
+    if len(header) == 0 or header[0]['magic'] != LOG_MAGIC or header[0]['version'] != LOG_VERSION or \
+            header[0]['record_size'] != record.itemsize or header[0]['kind'] != kind:
+        raise ValueError('Invalid episode log file: ' + path)
+
+    count = (os.path.getsize(path) - LOG_HEADER_SIZE) // record.itemsize
+
+    if count == 0:
+        return np.zeros(0, dtype=record)
+
+    return np.memmap(path, dtype=record, mode='r', offset=LOG_HEADER_SIZE, shape=(count,))
+
+
+def shard_paths(prefix):
+    """Ścieżki części zapisu (bez rozszerzeń) o danym prefiksie, w kolejności numerów"""
+
+    return sorted(path[:-len(EPISODES_SUFFIX)] for path in glob.glob(glob.escape(prefix) + '-*' + EPISODES_SUFFIX))
+
+
+class EpisodeRecorder:
+    """Zapis epizodów do plików - rekordy gromadzone są w buforach NumPy i dopisywane do plików po zapełnieniu bufora
+    (oraz w flush() i close()). Po zapisaniu shard_size epizodów rozpoczynana jest nowa część. Zapis do istniejącego
+    prefiksu rozpoczyna nową część po ostatniej istniejącej."""
+
+    def __init__(self, prefix, shard_size=DEFAULT_SHARD_SIZE, buffer_size=DEFAULT_BUFFER_SIZE):
+        """Parametry:
+            prefix (str) - ścieżka i początek nazwy plików (np. 'logs/auctions')
+            shard_size (int) - maksymalna liczba epizodów w jednej części
+            buffer_size (int) - liczba epizodów w buforze"""
+
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self._episodes = np.zeros(buffer_size, dtype=EPISODE_RECORD)
+        self._hands = np.zeros((buffer_size, 4, 52), dtype=np.uint8)  # ręce pakowane wsadowo przy zapisie do pliku
+        self._steps = np.zeros(buffer_size * 16, dtype=STEP_RECORD)
+        self._n_episodes = 0  # liczba epizodów w buforze
+        self._n_steps = 0  # liczba kroków w buforze
+        self._shard = len(shard_paths(prefix)) - 1
+        self._shard_episodes = shard_size  # liczba epizodów w bieżącej części
+        self._shard_steps = 0  # liczba kroków w bieżącej części
+        self._files = None
+
+    def _next_shard(self):
+        """Zamknięcie bieżącej części i utworzenie plików kolejnej"""
+
+        self._close_files()
+        self._shard += 1
+        path = '{}-{:05d}'.format(self.prefix, self._shard)
+        self._files = (open(path + EPISODES_SUFFIX, 'xb'), open(path + STEPS_SUFFIX, 'xb'))
+        self._files[0].write(_header(EPISODE_RECORD, b'episodes'))
+        self._files[1].write(_header(STEP_RECORD, b'steps'))
+        self._shard_episodes = 0
+        self._shard_steps = 0
+
+    def record(self, hands, dealer, bids, rewards, optimum_score):
+        """Dodanie epizodu,
+        gdzie:
+        hands - ręce graczy N, E, S, W w formie 0/1, wymiary (4, 52)
+        dealer - indeks rozdającego
+        bids - kolejne działania w licytacji
+        rewards - nagrody dla pary N-S po kolejnych działaniach
+        optimum_score - zapis optymalny dla pary N-S"""
+
+        length = len(bids)
+
+        if self._n_episodes == len(self._episodes):
+            self.flush()
+
+        if self._shard_episodes + self._n_episodes == self.shard_size:
+            self.flush()
+            self._next_shard()
+
+        if self._n_steps + length > len(self._steps):
+            # bufor kroków jest powiększany (tylko przy nietypowo długich licytacjach)
+            self._steps = np.concatenate([self._steps, np.zeros(max(len(self._steps), length), dtype=STEP_RECORD)])
+
+        self._hands[self._n_episodes] = hands
+        self._episodes[self._n_episodes] = (0, dealer, length, optimum_score, self._shard_steps + self._n_steps)
+
+        self._steps['bid'][self._n_steps:self._n_steps + length] = bids
+        self._steps['reward'][self._n_steps:self._n_steps + length] = rewards
+        self._n_episodes += 1
+        self._n_steps += length
+
+    def flush(self):
+        """Dopisanie zawartości buforów do plików bieżącej części - kroki zapisywane są przed epizodami, więc zapisany
+        epizod zawsze ma wszystkie swoje kroki w pliku"""
+
+        if self._n_episodes == 0:
+            return
+
+        if self._files is None:
+            self._next_shard()
+
+        self._episodes['hands'][:self._n_episodes] = pack_hands(self._hands[:self._n_episodes])
+        self._files[1].write(self._steps[:self._n_steps].tobytes())
+        self._files[1].flush()
+        self._files[0].write(self._episodes[:self._n_episodes].tobytes())
+        self._files[0].flush()
+        self._shard_episodes += self._n_episodes
+        self._shard_steps += self._n_steps
+        self._n_episodes = 0
+        self._n_steps = 0
+
+    def _close_files(self):
+        """Zamknięcie plików bieżącej części"""
+
+        if self._files is not None:
+            for file in self._files:
+                file.close()
+
+            self._files = None
+
+    def close(self):
+        """Zapisanie zawartości buforów i zamknięcie plików"""
+
+        self.flush()
+        self._close_files()
+
+
+class RecordEpisodes(gym.Wrapper):
+    """Nakładka na środowisko AuctionEnv (obserwacja 'dict' lub 'array') zapisująca każdy zakończony epizod przez
+    EpisodeRecorder"""
+
+    def __init__(self, env, recorder):
+        """Parametry:
+            env - środowisko AuctionEnv
+            recorder - obiekt EpisodeRecorder"""
+
+        super().__init__(env)
+        self.recorder = recorder
+        self._hands = None
+        self._dealer = None
+        self._bids = []
+        self._rewards = []
+
+    def reset(self, **kwargs):
+        """Reset środowiska i zapamiętanie rąk graczy oraz rozdającego z obserwacji początkowej"""
+
+        state = self.env.reset(**kwargs)
+
+        if isinstance(state, dict):
+            self._hands = np.array(state['Players hands'], dtype=np.uint8)
+            self._dealer = state['whose next turn']
+
+        else:
+            self._hands = state[OBSERVATION_HANDS_OFFSET:OBSERVATION_SIZE].reshape(4, 52).astype(np.uint8)
+            self._dealer = int(state[OBSERVATION_KEYS.index('whose next turn')])
+
+        self._bids = []
+        self._rewards = []
+
+        return state
+
+    def step(self, action):
+        """Krok środowiska - zapamiętanie działania i nagrody, a po zakończeniu licytacji zapis epizodu"""
+
+        state, reward, done, info = self.env.step(action)
+        self._bids.append(action)
+        self._rewards.append(reward[0])
+
+        if done:
+            self.recorder.record(self._hands, self._dealer, self._bids, self._rewards, info['optimum score'][0])
+
+        return state, reward, done, info
+
+
+class EpisodeDataset:
+    """Odczyt zapisanych epizodów - pliki wszystkich części są odwzorowywane w pamięci (mmap), a paczki epizodów to
+    widoki na rekordy, bez przetwarzania danych"""
+
+    def __init__(self, prefix):
+        """Otwarcie wszystkich części zapisu o danym prefiksie"""
+
+        self.prefix = prefix
+        self.shards = []  # pary (rekordy epizodów, rekordy kroków) kolejnych części
+
+        for path in shard_paths(prefix):
+            episodes = _open_records(path + EPISODES_SUFFIX, EPISODE_RECORD, b'episodes')
+            steps = _open_records(path + STEPS_SUFFIX, STEP_RECORD, b'steps')
+
+            # epizody bez wszystkich kroków w pliku (przerwany zapis) są pomijane
+            complete = np.searchsorted(episodes['step_offset'] + episodes['length'], len(steps), side='right')
+            self.shards.append((episodes[:complete], steps))
+
+    def __len__(self):
+        """Liczba zapisanych epizodów"""
+
+        return sum(len(episodes) for episodes, _ in self.shards)
+
+    def batches(self, batch_size):
+        """Kolejne paczki (najwyżej batch_size epizodów, w obrębie jednej części) - słowniki:
+        'episodes' - rekordy epizodów (EPISODE_RECORD),
+        'bids', 'rewards' - działania i nagrody wszystkich kroków epizodów w paczce, jeden po drugim,
+        'offsets' - indeksy pierwszych kroków kolejnych epizodów w 'bids' i 'rewards' (batch_size + 1 elementów)"""
+
+        for episodes, steps in self.shards:
+            for start in range(0, len(episodes), batch_size):
+                batch = episodes[start:start + batch_size]
+                first = int(batch['step_offset'][0])
+                last = int(batch['step_offset'][-1]) + int(batch['length'][-1])
+                offsets = np.empty(len(batch) + 1, dtype=np.int64)
+                offsets[:-1] = batch['step_offset'] - first
+                offsets[-1] = last - first
+
+                yield {'episodes': batch, 'bids': steps['bid'][first:last], 'rewards': steps['reward'][first:last],
+                       'offsets': offsets}
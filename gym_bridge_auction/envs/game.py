@@ -1,4 +1,5 @@
 from random import shuffle
+import numpy as np
 
 # Kolory kart w unicode
 spade = "\u2660"
@@ -68,46 +69,42 @@ def create_available_contracts():
     return contracts
 
 
+# Liczba kart w talii
+N_CARDS = 52
+
+# Kolory kart według pozycji w reprezentacji 0/1 (kolejno trefl, karo, kier i pik)
+SUITS = [club, diamond, heart, spade]
+
+# Numery/figury kart według wartości (od 2 do A)
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+# Figury/numery kart w zapisie PBN - od najstarszej
+PBN_RANKS = 'AKQJT98765432'
+
+
 class Card:
-    """Definicja karty do gry,
+    """Definicja karty do gry - karta jest wyznaczona przez liczbę całkowitą (pozycję w talii),
         gdzie:
         suit - kolor danej karty - jeden z dostępnych - {♠, ♥, ♦, ♣} - kolejno od najstarszego:
         pik, kier, karo, trefl;
         rank - numer bądź figura danej karty - jedno z dostępnych - {A, K, Q, J, 10, 9, 8, 7, 6, 5, 4, 3, 2} -
         kolejno od najstarszego;
         value - liczba definiująca pozycję karty w hierarchii w danym kolorze (liczby od 2 do 14)
-        position - pozycja karty w talii wykorzystywana w reprezentacji 0/1 - karty ustawione są od 2 do A kolejno
-        kolorami trefl, karo, kier i na końcu pik"""
+        position - pozycja karty w talii wykorzystywana w reprezentacji 0/1 (liczby od 0 do 51) - karty ustawione są
+        od 2 do A kolejno kolorami trefl, karo, kier i na końcu pik
 
-    def __init__(self, suit, rank):
-        """Przypisanie koloru, numeru/figury i wartości określającej pozycję karty w hierarchii w danym kolorze oraz
-        w talii"""
+        Obiekty kart są tworzone tylko raz (tablica CARDS) i współdzielone przez wszystkie rozdania i środowiska."""
 
-        self.suit = suit
-        self.rank = rank
-
-        # Przypisanie wartości określających hierarchię kart w danym kolorze
-        if rank == 'A':
-            self.value = 14
-        elif rank == 'K':
-            self.value = 13
-        elif rank == 'Q':
-            self.value = 12
-        elif rank == 'J':
-            self.value = 11
-        else:
-            self.value = int(rank)
-
-        # Pozycje kart w talii do reprezentacji 0/1
-        self.position = self.value - 2
-        if suit == club:
-            self.position = self.position
-        elif suit == diamond:
-            self.position = self.position + 13
-        elif suit == heart:
-            self.position = self.position + (2 * 13)
-        elif suit == spade:
-            self.position = self.position + (3 * 13)
+    __slots__ = ('position', 'suit', 'rank', 'value')
+
+    def __init__(self, position):
+        """Przypisanie koloru, numeru/figury i wartości określającej pozycję karty w hierarchii w danym kolorze
+        na podstawie pozycji karty w talii"""
+
+        self.position = position
+        self.suit = SUITS[position // 13]
+        self.rank = RANKS[position % 13]
+        self.value = position % 13 + 2
 
     def __eq__(self, other):
         """"Określenie równości obiektów - wykorzystywane do sortowania kart"""
@@ -119,21 +116,36 @@ class Card:
 
         return self.value > other.value  # kolejność od A (asów) do 2
 
+    def __hash__(self):
+        """Skrót obiektu - pozycja karty w talii"""
+
+        return self.position
+
+
+# Wspólna, niezmienna tablica kart - karta o pozycji i to CARDS[i]
+CARDS = tuple(Card(position) for position in range(0, N_CARDS))
+
+# Napisowa postać numerów/figur kart do wyświetlania oraz w zapisie PBN według pozycji w talii
+CARD_RANKS = [card.rank for card in CARDS]
+CARD_PBN_RANKS = [PBN_RANKS[14 - card.value] for card in CARDS]
+
 
 class Deck:
-    """Definicja talii 52 kart do gry w brydża"""
+    """Definicja talii 52 kart do gry w brydża - lista współdzielonych obiektów kart z tablicy CARDS"""
 
     def __init__(self):
         """Lista wszystkich kart do gry - 52 obiekty typu Card"""
 
-        rank = ['A', 'K', 'Q', 'J', '10', '9', '8', '7', '6', '5', '4', '3', '2']  # numery/figury karty
-        suites = [spade, heart, diamond, club]  # kolory karty
-        self.deck = [Card(i, k) for i in suites for k in rank]
+        self.deck = list(reversed(CARDS))  # od asa pik do dwójki trefl
+
+    def shuffle(self, rng=None):
+        """Tasowanie talii - generatorem NumPy rng, jeśli został podany (w przeciwnym razie modułem random)"""
 
-    def shuffle(self):
-        """Tasowanie talii"""
+        if rng is None:
+            shuffle(self.deck)
 
-        shuffle(self.deck)
+        else:
+            rng.shuffle(self.deck)
 
     def deal(self, n_players):
         """Rozdanie kart dla określonej przez parametr n_players liczby graczy"""
@@ -141,6 +153,61 @@ class Deck:
         return [self.deck[i::n_players] for i in range(0, n_players)]
 
 
+def random_deals(n_deals, rng):
+    """Losowe rozdania jako permutacje talii wyznaczone przez generator NumPy (rng) - zwraca ręce graczy N, E, S, W
+    w formie 0/1, wymiary (n_deals, 4, 52). Gracz otrzymuje co czwartą kartę permutacji."""
+
+    permutations = rng.permuted(np.tile(np.arange(N_CARDS), (n_deals, 1)), axis=1)
+    hands = np.zeros((n_deals, 4, N_CARDS), dtype=np.uint8)
+    hands[np.arange(n_deals)[:, None], np.arange(N_CARDS) % 4, permutations] = 1
+
+    return hands
+
+
+def deals_by_index(seed, indices):
+    """Rozdania o podanych numerach (liczby całkowite nieujemne) w strumieniu rozdań o ziarnie seed - rozdanie zależy
+    tylko od pary (seed, numer), więc zakresy numerów można dzielić między procesy bez wymiany informacji. Zwraca ręce
+    graczy N, E, S, W w formie 0/1, wymiary (liczba rozdań, 4, 52)."""
+
+    permutations = np.array([np.random.default_rng([seed, index]).permutation(N_CARDS) for index in indices],
+                            dtype=np.intp).reshape(-1, N_CARDS)
+    hands = np.zeros((len(permutations), 4, N_CARDS), dtype=np.uint8)
+    hands[np.arange(len(permutations))[:, None], np.arange(N_CARDS) % 4, permutations] = 1
+
+    return hands
+
+
+def deal_by_index(seed, index):
+    """Rozdanie o numerze index w strumieniu rozdań o ziarnie seed - ręce graczy w formie 0/1, wymiary (4, 52)"""
+
+    return deals_by_index(seed, [index])[0]
+
+
+def hand_to_suits(hand):
+    """Pozycje kart ręki w formie 0/1 rozdzielone według kolorów - kolejno piki, kiery, kara i trefle,
+    w każdym kolorze od asa do dwójki"""
+
+    suits = [[], [], [], []]
+
+    for position in np.flatnonzero(hand)[::-1].tolist():
+        suits[3 - position // 13].append(position)
+
+    return suits
+
+
+def hands_to_pbn(hands):
+    """Rozdanie w formacie PBN wyznaczone z reprezentacji 0/1 rąk graczy N, E, S, W
+    (karty ustawione od 2 do A kolejno kolorami trefl, karo, kier i pik, jak w Player.hand_representation)"""
+
+    pbn_hands = []
+
+    for hand in hands:
+        pbn_hands.append('.'.join(''.join(CARD_PBN_RANKS[position] for position in suit)
+                                  for suit in hand_to_suits(hand)))
+
+    return NAMES[0] + ':' + ' '.join(pbn_hands)
+
+
 def list_to_string(old_list):
     """Zamiana listy w postać napisową"""
 
@@ -149,53 +216,46 @@ def list_to_string(old_list):
 
 
 class Player:
-    """Definicja gracza w brydżu, który ma swoją nazwę, rękę (karty jakie posiada), zgłoszoną odzywkę/zapowiedź w danym
-    momencie licytacji, maksymalne realizowane kontrakty i liczby możliwych do wzięcia lew przy ustalonym mianie"""
+    """Definicja gracza w brydżu, który ma swoją nazwę, rękę (karty jakie posiada), maksymalne realizowane kontrakty
+    i liczby możliwych do wzięcia lew przy ustalonym mianie.
+
+    Ręka przechowywana jest w formie 0/1 (tablica z rozdania), a lista kart i napisy do wyświetlania wyznaczane są
+    dopiero przy pierwszym odwołaniu (np. podczas renderowania)."""
+
+    __slots__ = ('name', 'makeable_contracts', 'number_of_tricks', '_hand', '_hand_splitted')
 
     def __init__(self, name, hand):
-        """Przypisanie graczowi nazwy (name) i ręki (hand) - dostępne karty oraz incjalizacja innych pól klasy"""
+        """Przypisanie graczowi nazwy (name) i ręki (hand) - reprezentacja 0/1 dostępnych kart (52 elementy)
+        oraz incjalizacja innych pól klasy"""
 
         self.name = name
-        self.hand = sorted(hand)  # ręka gracza posortowana od najstarszych asów (A) poszczegónych kolorów do dwójek (2)
-        self.hand_splitted = [[] for _ in range(0, 4)]  # ręka gracza rozdzielona według kolorów kart
-        self.win_auction = False  # określenie czy dany gracz wygrał licytację
-        self.player_contracts = None  # odzywka/zapowiedź gracza w danym momencie licytacji
+        self._hand = hand  # ręka gracza w formie 0/1
+        self._hand_splitted = None  # ręka gracza rozdzielona według kolorów kart - napisy do wyświetlania
         self.makeable_contracts = {}  # maksymalne realizowane kontrakty wyznaczone za pomocą Double Dummy Solver
         self.number_of_tricks = {}  # maksymalna liczba wziętych lew wyznaczona za pomocą Double Dummy Solver
-        self.hand_representation = self.set_hand_representation()  # reprezentacja ręki gracza w formie 0/1
-
-    def split_hand(self):
-        """Rodzielenie ręki gracza według koloru karty (od najstarszego do najmłodszego),
-         gdzie w pierwszym wierszu są piki, w drugim - kiery, w trzecim - kara, a w czwartym - trefle"""
-
-        for j in range(0, 13):
-            if self.hand[j].suit == spade:
-                self.hand_splitted[0].append(self.hand[j])
-            elif self.hand[j].suit == heart:
-                self.hand_splitted[1].append(self.hand[j])
-            elif self.hand[j].suit == diamond:
-                self.hand_splitted[2].append(self.hand[j])
-            elif self.hand[j].suit == club:
-                self.hand_splitted[3].append(self.hand[j])
-
-    def hand_to_display(self, hand):
-        """Napisowa postać figur lub numerów karty danego koloru,
-        gdzie:
-        hand - ręka gracza w danym kolorze"""
 
-        cards = [c.rank for c in hand]
+    @property
+    def hand(self):
+        """Ręka gracza - lista kart posortowana od najstarszych asów (A) poszczególnych kolorów do dwójek (2)"""
 
-        return list_to_string(cards)
+        return sorted(CARDS[position] for position in np.flatnonzero(self._hand)[::-1].tolist())
 
-    def set_hand_representation(self):
+    @property
+    def hand_splitted(self):
+        """Ręka gracza rozdzielona według koloru karty (od najstarszego do najmłodszego) w postaci napisowej,
+        gdzie w pierwszym wierszu są piki, w drugim - kiery, w trzecim - kara, a w czwartym - trefle"""
+
+        if self._hand_splitted is None:
+            self._hand_splitted = [list_to_string([CARD_RANKS[position] for position in suit])
+                                   for suit in hand_to_suits(self._hand)]
+
+        return self._hand_splitted
+
+    @property
+    def hand_representation(self):
         """Reprezentacja ręki gracza w formie 0/1
         0 - nie posiada karty
         1 - posiada kartę
         Karty ustawione są od 2 do A kolejno kolorami trefl, karo, kier i na końcu pik"""
 
-        hand_representation = [0 for _ in range(0, 52)]
-
-        for card in self.hand:
-            hand_representation[card.position] = 1
-
-        return hand_representation
+        return np.asarray(self._hand).tolist()
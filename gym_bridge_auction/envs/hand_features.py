@@ -0,0 +1,46 @@
+import numpy as np
+
+# Cechy rąk graczy wyznaczane wsadowo z reprezentacji 0/1 (karty od 2 do A kolejno kolorami trefl, karo, kier i pik)
+# - kolejne elementy wektora cech ręki:
+# 'hcp' - punkty honorowe (A - 4, K - 3, Q - 2, J - 1),
+# 'clubs', 'diamonds', 'hearts', 'spades' - długości kolorów,
+# 'shape' - klasa układu ręki (BALANCED, SEMI_BALANCED, UNBALANCED),
+# 'controls' - kontrole (A - 2, K - 1),
+# 'losers' - liczba przegrywających lew (losing trick count) - w każdym kolorze brakujące A, K, Q spośród
+# min(długość, 3) najstarszych pozycji (singiel - tylko A, dubel - A i K)
+HAND_FEATURES = ['hcp', 'clubs', 'diamonds', 'hearts', 'spades', 'shape', 'controls', 'losers']
+N_HAND_FEATURES = len(HAND_FEATURES)
+
+# Klasy układu ręki
+BALANCED = 0  # bez singla i renonsu, najwyżej jeden dubel (4333, 4432, 5332)
+SEMI_BALANCED = 1  # bez singla i renonsu, co najmniej dwa duble (5422, 6322, 7222)
+UNBALANCED = 2  # z singlem lub renonsem
+
+_HCP = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4], dtype=np.int16)  # wartości kart od 2 do A
+_CONTROLS = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 2], dtype=np.int16)
+_ACE, _KING, _QUEEN = 12, 11, 10  # pozycje figur w kolorze
+
+
+def hand_features(hands):
+    """Cechy rąk graczy (HAND_FEATURES) dla jednego lub wielu rozdań - tablica int8 (..., 4, N_HAND_FEATURES),
+    gdzie:
+    hands - ręce graczy N, E, S, W w formie 0/1, wymiary (..., 4, 52)"""
+
+    cards = np.asarray(hands, dtype=np.int16).reshape(np.shape(hands)[:-1] + (4, 13))
+    lengths = cards.sum(axis=-1)
+    features = np.empty(lengths.shape[:-1] + (N_HAND_FEATURES,), dtype=np.int8)
+
+    features[..., 0] = (cards @ _HCP).sum(axis=-1)
+    features[..., 1:5] = lengths
+
+    shortest = lengths.min(axis=-1)
+    doubletons = (lengths == 2).sum(axis=-1)
+    features[..., 5] = np.where(shortest < 2, UNBALANCED, np.where(doubletons > 1, SEMI_BALANCED, BALANCED))
+
+    features[..., 6] = (cards @ _CONTROLS).sum(axis=-1)
+
+    # figury liczone są tylko na pozycjach, które mieszczą się w długości koloru (do 3 kart)
+    winners = cards[..., _ACE] + cards[..., _KING] * (lengths >= 2) + cards[..., _QUEEN] * (lengths >= 3)
+    features[..., 7] = (np.minimum(lengths, 3) - winners).sum(axis=-1)
+
+    return features
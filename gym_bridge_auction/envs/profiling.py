@@ -0,0 +1,62 @@
+import threading
+import time
+
+# Etapy działania środowiska mierzone przez PhaseTimer:
+# 'reset', 'step' - całkowity czas wywołań reset() i step()
+# 'deal' - pobranie nowego rozdania ze źródła rozdań i utworzenie graczy (łącznie z oczekiwaniem na solver)
+# 'solve' - wywołania solvera (również w wątkach przygotowujących rozdania w tle)
+# 'state' - wyznaczenie stanu licytacji (obserwacji)
+# 'actions' - wyznaczenie dostępnych działań po działaniu gracza (Dynamic.set_available_actions)
+# 'reward' - wyznaczenie nagrody
+# 'termination' - sprawdzenie warunku końca licytacji
+# 'render' - renderowanie
+PHASES = ('reset', 'step', 'deal', 'solve', 'state', 'actions', 'reward', 'termination', 'render')
+
+
+class PhaseTimer:
+    """Liczniki łącznego czasu (w sekundach) i liczby wywołań dla etapów działania środowiska. Mierzone funkcje są
+    zastępowane przez wrap() funkcjami mierzącymi czas tylko wtedy, gdy pomiar jest włączony - bez pomiaru kod
+    środowiska nie wykonuje żadnych dodatkowych operacji."""
+
+    def __init__(self):
+        """Utworzenie wyzerowanych liczników dla wszystkich etapów"""
+
+        self._lock = threading.Lock()  # solver może być wywoływany w wątkach przygotowujących rozdania
+        self._time = dict.fromkeys(PHASES, 0.0)
+        self._calls = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase, seconds):
+        """Dodanie czasu jednego wywołania do liczników etapu"""
+
+        with self._lock:
+            self._time[phase] += seconds
+            self._calls[phase] += 1
+
+    def wrap(self, phase, function):
+        """Funkcja wywołująca function i dodająca czas jej działania do liczników etapu phase"""
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(phase, time.perf_counter() - start)
+
+        return timed
+
+    def stats(self):
+        """Liczniki etapów - słownik {etap: {'calls': liczba wywołań, 'time': łączny czas w sekundach,
+        'mean_us': średni czas wywołania w mikrosekundach}}"""
+
+        with self._lock:
+            return {phase: {'calls': self._calls[phase], 'time': self._time[phase],
+                            'mean_us': self._time[phase] / self._calls[phase] * 1e6 if self._calls[phase] else 0.0}
+                    for phase in PHASES}
+
+    def reset(self):
+        """Wyzerowanie liczników"""
+
+        with self._lock:
+            self._time = dict.fromkeys(PHASES, 0.0)
+            self._calls = dict.fromkeys(PHASES, 0)
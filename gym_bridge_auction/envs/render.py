@@ -1,4 +1,5 @@
 from gym_bridge_auction.envs.game import NAMES, spade, heart, diamond, club
+import numpy as np
 import pygame
 
 
@@ -158,3 +159,118 @@ class Window:
 
         pygame.quit()
         quit()
+
+
+class FrameRenderer:
+    """Renderowanie do powierzchni w pamięci (bez okna i bez ograniczenia liczby klatek na sekundę) - tryb 'rgb_array'.
+    Układ i napisy niezmienne rysowane są raz, napisy zmienne składane są z zapamiętanych obrazów znaków, a w każdej
+    klatce przerysowywane są tylko pola, których tekst się zmienił."""
+
+    width = 1500
+    height = 850
+
+    def __init__(self):
+        """Utworzenie powierzchni, czcionki i tła z niezmiennymi elementami interfejsu (jak w Window)"""
+
+        # do rysowania na powierzchni w pamięci nie jest potrzebne okno ani sterownik wideo
+        pygame.font.init()
+        self.colours = {'green': (60, 120, 70),
+                        'red': (255, 0, 0),
+                        'orange': (199, 60, 7),
+                        'black': (0, 0, 0),
+                        'ecru': (245, 245, 220),
+                        'blue': (0, 0, 128),
+                        'grey': (54, 54, 69)}
+        self.font = pygame.font.Font(pygame.font.match_font('dejavusansmono'), 20)
+        # powierzchnia 24-bitowa z bajtami w kolejności R, G, B - klatka jest kopią pamięci powierzchni
+        self.screen = pygame.Surface((self.width, self.height), 0, 24, (0xFF, 0xFF00, 0xFF0000, 0))
+        self._glyphs = {}  # obrazy znaków napisów zmiennych
+        self._fields = {}  # tekst i obszar narysowanego napisu dla każdego pola
+        self.deal = None  # rozdanie, którego ręce są narysowane
+
+        self._background = self.screen.copy()
+        self._background.fill(self.colours['green'])
+        colour_labels = [self.font.render(spade, True, self.colours['black']),
+                         self.font.render(heart, True, self.colours['red']),
+                         self.font.render(diamond, True, self.colours['orange']),
+                         self.font.render(club, True, self.colours['grey'])]
+
+        for name, (x_pos, y_pos) in zip(NAMES, [(540, 140), (1040, 340), (540, 540), (40, 340)]):
+            pygame.draw.rect(self._background, self.colours['blue'], pygame.Rect(x_pos, y_pos, 400, 250), 1)
+            self._background.blit(self.font.render(name, True, self.colours['blue']), (x_pos + 110, y_pos + 10))
+
+            for i in range(0, 4):
+                self._background.blit(colour_labels[i], (x_pos + 10, y_pos + 60 + 50 * i))
+
+        for text, position in [("NORTH Contract:", (50, 10)), ("EAST Contract:", (50, 60)),
+                               ("SOUTH Contract:", (50, 110)), ("WEST Contract:", (50, 160)),
+                               ("Last contract:", (1050, 10)), ("DEALER:", (1050, 60)), ("Pair:", (1050, 110)),
+                               ("Pair score:", (1050, 160)), ("Optimum score:", (1050, 210))]:
+            self._background.blit(self.font.render(text, True, self.colours['black']), position)
+
+    def _draw_text(self, text, position):
+        """Narysowanie napisu zmiennego z zapamiętanych obrazów znaków - zwraca zajęty obszar"""
+
+        x_pos, y_pos = position
+
+        for character in text:
+            glyph = self._glyphs.get(character)
+
+            if glyph is None:
+                glyph = self.font.render(character, True, self.colours['black'], self.colours['ecru'])
+                self._glyphs[character] = glyph
+
+            self.screen.blit(glyph, (x_pos, y_pos))
+            x_pos += glyph.get_width()
+
+        return pygame.Rect(position[0], position[1], x_pos - position[0], self.font.get_linesize())
+
+    def _set_field(self, field, text, position):
+        """Przerysowanie pola, jeśli jego tekst się zmienił"""
+
+        drawn = self._fields.get(field)
+
+        if drawn is not None and drawn[0] == text:
+            return
+
+        if drawn is not None:
+            self.screen.fill(self.colours['green'], drawn[1])
+
+        self._fields[field] = (text, self._draw_text(text, position))
+
+    def new_deal(self, deal, hands_display, who_is_dealer):
+        """Narysowanie tła i rąk graczy nowego rozdania,
+        gdzie:
+        deal - rozdanie (do sprawdzenia, czy ręce są już narysowane)
+        hands_display - ręce graczy N, E, S, W rozdzielone według kolorów kart (napisy)
+        who_is_dealer - nazwa gracza, który jest rozdającym"""
+
+        self.deal = deal
+        self._fields = {}
+        self.screen.blit(self._background, (0, 0))
+
+        for hand, (x_pos, y_pos) in zip(hands_display, [(600, 200), (1100, 400), (600, 600), (100, 400)]):
+            for i in range(0, 4):
+                self._draw_text(hand[i], (x_pos, y_pos + 50 * i))
+
+        self._set_field('dealer', who_is_dealer, (1250, 60))
+
+    def update_view(self, last_contract, north_contract, east_contract, south_contract, west_contract, win_pair, score,
+                    optimum_score):
+        """Aktualizacja zmieniających się napisów (parametry jak w Window.update_view, bez liczby klatek na sekundę) -
+        zwraca klatkę jako tablicę NumPy uint8 o wymiarach (wysokość, szerokość, 3)"""
+
+        self._set_field('last contract', last_contract, (1250, 10))
+        self._set_field('pair 0', win_pair[0], (1250, 110))
+        self._set_field('pair 1', win_pair[1], (1350, 110))
+        self._set_field('score 0', str(score[0]), (1250, 160))
+        self._set_field('score 1', str(score[1]), (1350, 160))
+        self._set_field('optimum score 0', str(optimum_score[0]), (1250, 210))
+        self._set_field('optimum score 1', str(optimum_score[1]), (1350, 210))
+
+        for i, contract in enumerate([north_contract, east_contract, south_contract, west_contract]):
+            self._set_field(NAMES[i], contract, (250, 10 + 50 * i))
+
+        frame = np.frombuffer(self.screen.get_buffer().raw, dtype=np.uint8).reshape(self.height, -1)
+
+        return frame[:, :self.width * 3].reshape(self.height, self.width, 3)
@@ -0,0 +1,163 @@
+import numpy as np
+from gym_bridge_auction.envs import auction_core
+from gym_bridge_auction.envs.auction_core import TRANSITIONS, LEGAL, OVER, ILLEGAL, N_CODES, MAX_AUCTION_LENGTH
+from gym_bridge_auction.envs.scoring import N_CONTRACTS, N_DOUBLE_STATES, deal_score_table
+
+# Wiele licytacji (rozgrywek kontrfaktycznych) jednego rozwiązanego rozdania - stany licytacji to tablice kodów stanu
+# auction_core (bez ostatnich działań graczy), a wszystkie licytacje korzystają z jednej tablicy zapisów rozdania,
+# więc rozdanie rozwiązywane jest przez solver tylko raz.
+
+_CODES = np.arange(N_CODES)
+_CONTRACTS = auction_core.contract(_CODES)
+_DECLARERS = auction_core.declarer(_CODES)
+_DOUBLES = auction_core.double(_CODES)
+_VALID = (_CONTRACTS < N_CONTRACTS) & (_DOUBLES < N_DOUBLE_STATES)  # kody z poprawnymi wartościami pól
+
+
+class DealRollouts:
+    """Licytacje jednego rozwiązanego rozdania - odtwarzanie ciągów działań (play_sequences) i licytacje prowadzone
+    przez politykę (play_policy) dla wielu licytacji jednocześnie, operacjami na tablicach NumPy.
+
+    Nagrody są takie same jak w AuctionEnv - zapis pary N-S dla najwyższej zgłoszonej odzywki pomniejszony o zapis
+    optymalny dla rozdającego (dla pary E-W nagroda jest przeciwna). Wyniki zwracane są jako słownik tablic:
+    'contract' - najwyższa zgłoszona odzywka (0 - nie zgłoszono odzywki),
+    'declarer' - gracz, który ją zgłosił (-1, gdy nie zgłoszono odzywki),
+    'double' - stan kontry/rekontry,
+    'score' - zapis dla pary N-S,
+    'done' - czy licytacja została zakończona,
+    'lengths' - liczby działań w licytacjach,
+    'rewards' - nagrody dla pary N-S po kolejnych działaniach, wymiary (liczba licytacji, najdłuższa licytacja),
+    po zakończeniu licytacji uzupełnione zerami."""
+
+    def __init__(self, deal):
+        """Parametr:
+            deal - rozwiązane rozdanie (krotka: ręce graczy, 20 liczb lew, zapisy optymalne dla każdego rozdającego)
+            jak w źródłach rozdań i DealPool.get()"""
+
+        self.deal = deal
+        self.hands = np.asarray(deal[0], dtype=np.uint8)
+        self.pars = np.asarray(deal[2][:4], dtype=np.int32)  # zapisy optymalne dla rozdających N, E, S, W
+        score_table = deal_score_table(deal[1])
+        # zapis pary N-S dla każdego kodu stanu licytacji
+        self.code_scores = np.zeros(N_CODES, dtype=np.int32)
+        self.code_scores[_VALID] = score_table[_CONTRACTS[_VALID], _DECLARERS[_VALID], _DOUBLES[_VALID]]
+
+    def _start(self, n_rollouts, dealers):
+        """Kody stanów początkowych i zapisy optymalne dla n_rollouts licytacji rozpoczynanych przez dealers"""
+
+        dealers = np.broadcast_to(np.asarray(dealers, dtype=np.intp), (n_rollouts,))
+
+        return auction_core.initial_state(dealers) & auction_core.CODE_MASK, self.pars[dealers]
+
+    def _results(self, codes, pars, done, lengths, rewards):
+        """Słownik wyników dla końcowych kodów stanu licytacji"""
+
+        contracts = _CONTRACTS[codes]
+
+        return {'contract': contracts, 'declarer': np.where(contracts > 0, _DECLARERS[codes], -1),
+                'double': _DOUBLES[codes], 'score': self.code_scores[codes], 'done': done, 'lengths': lengths,
+                'rewards': rewards[:, :max(1, lengths.max(initial=0))]}
+
+    def play_sequences(self, sequences, dealers=0):
+        """Odtworzenie ciągów działań - zwraca słownik wyników,
+        gdzie:
+        sequences - lista ciągów działań (list) lub tablica (liczba licytacji, długość) uzupełniona liczbami -1
+        dealers - indeks rozdającego (wspólny) lub tablica indeksów dla kolejnych licytacji
+
+        Działania po zakończeniu licytacji są pomijane, a niedostępne działanie powoduje ValueError."""
+
+        if not isinstance(sequences, np.ndarray):
+            padded = np.full((len(sequences), max([len(sequence) for sequence in sequences], default=0)), -1)
+
+            for i, sequence in enumerate(sequences):
+                padded[i, :len(sequence)] = sequence
+
+            sequences = padded
+
+        sequences = np.asarray(sequences, dtype=np.intp)
+        n_rollouts = len(sequences)
+        codes, pars = self._start(n_rollouts, dealers)
+        done = np.zeros(n_rollouts, dtype=bool)
+        lengths = np.zeros(n_rollouts, dtype=np.intp)
+        rewards = np.zeros(sequences.shape, dtype=np.int32)
+
+        for step in range(0, sequences.shape[1]):
+            rows = np.flatnonzero(~done & (sequences[:, step] >= 0))
+
+            if len(rows) == 0:
+                break
+
+            actions = sequences[rows, step]
+
+            if actions.max() >= auction_core.N_ACTIONS:
+                raise ValueError('Invalid action ' + str(actions.max()) + ' at step ' + str(step))
+
+            new_codes = TRANSITIONS[codes[rows], actions]
+            illegal = np.flatnonzero(new_codes == ILLEGAL)
+
+            if len(illegal) > 0:
+                raise ValueError('Illegal action ' + str(actions[illegal[0]]) + ' in sequence ' +
+                                 str(rows[illegal[0]]) + ' at step ' + str(step))
+
+            codes[rows] = new_codes
+            rewards[rows, step] = self.code_scores[new_codes] - pars[rows]
+            done[rows] = OVER[new_codes]
+            lengths[rows] += 1
+
+        return self._results(codes, pars, done, lengths, rewards)
+
+    def play_policy(self, policy, n_rollouts, dealers=0):
+        """Licytacje prowadzone przez politykę aż do zakończenia wszystkich licytacji - zwraca słownik wyników
+        z dodatkowym kluczem 'actions' (działania, wymiary jak 'rewards', uzupełnione liczbami -1),
+        gdzie:
+        policy - funkcja policy(observation, action_masks) zwracająca tablicę działań dla trwających licytacji;
+        observation to słownik tablic jak w BridgeAuctionVecEnv (tylko trwające licytacje, brak wartości - liczba -1,
+        'Players hands' - ręce graczy rozdania o wymiarach (4, 52)), a action_masks - dostępne działania
+        n_rollouts - liczba licytacji
+        dealers - indeks rozdającego (wspólny) lub tablica indeksów dla kolejnych licytacji
+
+        Niedostępne działanie powoduje ValueError."""
+
+        codes, pars = self._start(n_rollouts, dealers)
+        done = np.zeros(n_rollouts, dtype=bool)
+        lengths = np.zeros(n_rollouts, dtype=np.intp)
+        rewards = np.zeros((n_rollouts, MAX_AUCTION_LENGTH), dtype=np.int32)
+        actions = np.full((n_rollouts, MAX_AUCTION_LENGTH), -1, dtype=np.int8)
+        rows = np.arange(n_rollouts)
+
+        for step in range(0, MAX_AUCTION_LENGTH):
+            if len(rows) == 0:
+                break
+
+            row_codes = codes[rows]
+            started = step > 0
+            contracts = _CONTRACTS[row_codes]
+            observation = {'whose turn': (auction_core.next_player(row_codes) - 1) % 4 if started else
+                           np.full(len(rows), -1),
+                           'whose next turn': auction_core.next_player(row_codes),
+                           'LAST_contract': contracts if started else np.full(len(rows), -1),
+                           'Player_contract': actions[rows, step - 1].astype(np.intp) if started else
+                           np.full(len(rows), -1),
+                           'winning_pair': np.where(contracts > 0, _DECLARERS[row_codes] % 2, -1),
+                           'double/redouble': _DOUBLES[row_codes],
+                           'Players hands': self.hands}
+            masks = LEGAL[row_codes]
+            row_actions = np.asarray(policy(observation, masks), dtype=np.intp)
+
+            if ((row_actions < 0) | (row_actions >= auction_core.N_ACTIONS)).any() or \
+                    not masks[np.arange(len(rows)), row_actions].all():
+                raise ValueError('Policy returned an illegal action at step ' + str(step))
+
+            new_codes = TRANSITIONS[row_codes, row_actions]
+            codes[rows] = new_codes
+            actions[rows, step] = row_actions
+            rewards[rows, step] = self.code_scores[new_codes] - pars[rows]
+            lengths[rows] += 1
+            over = OVER[new_codes]
+            done[rows[over]] = True
+            rows = rows[~over]
+
+        results = self._results(codes, pars, done, lengths, rewards)
+        results['actions'] = actions[:, :results['rewards'].shape[1]]
+
+        return results
@@ -0,0 +1,152 @@
+import numpy as np
+from gym_bridge_auction.envs.game import BIND_SUIT
+from gym_bridge_auction.envs.solver_results import CONTRACT_POINTS, PENALTY_POINTS, BONUS
+
+# Tablicowy zapis brydżowy - wartości punktowe wszystkich kontraktów wyznaczone jednorazowo przy imporcie modułu.
+# Wyznaczenie nagrody w trakcie licytacji sprowadza się do odczytu z tablicy.
+
+N_LEVELS = 8  # wysokości kontraktów 1-7 (indeks 0 nieużywany)
+N_DOUBLE_STATES = 3  # 0 - bez kontry, 1 - kontra, 2 - rekontra
+N_TRICKS = 14  # liczba wziętych lew 0-13
+N_CONTRACTS = 36  # identyfikatory odzywek 0 (pas - brak kontraktu) oraz 1-35 (7NT, ..., 1C) jak w przestrzeni akcji
+
+# wysokość, miano (indeks w BIND_SUIT) oraz indeks miana w wynikach solvera (kolejność S, H, D, C, NT)
+# dla odzywek o identyfikatorach 1-35
+CONTRACT_VALUES = np.arange(1, N_CONTRACTS)
+CONTRACT_LEVELS = 7 - (CONTRACT_VALUES - 1) // 5
+CONTRACT_STRAINS = len(BIND_SUIT) - 1 - (CONTRACT_VALUES - 1) % 5
+CONTRACT_TRICK_INDEXES = (CONTRACT_VALUES - 2) % 5
+
+DECLARER_SIGN = np.array([1, -1, 1, -1], dtype=np.int32)  # znak zapisu pary N-S dla rozgrywających N, E, S, W
+
+
+def contract_score(level, suit, double, tricks):
+    """Zapis brydżowy dla pary rozgrywającej (ujemny, gdy kontrakt nie jest realizowalny),
+    gdzie:
+    level - wysokość kontraktu (1-7)
+    suit - miano kontraktu ('C', 'D', 'H', 'S', 'NT')
+    double - 0 (bez kontry), 1 (kontra) lub 2 (rekontra)
+    tricks - maksymalna liczba lew rozgrywającego w danym mianie według solvera"""
+
+    max_contract = max(tricks - 6, 0)
+
+    if level <= max_contract:
+        # kontrakt jest realizowalny
+        # punkty za lewy
+        if suit == 'NT':
+            score = CONTRACT_POINTS['NT'][0] + (level - 1) * CONTRACT_POINTS['NT'][1]
+            trick_points = CONTRACT_POINTS['NT'][1]
+
+        else:
+            score = level * CONTRACT_POINTS[suit]
+            trick_points = CONTRACT_POINTS[suit]
+
+        # punkty za kontrę lub rekontrę plus premie
+        if double == 1:
+            score = score * CONTRACT_POINTS['X'] + BONUS['DOUBLE']
+            trick_points = BONUS['OVERTRICKS_DOUBLE']
+
+        elif double == 2:
+            score = score * CONTRACT_POINTS['XX'] + BONUS['REDOUBLE']
+            trick_points = BONUS['OVERTRICKS_REDOUBLE']
+
+        # premie za częściówki, dograne
+        score += BONUS['PARTIAL-GAME'] if score < 100 else BONUS['GAME']
+
+        # premie za szlemiki, szlemy
+        if level == 6:
+            score += BONUS['SLAM']
+
+        elif level == 7:
+            score += BONUS['GRAND_SLAM']
+
+        # premie za nadróbki
+        return score + trick_points * (max_contract - level)
+
+    # kontrakt nie jest realizowalny
+    trick_difference = level + 6 - tricks
+
+    if double == 0:
+        return - PENALTY_POINTS['NO DOUBLE/REDOUBLE'] * trick_difference
+
+    penalty = PENALTY_POINTS['DOUBLE'] if double == 1 else PENALTY_POINTS['REDOUBLE']
+    score = penalty[0] + penalty[0] * penalty[1] * (trick_difference - 1)
+
+    # premia za czwartą i każdą następną lewę wpadkową
+    if trick_difference >= 4:
+        score += penalty[0] * (trick_difference - 3)
+
+    return - score
+
+
+def _create_score_table():
+    """Tablica zapisów dla wszystkich wysokości, mian, stanów kontry/rekontry i liczb lew"""
+
+    table = np.zeros((N_LEVELS, len(BIND_SUIT), N_DOUBLE_STATES, N_TRICKS), dtype=np.int32)
+
+    for level in range(1, N_LEVELS):
+        for strain, suit in enumerate(BIND_SUIT):
+            for double in range(0, N_DOUBLE_STATES):
+                for tricks in range(0, N_TRICKS):
+                    table[level, strain, double, tricks] = contract_score(level, suit, double, tricks)
+
+    table.setflags(write=False)
+
+    return table
+
+
+# zapis dla pary rozgrywającej - indeksy: wysokość (1-7), miano (indeks w BIND_SUIT), kontra/rekontra (0-2),
+# maksymalna liczba lew rozgrywającego (0-13)
+SCORE_TABLE = _create_score_table()
+
+
+def score_contracts(levels, strains, doubles, tricks):
+    """Wsadowe wyznaczenie zapisów dla pary rozgrywającej - odczyt z SCORE_TABLE dla tablic (lub liczb) wysokości,
+    mian (indeksy w BIND_SUIT), stanów kontry/rekontry i liczb lew o zgodnych wymiarach"""
+
+    return SCORE_TABLE[levels, strains, doubles, tricks]
+
+
+def _create_contract_score_table():
+    """Tablica zapisów dla odzywek 0-35 - indeksy: identyfikator odzywki * 14 + liczba lew, kontra/rekontra"""
+
+    table = np.zeros((N_CONTRACTS, N_TRICKS, N_DOUBLE_STATES), dtype=np.int32)
+    table[1:] = np.moveaxis(SCORE_TABLE, 2, 3)[CONTRACT_LEVELS, CONTRACT_STRAINS]
+    table = table.reshape(N_CONTRACTS * N_TRICKS, N_DOUBLE_STATES)
+    table.setflags(write=False)
+
+    return table
+
+
+_CONTRACT_SCORE_TABLE = _create_contract_score_table()
+_CONTRACT_OFFSETS = (np.arange(N_CONTRACTS) * N_TRICKS)[:, None]
+# indeksy liczb lew rozgrywających N, E, S, W w wynikach solvera dla każdej odzywki (dla pasu nieistotne)
+_DECLARER_TRICK_INDEXES = np.zeros((N_CONTRACTS, 4), dtype=np.intp)
+_DECLARER_TRICK_INDEXES[1:] = 5 * np.arange(4) + CONTRACT_TRICK_INDEXES[:, None]
+
+
+def deal_score_table(number_of_tricks):
+    """Tablica zapisów dla pary N-S dla rozdania (lub wielu rozdań) o wymiarach (..., 36, 4, 3) - indeksy to
+    identyfikator odzywki określającej kontrakt (0 - brak kontraktu, zapis 0), rozgrywający (N, E, S, W)
+    i stan kontry/rekontry,
+    gdzie:
+    number_of_tricks - liczby lew z solvera (kolejność jak w get_results_from_solver), wymiary (..., 20)"""
+
+    number_of_tricks = np.asarray(number_of_tricks, dtype=np.intp)
+    table = _CONTRACT_SCORE_TABLE[_CONTRACT_OFFSETS + number_of_tricks[..., _DECLARER_TRICK_INDEXES]]
+    table *= DECLARER_SIGN[:, None]
+
+    return table
+
+
+def deal_scores(number_of_tricks, contracts, declarers, doubles):
+    """Wsadowe wyznaczenie zapisów dla pary N-S bez tworzenia tablic dla rozdań - odczyt tych samych wartości co
+    deal_score_table(number_of_tricks)[..., contracts, declarers, doubles],
+    gdzie:
+    number_of_tricks - liczby lew z solvera, wymiary (liczba rozdań, 20)
+    contracts, declarers, doubles - identyfikatory odzywek (0-35), rozgrywający i stany kontry/rekontry dla
+    kolejnych rozdań"""
+
+    tricks = np.take_along_axis(number_of_tricks, _DECLARER_TRICK_INDEXES[contracts, declarers][:, None], axis=1)
+
+    return _CONTRACT_SCORE_TABLE[_CONTRACT_OFFSETS[contracts, 0] + tricks[:, 0], doubles] * DECLARER_SIGN[declarers]
@@ -1,6 +1,37 @@
 
 #include "ddswrapper.h"
 
+static bool resourcesConfigured = false; //czy wątki i pamięć solvera zostały już skonfigurowane w tym procesie
+static int resourcesMemoryMB = 0; //ostatnio ustawiony limit pamięci (0 - bez limitu)
+static int resourcesThreads = 0; //ostatnio ustawiona liczba wątków (0 - wszystkie rdzenie)
+//kod pierwszego błędu solvera od początku wywołania funkcji z interfejsem C (RETURN_NO_FAULT - brak błędu)
+static thread_local int solverStatus = RETURN_NO_FAULT;
+
+void reportError(int res)
+{
+    //Wypisanie komunikatu o błędzie solvera i zapamiętanie kodu pierwszego błędu dla funkcji z interfejsem C)
+    char line[80];
+
+    ErrorMessage(res, line);
+    printf("DDS error: %s\n", line);
+
+    if (solverStatus == RETURN_NO_FAULT)
+    {
+        solverStatus = res;
+    }
+}
+
+void ensureResources()
+{
+    //Konfiguracja przy pierwszym wywołaniu solvera (domyślnie wszystkie rdzenie, pamięć bez limitu) oraz ponownie
+    //po zwolnieniu pamięci przez ddsFreeMemory - z ostatnio ustawionymi limitami
+    if (!resourcesConfigured)
+    {
+        SetResources(resourcesMemoryMB, resourcesThreads);
+        resourcesConfigured = true;
+    }
+}
+
 std::vector <int> calcResults(ddTableResults * table)
 {
     //Zwraca rezultaty najpierw dla North w kolejności: S, H, D, C, NT
@@ -21,14 +52,11 @@ std::vector <int> calcResults(ddTableResults * table)
 std::vector <int> calcTricksAndScore(std::string pbnHands, int dealer)
 {
     int res1, res2;
-    char line[80];
     ddTableResults table;
     parResultsDealer pres;
     ddTableDealPBN tableDealPBN;
 
-#if defined(__linux) || defined(__APPLE__) //ilość wątków
-  SetMaxThreads(0);
-#endif
+    ensureResources(); //konfiguracja wątków i pamięci solvera (tylko raz w procesie)
 
     char pbn[80];
     strcpy(pbn, pbnHands.c_str()); //zamiana rąk w stringach na char
@@ -39,8 +67,9 @@ std::vector <int> calcTricksAndScore(std::string pbnHands, int dealer)
 
     if (res1 != RETURN_NO_FAULT) //sprawdzenie błędów
     {
-        ErrorMessage(res1, line);
-        printf("DDS error: %s\n", line);
+        //tabela lew nie została wyznaczona - bez wywołania DealerPar, wynik zerowy (kod błędu w solverStatus)
+        reportError(res1);
+        return std::vector <int> (DDS_HANDS * DDS_STRAINS + 1, 0);
     }
 
     std::vector <int> result = calcResults(&table); //wektor z liczbami lew dla wszystkich graczy
@@ -49,8 +78,7 @@ std::vector <int> calcTricksAndScore(std::string pbnHands, int dealer)
 
     if (res2 != RETURN_NO_FAULT) //sprawdzenie błędów
     {
-        ErrorMessage(res2, line);
-        printf("DDS error: %s\n", line);
+        reportError(res2);
     }
 
     result.push_back(pres.score); //dodanie liczby punktów dla pary N-S za optymalny kontrakt do wektora wyników
@@ -58,9 +86,313 @@ std::vector <int> calcTricksAndScore(std::string pbnHands, int dealer)
     return result; //wektor wyników
 }
 
+int calcTablesBatch(const std::vector <std::string> & pbnHands, size_t start, int count, ddTablesRes * tables)
+{
+    //Wyliczenie ilości lew dla paczki rozdań pbnHands[start, start + count) na wszystkich wątkach solvera - zwraca
+    //kod CalcAllTablesPBN
+    int res;
+    int trumpFilter[DDS_STRAINS] = {0, 0, 0, 0, 0}; //wyliczenia dla wszystkich mian
+    ddTableDealsPBN tableDealsPBN;
+    allParResults pars;
+
+    tableDealsPBN.noOfTables = count;
+    for (int i = 0; i < count; i++)
+    {
+        strcpy(tableDealsPBN.deals[i].cards, pbnHands[start + i].c_str());
+    }
+
+    res = CalcAllTablesPBN(&tableDealsPBN, -1, trumpFilter, tables, &pars); //mode = -1 - bez wyliczania par
+
+    if (res != RETURN_NO_FAULT) //sprawdzenie błędów
+    {
+        reportError(res);
+    }
+
+    return res;
+}
+
+std::vector <int> calcTricksAndScoreBatch(std::vector <std::string> pbnHands, std::vector <int> dealers)
+{
+    //Zwraca wyniki kolejnych rozdań jedno po drugim, dla każdego rozdania:
+    //liczby lew w kolejności jak w calcResults oraz zapis dla pary N-S za optymalny kontrakt
+    int res;
+    ddTablesRes tables;
+    parResultsDealer pres;
+    std::vector <int> result;
+
+    result.reserve(pbnHands.size() * (DDS_HANDS * DDS_STRAINS + 1));
+
+    ensureResources(); //konfiguracja wątków i pamięci solvera (tylko raz w procesie)
+
+    //rozdania przekazywane są do solvera w paczkach po MAXNOOFTABLES (tyle obsługuje jedno wywołanie)
+    for (size_t start = 0; start < pbnHands.size(); start += MAXNOOFTABLES)
+    {
+        int count = static_cast<int>(std::min(pbnHands.size() - start, static_cast<size_t>(MAXNOOFTABLES)));
+
+        if (calcTablesBatch(pbnHands, start, count, &tables) != RETURN_NO_FAULT)
+        {
+            //tabele lew nie zostały wyznaczone - wyniki zerowe dla całej paczki (kod błędu w solverStatus)
+            result.insert(result.end(), count * (DDS_HANDS * DDS_STRAINS + 1), 0);
+            continue;
+        }
+
+        for (int i = 0; i < count; i++)
+        {
+            std::vector <int> tricks = calcResults(&tables.results[i]);
+            result.insert(result.end(), tricks.begin(), tricks.end());
+
+            res = DealerPar(&tables.results[i], &pres, dealers[start + i], 0); //optymalny kontrakt dla rozdania
+
+            if (res != RETURN_NO_FAULT) //sprawdzenie błędów
+            {
+                reportError(res);
+            }
+
+            result.push_back(pres.score);
+        }
+    }
+
+    return result; //wektor wyników
+}
+
+void appendPars(ddTableResults * table, int vulnerabilities, std::vector <int> & result)
+{
+    //Dopisanie do wektora wyników zapisów dla pary N-S za optymalny kontrakt dla rozdających N, E, S i W
+    //kolejno dla stref 0 .. vulnerabilities - 1 (kod jak w DealerPar: 0 - obie przed partią, 1 - obie po partii,
+    //2 - N-S po partii, 3 - E-W po partii) - bez ponownego rozwiązywania rozdania
+    int res;
+    parResultsDealer pres;
+
+    for (int vulnerable = 0; vulnerable < vulnerabilities; vulnerable++)
+    {
+        for (int dealer = 0; dealer < DDS_HANDS; dealer++)
+        {
+            res = DealerPar(table, &pres, dealer, vulnerable); //optymalny kontrakt dla rozdającego i strefy
+
+            if (res != RETURN_NO_FAULT) //sprawdzenie błędów
+            {
+                reportError(res);
+            }
+
+            result.push_back(pres.score);
+        }
+    }
+}
+
+std::vector <int> calcTricksAndParsForVulnerabilities(std::string pbnHands, int vulnerabilities)
+{
+    //Zwraca liczby lew w kolejności jak w calcResults oraz zapisy optymalne (appendPars) - rozdanie liczone jest
+    //tylko raz
+    int res;
+    ddTableResults table;
+    ddTableDealPBN tableDealPBN;
+
+    ensureResources(); //konfiguracja wątków i pamięci solvera (tylko raz w procesie)
+
+    strcpy(tableDealPBN.cards, pbnHands.c_str()); //wczytanie rąk do odpowiedniej zmiennej
+
+    res = CalcDDtablePBN(tableDealPBN, &table); //wyliczenie ilości lew jaką wezmą gracze z partnerem dla danego miana
+
+    if (res != RETURN_NO_FAULT) //sprawdzenie błędów
+    {
+        //tabela lew nie została wyznaczona - bez wywołania DealerPar, wynik zerowy (kod błędu w solverStatus)
+        reportError(res);
+        return std::vector <int> (DDS_HANDS * DDS_STRAINS + DDS_HANDS * vulnerabilities, 0);
+    }
+
+    std::vector <int> result = calcResults(&table); //wektor z liczbami lew dla wszystkich graczy
+    appendPars(&table, vulnerabilities, result);
+
+    return result; //wektor wyników
+}
+
+std::vector <int> calcTricksAndParsForVulnerabilitiesBatch(std::vector <std::string> pbnHands, int vulnerabilities)
+{
+    //Zwraca wyniki kolejnych rozdań jedno po drugim, dla każdego rozdania:
+    //liczby lew w kolejności jak w calcResults oraz zapisy optymalne (appendPars)
+    ddTablesRes tables;
+    std::vector <int> result;
+
+    result.reserve(pbnHands.size() * (DDS_HANDS * DDS_STRAINS + DDS_HANDS * vulnerabilities));
+
+    ensureResources(); //konfiguracja wątków i pamięci solvera (tylko raz w procesie)
+
+    for (size_t start = 0; start < pbnHands.size(); start += MAXNOOFTABLES)
+    {
+        int count = static_cast<int>(std::min(pbnHands.size() - start, static_cast<size_t>(MAXNOOFTABLES)));
+
+        if (calcTablesBatch(pbnHands, start, count, &tables) != RETURN_NO_FAULT)
+        {
+            //tabele lew nie zostały wyznaczone - wyniki zerowe dla całej paczki (kod błędu w solverStatus)
+            result.insert(result.end(), count * (DDS_HANDS * DDS_STRAINS + DDS_HANDS * vulnerabilities), 0);
+            continue;
+        }
+
+        for (int i = 0; i < count; i++)
+        {
+            std::vector <int> tricks = calcResults(&tables.results[i]);
+            result.insert(result.end(), tricks.begin(), tricks.end());
+            appendPars(&tables.results[i], vulnerabilities, result);
+        }
+    }
+
+    return result; //wektor wyników
+}
+
+std::vector <int> calcTricksAndPars(std::string pbnHands)
+{
+    //Zwraca liczby lew w kolejności jak w calcResults oraz zapisy dla pary N-S za optymalny kontrakt
+    //kolejno dla rozdającego N, E, S i W (obie pary przed partią) - rozdanie liczone jest tylko raz
+    return calcTricksAndParsForVulnerabilities(pbnHands, 1);
+}
 
+std::vector <int> calcTricksAndParsBatch(std::vector <std::string> pbnHands)
+{
+    //Zwraca wyniki kolejnych rozdań jedno po drugim, dla każdego rozdania:
+    //liczby lew w kolejności jak w calcResults oraz zapisy optymalne dla rozdających N, E, S i W
+    return calcTricksAndParsForVulnerabilitiesBatch(pbnHands, 1);
+}
+
+std::vector <int> calcTricksAndParTable(std::string pbnHands)
+{
+    //Zwraca liczby lew w kolejności jak w calcResults oraz zapisy optymalne dla wszystkich rozdających i stref
+    return calcTricksAndParsForVulnerabilities(pbnHands, DDS_VULNERABILITIES);
+}
 
+std::vector <int> calcTricksAndParTableBatch(std::vector <std::string> pbnHands)
+{
+    //Wersja wsadowa calcTricksAndParTable
+    return calcTricksAndParsForVulnerabilitiesBatch(pbnHands, DDS_VULNERABILITIES);
+}
 
+//Funkcje z interfejsem C - wywoływane z Pythona przez ctypes, bez parsowania nagłówków przez cppyy
 
+int copyResults(const std::vector <int> & result, int * out)
+{
+    //Skopiowanie wektora wyników do bufora przekazanego przez wywołującego - po błędzie solvera zwracany jest kod
+    //pierwszego błędu, a bufor nie jest zmieniany (wyniki nie są poprawne)
+    if (solverStatus != RETURN_NO_FAULT)
+    {
+        return solverStatus;
+    }
 
+    std::copy(result.begin(), result.end(), out);
 
+    return RETURN_NO_FAULT;
+}
+
+EXTERN_C int ddsCalcTricksAndScore(const char * pbnHands, int dealer, int * out)
+{
+    try
+    {
+        solverStatus = RETURN_NO_FAULT;
+        return copyResults(calcTricksAndScore(std::string(pbnHands), dealer), out);
+    }
+    catch (...)
+    {
+        return RETURN_UNKNOWN_FAULT;
+    }
+}
+
+EXTERN_C int ddsCalcTricksAndScoreBatch(const char ** pbnHands, const int * dealers, int count, int * out)
+{
+    try
+    {
+        solverStatus = RETURN_NO_FAULT;
+        std::vector <std::string> hands(pbnHands, pbnHands + count);
+        std::vector <int> dealersVector(dealers, dealers + count);
+
+        return copyResults(calcTricksAndScoreBatch(hands, dealersVector), out);
+    }
+    catch (...)
+    {
+        return RETURN_UNKNOWN_FAULT;
+    }
+}
+
+EXTERN_C int ddsCalcTricksAndPars(const char * pbnHands, int * out)
+{
+    try
+    {
+        solverStatus = RETURN_NO_FAULT;
+        return copyResults(calcTricksAndPars(std::string(pbnHands)), out);
+    }
+    catch (...)
+    {
+        return RETURN_UNKNOWN_FAULT;
+    }
+}
+
+EXTERN_C int ddsCalcTricksAndParsBatch(const char ** pbnHands, int count, int * out)
+{
+    try
+    {
+        solverStatus = RETURN_NO_FAULT;
+        std::vector <std::string> hands(pbnHands, pbnHands + count);
+
+        return copyResults(calcTricksAndParsBatch(hands), out);
+    }
+    catch (...)
+    {
+        return RETURN_UNKNOWN_FAULT;
+    }
+}
+
+EXTERN_C int ddsCalcTricksAndParTable(const char * pbnHands, int * out)
+{
+    try
+    {
+        solverStatus = RETURN_NO_FAULT;
+        return copyResults(calcTricksAndParTable(std::string(pbnHands)), out);
+    }
+    catch (...)
+    {
+        return RETURN_UNKNOWN_FAULT;
+    }
+}
+
+EXTERN_C int ddsCalcTricksAndParTableBatch(const char ** pbnHands, int count, int * out)
+{
+    try
+    {
+        solverStatus = RETURN_NO_FAULT;
+        std::vector <std::string> hands(pbnHands, pbnHands + count);
+
+        return copyResults(calcTricksAndParTableBatch(hands), out);
+    }
+    catch (...)
+    {
+        return RETURN_UNKNOWN_FAULT;
+    }
+}
+
+EXTERN_C int ddsSetResources(int threading, int maxMemoryMB, int maxThreads)
+{
+    //Wybór implementacji wątków (threading < 0 - domyślna) oraz limitów pamięci i liczby wątków solvera
+    if (threading >= 0)
+    {
+        int res = SetThreading(threading);
+
+        if (res != RETURN_NO_FAULT)
+        {
+            return res;
+        }
+    }
+
+    resourcesMemoryMB = maxMemoryMB;
+    resourcesThreads = maxThreads;
+    SetResources(maxMemoryMB, maxThreads);
+    resourcesConfigured = true;
+
+    return RETURN_NO_FAULT;
+}
+
+EXTERN_C int ddsFreeMemory()
+{
+    //Zwolnienie pamięci tablic transpozycji wszystkich wątków solvera
+    //(solver nie przydziela jej ponownie sam - następne wywołanie ponownie konfiguruje wątki i pamięć)
+    FreeMemory();
+    resourcesConfigured = false;
+
+    return RETURN_NO_FAULT;
+}
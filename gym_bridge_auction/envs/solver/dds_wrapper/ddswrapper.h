@@ -7,6 +7,11 @@
 #include <string.h>
 #include "../dds/include/dll.h"
 #include <vector>
+#include <algorithm>
+
+void reportError(int res); //wypisanie komunikatu o błędzie solvera i zapamiętanie kodu pierwszego błędu
+
+void ensureResources(); //domyślna konfiguracja wątków i pamięci solvera przy pierwszym wywołaniu w procesie
 
 std::vector <int> calcResults(ddTableResults * table); //funkcja zapisująca wyliczenia lew do wektora
 
@@ -20,4 +25,83 @@ std::vector <int> calcTricksAndScore(std::string pbnHands, int dealer);
 //następnie East, South i West
 //w ostatniej komórce wartość zapisu dla pary N-S za optymalny kontrakt
 
+int calcTablesBatch(const std::vector <std::string> & pbnHands, size_t start, int count, ddTablesRes * tables);
+//funkcja wyliczająca lewy dla paczki (maksymalnie MAXNOOFTABLES) rozdań za pomocą CalcAllTablesPBN (zwraca jej kod)
+
+std::vector <int> calcTricksAndScoreBatch(std::vector <std::string> pbnHands, std::vector <int> dealers);
+//Wersja wsadowa funkcji calcTricksAndScore - wiele rozdań liczonych równolegle przez CalcAllTablesPBN
+//Za parametr przyjmuje:
+//Listę rąk graczy w formacie PBN dla kolejnych rozdań
+//Listę liczb określających rozdającego w kolejnych rozdaniach
+//Zwraca jeden wektor, w którym wyniki kolejnych rozdań (po 21 liczb, kolejność jak w calcTricksAndScore)
+//umieszczone są jeden po drugim
+
+std::vector <int> calcTricksAndPars(std::string pbnHands);
+//Funkcja obliczająca liczby lew jak calcTricksAndScore, ale zwracająca zapisy za optymalny kontrakt dla każdego
+//z możliwych rozdających (rozdanie jest rozwiązywane tylko raz)
+//Za parametr przyjmuje:
+//Ręce graczy w formacie PBN
+//Zwraca wektor wyników w kolejności:
+//20 liczb lew jak w calcTricksAndScore
+//następnie wartości zapisu dla pary N-S za optymalny kontrakt, gdy rozdającym jest kolejno N, E, S i W
+
+std::vector <int> calcTricksAndParsBatch(std::vector <std::string> pbnHands);
+//Wersja wsadowa funkcji calcTricksAndPars
+//Za parametr przyjmuje listę rąk graczy w formacie PBN dla kolejnych rozdań
+//Zwraca jeden wektor, w którym wyniki kolejnych rozdań (po 24 liczby, kolejność jak w calcTricksAndPars)
+//umieszczone są jeden po drugim
+
+#define DDS_VULNERABILITIES 4 //liczba stref (kod jak w DealerPar: brak, obie, N-S, E-W)
+
+void appendPars(ddTableResults * table, int vulnerabilities, std::vector <int> & result);
+//funkcja dopisująca zapisy optymalne dla rozdających N, E, S, W i stref 0 .. vulnerabilities - 1 (strefa po strefie)
+
+std::vector <int> calcTricksAndParsForVulnerabilities(std::string pbnHands, int vulnerabilities);
+//funkcja wspólna dla calcTricksAndPars i calcTricksAndParTable - 20 liczb lew i 4 * vulnerabilities zapisów
+
+std::vector <int> calcTricksAndParsForVulnerabilitiesBatch(std::vector <std::string> pbnHands, int vulnerabilities);
+//wersja wsadowa funkcji calcTricksAndParsForVulnerabilities
+
+std::vector <int> calcTricksAndParTable(std::string pbnHands);
+//Funkcja obliczająca liczby lew jak calcTricksAndPars, ale zwracająca zapisy za optymalny kontrakt dla każdego
+//z rozdających i każdej strefy (rozdanie jest rozwiązywane tylko raz)
+//Za parametr przyjmuje:
+//Ręce graczy w formacie PBN
+//Zwraca wektor wyników w kolejności:
+//20 liczb lew jak w calcTricksAndScore
+//następnie 16 wartości zapisu dla pary N-S za optymalny kontrakt - dla stref kolejno: obie pary przed partią,
+//obie po partii, N-S po partii, E-W po partii, a w każdej strefie dla rozdającego N, E, S i W
+//(pierwsze 24 liczby są takie same jak w calcTricksAndPars)
+
+std::vector <int> calcTricksAndParTableBatch(std::vector <std::string> pbnHands);
+//Wersja wsadowa funkcji calcTricksAndParTable (po 36 liczb na rozdanie, jedno rozdanie po drugim)
+
+int copyResults(const std::vector <int> & result, int * out);
+//kopiowanie wyników do bufora wywołującego (po błędzie solvera zwraca kod błędu i nie zmienia bufora)
+
+//Funkcje z interfejsem C (extern "C") - odpowiedniki powyższych funkcji wywoływane przez ctypes
+//Wyniki zapisywane są do bufora out (wywołujący przydziela 21, 21 * count, 24, 24 * count, 36 lub 36 * count liczb)
+//Zwracają RETURN_NO_FAULT, kod pierwszego błędu zgłoszonego przez CalcDDtablePBN, CalcAllTablesPBN lub DealerPar
+//(wtedy bufor out nie jest zmieniany) albo RETURN_UNKNOWN_FAULT w przypadku wyjątku
+
+EXTERN_C int ddsCalcTricksAndScore(const char * pbnHands, int dealer, int * out);
+
+EXTERN_C int ddsCalcTricksAndScoreBatch(const char ** pbnHands, const int * dealers, int count, int * out);
+
+EXTERN_C int ddsCalcTricksAndPars(const char * pbnHands, int * out);
+
+EXTERN_C int ddsCalcTricksAndParsBatch(const char ** pbnHands, int count, int * out);
+
+EXTERN_C int ddsCalcTricksAndParTable(const char * pbnHands, int * out);
+
+EXTERN_C int ddsCalcTricksAndParTableBatch(const char ** pbnHands, int count, int * out);
+
+EXTERN_C int ddsSetResources(int threading, int maxMemoryMB, int maxThreads);
+//Konfiguracja solvera - jednorazowo w procesie, przed pierwszym wywołaniem lub w celu zmiany ustawień
+//threading - implementacja wątków (kod jak w SetThreading, wartość ujemna - domyślna)
+//maxMemoryMB - limit pamięci (0 - bez limitu), maxThreads - liczba wątków (0 - wszystkie rdzenie)
+
+EXTERN_C int ddsFreeMemory();
+//Zwolnienie pamięci tablic transpozycji solvera (kolejne wywołania przydzielają ją ponownie)
+
 #endif // DDSWRAPPER_H
@@ -0,0 +1,317 @@
+import ctypes
+import os
+import threading
+import warnings
+import numpy as np
+
+# Połączenie z biblioteką Double Dummy Solver (libdds.so) i przygotowanym do niej wrapperem (libddswrapper.so).
+# Biblioteki ładowane są tylko raz w danym procesie. Domyślnie wykorzystywany jest interfejs C wrappera wywoływany
+# przez ctypes, który nie wymaga parsowania nagłówków C++ i kompilacji JIT przez cppyy. Jeśli zainstalowana wersja
+# wrappera nie zawiera funkcji z interfejsem C, wykorzystywany jest cppyy (nagłówek wczytywany również tylko raz).
+
+# katalogi bibliotek w pakiecie - ścieżki niezależne od bieżącego katalogu roboczego
+SOLVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solver')
+DDS_LIBRARY = os.path.join(SOLVER_DIR, 'dds', 'src', 'libdds.so')
+WRAPPER_LIBRARY = os.path.join(SOLVER_DIR, 'dds_wrapper', 'libddswrapper.so')
+WRAPPER_HEADER = os.path.join(SOLVER_DIR, 'dds_wrapper', 'ddswrapper.h')
+
+TRICKS_SIZE = 20  # liczby lew - 4 graczy x 5 mian
+RESULT_SIZE = TRICKS_SIZE + 1  # liczby lew i zapis optymalny dla jednego rozdającego
+PARS_RESULT_SIZE = TRICKS_SIZE + 4  # liczby lew i zapisy optymalne dla każdego z rozdających
+# strefy w kolejności kodów DealerPar - obie pary przed partią, obie po partii, N-S po partii, E-W po partii
+VULNERABILITIES = ['none', 'both', 'NS', 'EW']
+PAR_TABLE_SIZE = 4 * len(VULNERABILITIES)  # zapisy optymalne dla każdego rozdającego i każdej strefy
+PAR_TABLE_RESULT_SIZE = TRICKS_SIZE + PAR_TABLE_SIZE  # liczby lew i tablica zapisów optymalnych
+
+RETURN_NO_FAULT = 1  # kod poprawnego wykonania funkcji solvera
+
+# implementacje wątków solvera - indeks to kod przekazywany do SetThreading (jak w DDSInfo.threading)
+THREADING_BACKENDS = ['none', 'winapi', 'openmp', 'gcd', 'boost', 'stl', 'tbb', 'stl-impl', 'ppl-impl']
+
+# ustawienia solvera dla typowych zastosowań:
+# 'worker' - proces roboczy z jednym środowiskiem lub wieloma procesami na maszynie (jeden wątek solvera i mała tablica
+# transpozycji, bez nadsubskrypcji rdzeni)
+# 'batch' - wsadowe rozwiązywanie rozdań w jednym procesie (np. tworzenie puli rozdań) na wszystkich rdzeniach
+SOLVER_PRESETS = {'worker': {'threads': 1, 'memory_mb': 30, 'threading': None},
+                  'batch': {'threads': 0, 'memory_mb': 0, 'threading': None}}
+
+_load_lock = threading.Lock()  # blokada jednokrotnego ładowania bibliotek
+# Double Dummy Solver nie pozwala na równoczesne wywołania z wielu wątków (np. wątków wstępnie przygotowujących
+# rozdania) - wywołania są szeregowane, a solver sam rozdziela pracę na swoje wątki
+_solver_lock = threading.Lock()
+_library = None  # załadowany wrapper (ctypes.CDLL)
+_dds = None  # załadowana biblioteka Double Dummy Solver (ctypes.CDLL)
+_cppyy = None  # moduł cppyy, gdy wrapper nie udostępnia interfejsu C
+
+
+class DDSInfo(ctypes.Structure):
+    """Informacje o konfiguracji solvera (struktura DDSInfo z dll.h)"""
+
+    _fields_ = [('major', ctypes.c_int), ('minor', ctypes.c_int), ('patch', ctypes.c_int),
+                ('versionString', ctypes.c_char * 10), ('system', ctypes.c_int), ('numBits', ctypes.c_int),
+                ('compiler', ctypes.c_int), ('constructor', ctypes.c_int), ('numCores', ctypes.c_int),
+                ('threading', ctypes.c_int), ('noOfThreads', ctypes.c_int), ('threadSizes', ctypes.c_char * 128),
+                ('systemString', ctypes.c_char * 1024)]
+
+
+def _load_shared_library(path, name, mode):
+    """Załadowanie biblioteki z katalogu pakietu, a gdy to niemożliwe - z domyślnych lokalizacji systemowych"""
+
+    try:
+        return ctypes.CDLL(path, mode=mode)
+    except OSError:
+        return ctypes.CDLL(name, mode=mode)
+
+
+def load_library():
+    """Załadowanie bibliotek solvera (tylko przy pierwszym wywołaniu w procesie) i zwrócenie wrappera"""
+
+    global _library, _dds, _cppyy
+
+    with _load_lock:
+        if _library is None:
+            # libdds.so ładowana jest globalnie, aby wrapper znalazł ją bez konfiguracji ścieżek systemowych
+            _dds = _load_shared_library(DDS_LIBRARY, 'libdds.so', ctypes.RTLD_GLOBAL)
+            _dds.GetDDSInfo.argtypes = [ctypes.POINTER(DDSInfo)]
+            _dds.GetDDSInfo.restype = None
+            _dds.ErrorMessage.argtypes = [ctypes.c_int, ctypes.c_char_p]
+            _dds.ErrorMessage.restype = None
+            library = _load_shared_library(WRAPPER_LIBRARY, 'libddswrapper.so', ctypes.RTLD_GLOBAL)
+
+            try:
+                int_pointer = ctypes.POINTER(ctypes.c_int)
+                char_pointers = ctypes.POINTER(ctypes.c_char_p)
+                library.ddsCalcTricksAndScore.argtypes = [ctypes.c_char_p, ctypes.c_int, int_pointer]
+                library.ddsCalcTricksAndScoreBatch.argtypes = [char_pointers, int_pointer, ctypes.c_int, int_pointer]
+                library.ddsCalcTricksAndPars.argtypes = [ctypes.c_char_p, int_pointer]
+                library.ddsCalcTricksAndParsBatch.argtypes = [char_pointers, ctypes.c_int, int_pointer]
+                library.ddsCalcTricksAndParTable.argtypes = [ctypes.c_char_p, int_pointer]
+                library.ddsCalcTricksAndParTableBatch.argtypes = [char_pointers, ctypes.c_int, int_pointer]
+                library.ddsSetResources.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+                library.ddsFreeMemory.argtypes = []
+            except AttributeError:
+                # starsza wersja wrappera bez interfejsu C
+                import cppyy
+                cppyy.include(WRAPPER_HEADER)
+                cppyy.load_library(library._name)
+                _cppyy = cppyy
+
+            _library = library
+
+    return _library
+
+
+def _int_pointer(array):
+    """Wskaźnik na dane tablicy NumPy typu int32"""
+
+    return array.ctypes.data_as(ctypes.POINTER(ctypes.c_int))
+
+
+def _check(result):
+    """Sprawdzenie kodu zwróconego przez funkcję wrappera - kod błędu solvera (np. z CalcDDtablePBN, CalcAllTablesPBN
+    lub DealerPar) powoduje RuntimeError z opisem błędu (ErrorMessage), a wyniki nie są zwracane"""
+
+    if result != RETURN_NO_FAULT:
+        line = ctypes.create_string_buffer(80)
+        _dds.ErrorMessage(result, line)
+        raise RuntimeError('DDS error ' + str(result) + ': ' + line.value.decode(errors='replace'))
+
+
+def _call_cppyy(name, *args):
+    """Wywołanie funkcji wrappera przez cppyy i zamiana wyniku na tablicę NumPy"""
+
+    function = getattr(_cppyy.gbl, name)
+    function.__release_gil__ = True  # inne wątki Pythona działają w czasie pracy solvera
+
+    with _solver_lock:
+        result = function(*args)
+
+    return np.fromiter(result, dtype=np.int32, count=result.size())
+
+
+def _pbn_vector(pbns):
+    """Lista rozdań PBN jako std::vector<std::string> (ścieżka cppyy)"""
+
+    return _cppyy.gbl.std.vector['std::string']([_cppyy.gbl.std.string(pbn) for pbn in pbns])
+
+
+def calc_tricks_and_score(pbn, dealer):
+    """Liczby lew i zapis optymalny dla pary N-S dla jednego rozdania - tablica 21 liczb (jak calcTricksAndScore)"""
+
+    library = load_library()
+
+    if _cppyy is not None:
+        return _call_cppyy('calcTricksAndScore', _cppyy.gbl.std.string(pbn), int(dealer))
+
+    out = np.empty(RESULT_SIZE, dtype=np.int32)
+
+    with _solver_lock:
+        _check(library.ddsCalcTricksAndScore(pbn.encode(), int(dealer), _int_pointer(out)))
+
+    return out
+
+
+def calc_tricks_and_score_batch(pbns, dealers):
+    """Wyniki dla wielu rozdań - tablica o wymiarach (liczba rozdań, 21) (jak calcTricksAndScoreBatch)"""
+
+    library = load_library()
+    count = len(pbns)
+
+    if _cppyy is not None:
+        dealer_vector = _cppyy.gbl.std.vector['int']([int(dealer) for dealer in dealers])
+        return _call_cppyy('calcTricksAndScoreBatch', _pbn_vector(pbns), dealer_vector).reshape(count, RESULT_SIZE)
+
+    out = np.empty((count, RESULT_SIZE), dtype=np.int32)
+    pbn_array = (ctypes.c_char_p * count)(*[pbn.encode() for pbn in pbns])
+    dealer_array = np.ascontiguousarray(dealers, dtype=np.int32)
+
+    with _solver_lock:
+        _check(library.ddsCalcTricksAndScoreBatch(pbn_array, _int_pointer(dealer_array), count, _int_pointer(out)))
+
+    return out
+
+
+def calc_tricks_and_pars(pbn):
+    """Liczby lew i zapisy optymalne dla rozdających N, E, S, W - tablica 24 liczb (jak calcTricksAndPars)"""
+
+    library = load_library()
+
+    if _cppyy is not None:
+        return _call_cppyy('calcTricksAndPars', _cppyy.gbl.std.string(pbn))
+
+    out = np.empty(PARS_RESULT_SIZE, dtype=np.int32)
+
+    with _solver_lock:
+        _check(library.ddsCalcTricksAndPars(pbn.encode(), _int_pointer(out)))
+
+    return out
+
+
+def calc_tricks_and_pars_batch(pbns):
+    """Wyniki dla wielu rozdań - tablica o wymiarach (liczba rozdań, 24) (jak calcTricksAndParsBatch)"""
+
+    library = load_library()
+    count = len(pbns)
+
+    if _cppyy is not None:
+        return _call_cppyy('calcTricksAndParsBatch', _pbn_vector(pbns)).reshape(count, PARS_RESULT_SIZE)
+
+    out = np.empty((count, PARS_RESULT_SIZE), dtype=np.int32)
+    pbn_array = (ctypes.c_char_p * count)(*[pbn.encode() for pbn in pbns])
+
+    with _solver_lock:
+        _check(library.ddsCalcTricksAndParsBatch(pbn_array, count, _int_pointer(out)))
+
+    return out
+
+
+def par_index(dealer, vulnerability=0):
+    """Indeks zapisu optymalnego dla danego rozdającego i strefy (indeks w VULNERABILITIES) w tablicy zapisów
+    optymalnych - pierwsze 4 zapisy (obie pary przed partią) są takie same jak w calc_tricks_and_pars"""
+
+    return 4 * vulnerability + dealer
+
+
+def calc_tricks_and_par_table(pbn):
+    """Liczby lew i zapisy optymalne dla każdego rozdającego i strefy - tablica 36 liczb (jak calcTricksAndParTable,
+    zapisy w kolejności par_index)"""
+
+    library = load_library()
+
+    if _cppyy is not None:
+        return _call_cppyy('calcTricksAndParTable', _cppyy.gbl.std.string(pbn))
+
+    out = np.empty(PAR_TABLE_RESULT_SIZE, dtype=np.int32)
+
+    with _solver_lock:
+        _check(library.ddsCalcTricksAndParTable(pbn.encode(), _int_pointer(out)))
+
+    return out
+
+
+def calc_tricks_and_par_table_batch(pbns):
+    """Wyniki dla wielu rozdań - tablica o wymiarach (liczba rozdań, 36) (jak calcTricksAndParTableBatch)"""
+
+    library = load_library()
+    count = len(pbns)
+
+    if _cppyy is not None:
+        return _call_cppyy('calcTricksAndParTableBatch', _pbn_vector(pbns)).reshape(count, PAR_TABLE_RESULT_SIZE)
+
+    out = np.empty((count, PAR_TABLE_RESULT_SIZE), dtype=np.int32)
+    pbn_array = (ctypes.c_char_p * count)(*[pbn.encode() for pbn in pbns])
+
+    with _solver_lock:
+        _check(library.ddsCalcTricksAndParTableBatch(pbn_array, count, _int_pointer(out)))
+
+    return out
+
+
+def configure(threads=0, memory_mb=0, threading=None):
+    """Konfiguracja wątków i pamięci Double Dummy Solver w bieżącym procesie - wywoływana raz, przed pierwszym
+    rozwiązaniem rozdania (lub ponownie w celu zmiany ustawień). Bez wywołania tej funkcji solver przy pierwszym
+    użyciu konfigurowany jest raz na wszystkie rdzenie i bez limitu pamięci.
+
+    Parametry:
+        threads (int) - maksymalna liczba wątków solvera (0 - liczba rdzeni)
+        memory_mb (int) - limit pamięci tablic transpozycji w MB (0 - bez limitu, maksymalnie 70% wolnej pamięci)
+        threading (str) - implementacja wątków z THREADING_BACKENDS (None - domyślna dla kompilacji biblioteki)
+
+    Zwraca słownik z konfiguracją ustawioną przez solver (solver_info)."""
+
+    library = load_library()
+
+    if _cppyy is not None:
+        raise RuntimeError('Solver configuration requires libddswrapper.so built with the C interface')
+
+    code = -1 if threading is None else THREADING_BACKENDS.index(threading)
+
+    with _solver_lock:
+        _check(library.ddsSetResources(code, int(memory_mb), int(threads)))
+
+    return solver_info()
+
+
+def configure_preset(name):
+    """Konfiguracja solvera według jednego z ustawień SOLVER_PRESETS ('worker' lub 'batch') - zwraca konfigurację
+    ustawioną przez solver (solver_info). Ustawienia są tylko optymalizacją, więc z wrapperem bez interfejsu C
+    (cppyy) nie są stosowane - zgłaszane jest ostrzeżenie RuntimeWarning, solver zachowuje konfigurację domyślną,
+    a funkcja zwraca None (np. procesy robocze SubprocAuctionVecEnv i generate_dataset działają dalej)."""
+
+    preset = SOLVER_PRESETS[name]
+    load_library()
+
+    if _cppyy is not None:
+        warnings.warn('Solver preset ' + repr(name) + ' not applied - libddswrapper.so is built without the C '
+                      'interface', RuntimeWarning)
+        return None
+
+    return configure(**preset)
+
+
+def free_memory():
+    """Zwolnienie pamięci tablic transpozycji solvera (np. przed zakończeniem procesu roboczego lub po wsadowym
+    rozwiązaniu rozdań) - kolejne wywołania solvera przydzielają ją ponownie"""
+
+    library = load_library()
+
+    if _cppyy is not None:
+        raise RuntimeError('Solver configuration requires libddswrapper.so built with the C interface')
+
+    with _solver_lock:
+        _check(library.ddsFreeMemory())
+
+
+def solver_info():
+    """Bieżąca konfiguracja solvera - wersja, liczba rdzeni, implementacja wątków, liczba wątków i rozmiary tablic
+    transpozycji (L - duża, S - mała dla kolejnych wątków)"""
+
+    load_library()
+    info = DDSInfo()
+
+    with _solver_lock:
+        _dds.GetDDSInfo(ctypes.byref(info))
+
+    return {'version': info.versionString.decode(), 'cores': info.numCores,
+            'threading': THREADING_BACKENDS[info.threading] if 0 <= info.threading < len(THREADING_BACKENDS) else None,
+            'threads': info.noOfThreads, 'thread_sizes': info.threadSizes.decode()}
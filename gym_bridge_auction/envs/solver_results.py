@@ -1,7 +1,12 @@
 from gym_bridge_auction.envs.game import *
-# biblioteka umożliwiająca połączenie C++ i Python
-import cppyy
+# połączenie z biblioteką Double Dummy Solver napisaną w C++ (ładowaną raz w procesie)
+from gym_bridge_auction.envs import solver_binding
+from gym_bridge_auction.envs.solver_service import SolverServiceClient
 import time
+import os
+import fcntl
+import threading
+import numpy as np
 
 # wartości punktowe z zapisu brydżowego do wyznaczenia funkcji nagrody
 CONTRACT_POINTS = {'C': 20, 'D': 20, 'H': 30, 'S': 30, 'NT': (40, 30), 'X': 2, 'XX': 4}
@@ -9,6 +14,61 @@ PENALTY_POINTS = {'NO DOUBLE/REDOUBLE': 50, 'DOUBLE': (100, 2), 'REDOUBLE': (200
 BONUS = {'SLAM': 500, 'GRAND_SLAM': 1000, 'PARTIAL-GAME': 50, 'GAME': 300, 'DOUBLE': 50, 'REDOUBLE': 100,
          'OVERTRICKS_DOUBLE': 100, 'OVERTRICKS_REDOUBLE': 200}
 
+# liczba wartości zwracanych przez solver dla jednego rozdania - 20 liczb lew (4 graczy x 5 mian) i optymalny zapis
+SOLVER_RESULT_SIZE = solver_binding.RESULT_SIZE
+# liczba wartości zwracanych dla jednego rozdania, gdy wyznaczany jest zapis optymalny dla każdego z rozdających
+SOLVER_ALL_DEALERS_RESULT_SIZE = solver_binding.PARS_RESULT_SIZE
+# liczba wartości zwracanych dla jednego rozdania, gdy wyznaczany jest zapis optymalny dla każdego z rozdających
+# i każdej strefy (tablica zapisów optymalnych, kolejność jak w solver_binding.par_index)
+SOLVER_PAR_TABLE_RESULT_SIZE = solver_binding.PAR_TABLE_RESULT_SIZE
+TRICKS_SIZE = solver_binding.TRICKS_SIZE
+
+# format pliku pamięci podręcznej wyników solvera:
+# nagłówek o stałym rozmiarze, a po nim tablica rekordów o stałym rozmiarze
+CACHE_MAGIC = b'BRDGDDS2'
+CACHE_HEADER = np.dtype([('magic', 'S8'), ('record_size', '<u4'), ('bucket_size', '<u4'), ('capacity', '<u8'),
+                         ('clock', '<u8')])
+CACHE_HEADER_SIZE = 64
+# rekord - klucz (skrót rąk), maski rąk N, E, S, W, 20 liczb lew, tablica zapisów optymalnych (dla każdego rozdającego
+# i strefy) oraz znacznik ostatniego użycia (do usuwania najdawniej używanych rekordów)
+CACHE_RECORD = np.dtype([('key', '<u8'), ('hands', '<u8', (4,)), ('tricks', 'u1', (20,)),
+                         ('par', '<i2', (solver_binding.PAR_TABLE_SIZE,)),
+                         ('stamp', '<u8')])
+CACHE_BUCKET_SIZE = 8  # liczba rekordów w jednym kubełku tablicy haszującej
+CACHE_DEFAULT_CAPACITY = 1 << 20  # domyślna maksymalna liczba rekordów
+
+_MASK_64 = (1 << 64) - 1
+
+# zmienna środowiskowa ze ścieżką do gniazda usługi solvera (SolverService) - jeśli jest ustawiona, wyniki
+# wyznaczane są przez usługę, a biblioteki solvera nie są ładowane w procesie
+SOLVER_SERVICE_VARIABLE = 'GYM_BRIDGE_SOLVER_SERVICE'
+
+_solver_service = None  # klient usługi solvera (None - solver wywoływany bezpośrednio w procesie)
+_solver_service_checked = False  # czy sprawdzono zmienną środowiskową SOLVER_SERVICE_VARIABLE
+
+
+def set_solver_service(path):
+    """Wyznaczanie wyników przez usługę solvera nasłuchującą na gnieździe Unix o podanej ścieżce
+    (None - solver wywoływany bezpośrednio w procesie)"""
+
+    global _solver_service, _solver_service_checked
+
+    if _solver_service is not None:
+        _solver_service.close()
+
+    _solver_service = None if path is None else SolverServiceClient(path)
+    _solver_service_checked = True
+
+
+def get_solver_service():
+    """Klient usługi solvera lub None, gdy usługa nie została skonfigurowana (set_solver_service lub zmienna
+    środowiskowa SOLVER_SERVICE_VARIABLE)"""
+
+    if not _solver_service_checked:
+        set_solver_service(os.environ.get(SOLVER_SERVICE_VARIABLE) or None)
+
+    return _solver_service
+
 
 def get_results_from_solver(pbn, dealer):
     """Funkcja wyznaczająca liczbę lew, jaką weźmie każdy z graczy wraz z partnerem dla danego miana 
@@ -17,13 +77,17 @@ def get_results_from_solver(pbn, dealer):
     Wykorzystano Double Dummy Solver napisany w C++.
     Wyznaczone liczby lew są w następującej kolejności:
     najpierw North i ilość lew dla poszczególnych mian kolejno: S, H, D, C, NT,
-    a następnie East, South i West z identyczną kolejnością mian."""
+    a następnie East, South i West z identyczną kolejnością mian.
+    Gdy skonfigurowano usługę solvera (set_solver_service), wyniki wyznacza usługa."""
 
     try:
-        cppyy.include("./gym_bridge_auction/envs/solver/dds_wrapper/ddswrapper.h")
-        cppyy.load_library("ddswrapper")
-        solver_result = cppyy.gbl.calcTricksAndScore(cppyy.gbl.std.string(pbn), dealer)
-        solver_result = list(solver_result)
+        service = get_solver_service()
+
+        if service is not None:
+            solver_result = service.solve([pbn])[0].tolist()
+            return solver_result[:TRICKS_SIZE], solver_result[TRICKS_SIZE + dealer]
+
+        solver_result = solver_binding.calc_tricks_and_score(pbn, dealer).tolist()
         number_of_tricks = solver_result[0:-1]
         optimum_score = solver_result[-1]
 
@@ -33,6 +97,329 @@ def get_results_from_solver(pbn, dealer):
         quit()
 
 
+def get_results_from_solver_batch(pbns, dealers):
+    """Wsadowa wersja funkcji get_results_from_solver - wyznacza wyniki dla wielu rozdań jednocześnie.
+    Rozdania są rozwiązywane przez CalcAllTablesPBN z Double Dummy Solver na wszystkich jego wątkach.
+    Parametry:
+    pbns - lista rozdań w formacie PBN
+    dealers - lista indeksów rozdających w kolejnych rozdaniach
+    Zwraca tablicę NumPy o wymiarach (liczba rozdań, 21), gdzie w każdym wierszu pierwsze 20 kolumn to liczby lew
+    (kolejność jak w get_results_from_solver), a ostatnia to zapis dla pary N-S za optymalny kontrakt."""
+
+    if len(pbns) != len(dealers):
+        raise ValueError('Number of deals and dealers must be equal')
+
+    if len(pbns) == 0:
+        return np.zeros((0, SOLVER_RESULT_SIZE), dtype=np.int32)
+
+    try:
+        service = get_solver_service()
+
+        if service is not None:
+            solver_result = service.solve(pbns)
+            optimum_scores = solver_result[np.arange(len(pbns)), TRICKS_SIZE + np.asarray(dealers)]
+            return np.concatenate([solver_result[:, :TRICKS_SIZE], optimum_scores[:, None]], axis=1)
+
+        return solver_binding.calc_tricks_and_score_batch(pbns, dealers)
+    except:
+        print('Solver error')
+        quit()
+
+
+def get_results_from_solver_all_dealers(pbn):
+    """Funkcja wyznaczająca liczbę lew tak jak get_results_from_solver, ale zwracająca wartości punktowe dla pary N-S
+    za optymalny kontrakt dla każdego z możliwych rozdających (kolejno N, E, S, W) - rozdanie jest rozwiązywane raz."""
+
+    try:
+        service = get_solver_service()
+
+        if service is not None:
+            solver_result = service.solve([pbn])[0][:SOLVER_ALL_DEALERS_RESULT_SIZE].tolist()
+        else:
+            solver_result = solver_binding.calc_tricks_and_pars(pbn).tolist()
+
+        number_of_tricks = solver_result[0:-4]
+        optimum_scores = solver_result[-4:]
+
+        return number_of_tricks, optimum_scores
+    except:
+        print('Solver error')
+        quit()
+
+
+def get_results_from_solver_all_dealers_batch(pbns):
+    """Wsadowa wersja funkcji get_results_from_solver_all_dealers.
+    Zwraca tablicę NumPy o wymiarach (liczba rozdań, 24), gdzie w każdym wierszu pierwsze 20 kolumn to liczby lew,
+    a kolejne 4 to zapisy dla pary N-S za optymalny kontrakt, gdy rozdającym jest kolejno N, E, S, W."""
+
+    if len(pbns) == 0:
+        return np.zeros((0, SOLVER_ALL_DEALERS_RESULT_SIZE), dtype=np.int32)
+
+    try:
+        service = get_solver_service()
+
+        if service is not None:
+            return service.solve(pbns)[:, :SOLVER_ALL_DEALERS_RESULT_SIZE]
+
+        return solver_binding.calc_tricks_and_pars_batch(pbns)
+    except:
+        print('Solver error')
+        quit()
+
+
+def get_results_from_solver_par_table_batch(pbns):
+    """Wersja funkcji get_results_from_solver_all_dealers_batch zwracająca zapisy optymalne dla każdego z rozdających
+    i każdej strefy - rozdanie jest rozwiązywane raz, a zmiana rozdającego lub strefy nie wymaga ponownego wywołania
+    solvera.
+    Zwraca tablicę NumPy o wymiarach (liczba rozdań, 36), gdzie w każdym wierszu pierwsze 20 kolumn to liczby lew,
+    a kolejne 16 to zapisy dla pary N-S za optymalny kontrakt w kolejności solver_binding.par_index (strefa po
+    strefie, w każdej strefie rozdający N, E, S, W - kolumny 20-23 są takie same jak w
+    get_results_from_solver_all_dealers_batch)."""
+
+    if len(pbns) == 0:
+        return np.zeros((0, SOLVER_PAR_TABLE_RESULT_SIZE), dtype=np.int32)
+
+    try:
+        service = get_solver_service()
+
+        if service is not None:
+            return service.solve(pbns)
+
+        return solver_binding.calc_tricks_and_par_table_batch(pbns)
+    except:
+        print('Solver error')
+        quit()
+
+
+def hand_mask(hand_representation):
+    """Zamiana reprezentacji ręki gracza w formie 0/1 na 52-bitową maskę (bit i odpowiada i-tej karcie)"""
+
+    bits = np.packbits(np.asarray(hand_representation, dtype=np.uint8), bitorder='little')
+
+    return int.from_bytes(bits.tobytes(), 'little')
+
+
+def deal_hash(hand_masks):
+    """64-bitowy skrót rozdania wyznaczony z masek rąk graczy N, E, S, W (mieszanie typu splitmix64).
+    Wartość 0 jest zarezerwowana dla pustego rekordu pamięci podręcznej."""
+
+    h = 0
+
+    for mask in hand_masks:
+        h = (h ^ mask) & _MASK_64
+        h = (h + 0x9E3779B97F4A7C15) & _MASK_64
+        h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _MASK_64
+        h ^= h >> 31
+
+    return h if h != 0 else 1
+
+
+class SolverCache:
+    """Trwała pamięć podręczna wyników Double Dummy Solver zapisana w pliku odwzorowanym w pamięci (mmap),
+    dzięki czemu może być współdzielona przez wiele procesów.
+
+    Plik zawiera tablicę haszującą podzieloną na kubełki po CACHE_BUCKET_SIZE rekordów o stałym rozmiarze.
+    Kluczem jest 64-bitowy skrót masek rąk graczy, a rekord przechowuje 20 liczb lew oraz zapisy optymalne dla każdego
+    z rozdających i każdej strefy. Gdy kubełek jest pełny, nadpisywany jest najdawniej używany rekord. Zapisy do pliku
+    są chronione blokadą wyłączną (flock), a odczyty blokadą współdzieloną, więc nie zwracają częściowo nadpisanych
+    rekordów. Odczyty sprawdzają też pełne maski rąk, więc kolizje skrótów nie zwracają błędnych wyników."""
+
+    def __init__(self, path, max_entries=CACHE_DEFAULT_CAPACITY):
+        """Otwarcie istniejącego pliku pamięci podręcznej lub utworzenie nowego,
+        gdzie:
+        path - ścieżka do pliku
+        max_entries - maksymalna liczba rekordów (dla istniejącego pliku obowiązuje pojemność zapisana w nagłówku)"""
+
+        self.path = path
+        self.hits = 0  # liczba trafień
+        self.misses = 0  # liczba chybień
+        self.evictions = 0  # liczba usuniętych rekordów
+        # blokada dla wątków tego samego procesu (wątki współdzielą blokadę flock na jednym deskryptorze pliku)
+        self._lock = threading.Lock()
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+        try:
+            if os.fstat(self._fd).st_size < CACHE_HEADER_SIZE:
+                # nowy plik - zapis nagłówka i wyzerowanie rekordów
+                n_buckets = max(1, -(-int(max_entries) // CACHE_BUCKET_SIZE))
+                capacity = n_buckets * CACHE_BUCKET_SIZE
+                os.ftruncate(self._fd, CACHE_HEADER_SIZE + capacity * CACHE_RECORD.itemsize)
+                header = np.zeros(1, dtype=CACHE_HEADER)
+                header['magic'] = CACHE_MAGIC
+                header['record_size'] = CACHE_RECORD.itemsize
+                header['bucket_size'] = CACHE_BUCKET_SIZE
+                header['capacity'] = capacity
+                os.pwrite(self._fd, header.tobytes(), 0)
+
+            header = np.frombuffer(os.pread(self._fd, CACHE_HEADER.itemsize, 0), dtype=CACHE_HEADER)[0]
+
+            if header['magic'] != CACHE_MAGIC or header['record_size'] != CACHE_RECORD.itemsize or \
+                    header['bucket_size'] != CACHE_BUCKET_SIZE:
+                raise ValueError('Invalid solver cache file: ' + path)
+
+            self.capacity = int(header['capacity'])
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._header = np.memmap(path, dtype=CACHE_HEADER, mode='r+', shape=(1,))
+        self._records = np.memmap(path, dtype=CACHE_RECORD, mode='r+', offset=CACHE_HEADER_SIZE,
+                                  shape=(self.capacity,))
+        self._n_buckets = self.capacity // CACHE_BUCKET_SIZE
+
+    def _bucket(self, key):
+        """Rekordy kubełka, w którym może znajdować się dany klucz"""
+
+        start = (key % self._n_buckets) * CACHE_BUCKET_SIZE
+
+        return self._records[start:start + CACHE_BUCKET_SIZE]
+
+    def _tick(self):
+        """Kolejna wartość znacznika czasu użycia rekordu"""
+
+        clock = int(self._header['clock'][0]) + 1
+        self._header['clock'] = clock
+
+        return clock
+
+    def get(self, hand_masks):
+        """Wyszukanie wyników solvera dla rozdania o podanych maskach rąk (N, E, S, W).
+        Zwraca krotkę (liczby lew, 16 zapisów optymalnych w kolejności solver_binding.par_index) lub None, gdy brak
+        rozdania."""
+
+        key = deal_hash(hand_masks)
+        bucket = self._bucket(key)
+        found = None
+
+        with self._lock:
+            # odczyt rekordu pod blokadą współdzieloną - put nie może w tym czasie nadpisać rekordu
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+
+            try:
+                for slot in np.flatnonzero(bucket['key'] == key):
+                    record = bucket[slot].copy()
+
+                    if list(record['hands']) == list(hand_masks):
+                        found = slot, record
+                        break
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+            if found is None:
+                self.misses += 1
+
+                return None
+
+            slot, record = found
+            # znacznik czasu użycia aktualizowany pod blokadą wyłączną, o ile rekord nie został w międzyczasie
+            # nadpisany innym rozdaniem
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+            try:
+                if bucket['key'][slot] == key:
+                    bucket['stamp'][slot] = self._tick()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+            self.hits += 1
+
+        return [int(t) for t in record['tricks']], [int(p) for p in record['par']]
+
+    def put(self, hand_masks, number_of_tricks, optimum_scores):
+        """Zapisanie wyników solvera dla rozdania,
+        gdzie:
+        hand_masks - maski rąk graczy N, E, S, W
+        number_of_tricks - 20 liczb lew (kolejność jak w get_results_from_solver)
+        optimum_scores - 16 zapisów dla pary N-S za optymalny kontrakt dla każdego rozdającego i strefy (kolejność jak
+        w solver_binding.par_index)"""
+
+        key = deal_hash(hand_masks)
+
+        # blokada flock chroni przed innymi procesami, a blokada wątku przed innymi wątkami tego procesu
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+            try:
+                bucket = self._bucket(key)
+                keys = bucket['key']
+                same = np.flatnonzero(keys == key)
+                empty = np.flatnonzero(keys == 0)
+
+                if len(same) > 0:
+                    slot = same[0]
+                elif len(empty) > 0:
+                    slot = empty[0]
+                else:
+                    # pełny kubełek - usunięcie najdawniej używanego rekordu
+                    slot = int(np.argmin(bucket['stamp']))
+                    self.evictions += 1
+
+                # klucz zapisywany jest na końcu, więc niekompletny rekord nie zostanie odczytany jako poprawny
+                bucket['key'][slot] = 0
+                bucket['hands'][slot] = hand_masks
+                bucket['tricks'][slot] = number_of_tricks
+                bucket['par'][slot] = optimum_scores
+                bucket['stamp'][slot] = self._tick()
+                bucket['key'][slot] = key
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def stats(self):
+        """Liczniki trafień, chybień i usuniętych rekordów oraz liczba zajętych rekordów"""
+
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': int(np.count_nonzero(self._records['key'])), 'capacity': self.capacity}
+
+    def flush(self):
+        """Zapisanie zmian z pamięci na dysk"""
+
+        self._records.flush()
+        self._header.flush()
+
+    def close(self):
+        """Zamknięcie pliku pamięci podręcznej"""
+
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+
+_solver_caches = {}  # otwarte pliki pamięci podręcznej (jedno odwzorowanie pliku na proces)
+
+
+def get_solver_cache(path, max_entries=CACHE_DEFAULT_CAPACITY):
+    """Zwraca obiekt SolverCache dla danej ścieżki, współdzielony przez wszystkie środowiska w procesie"""
+
+    path = os.path.abspath(path)
+
+    if path not in _solver_caches:
+        _solver_caches[path] = SolverCache(path, max_entries)
+
+    return _solver_caches[path]
+
+
+def get_results_from_cache_or_solver(pbn, dealer, hand_masks, cache):
+    """Wyniki jak z get_results_from_solver, ale w pierwszej kolejności szukane w pamięci podręcznej cache.
+    W przypadku trafienia solver nie jest w ogóle wywoływany, a przy chybieniu wyniki dla wszystkich rozdających
+    i stref są zapisywane w pamięci podręcznej,
+    gdzie:
+    hand_masks - maski rąk graczy N, E, S, W (klucz pamięci podręcznej)"""
+
+    cached = cache.get(hand_masks)
+
+    if cached is None:
+        solver_result = get_results_from_solver_par_table_batch([pbn])[0].tolist()
+        cached = solver_result[:TRICKS_SIZE], solver_result[TRICKS_SIZE:]
+        cache.put(hand_masks, cached[0], cached[1])
+
+    number_of_tricks, optimum_scores = cached
+
+    return number_of_tricks, optimum_scores[dealer]
+
+
 def get_solver_result_for_player(player_index, solver_result):
     """Ilość lew dla danego miana z solvera, jaką weźmie ustalony gracz"""
 
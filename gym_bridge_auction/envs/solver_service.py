@@ -0,0 +1,410 @@
+import argparse
+import collections
+import os
+import queue
+import socket
+import stat
+import struct
+import threading
+import time
+import traceback
+import numpy as np
+from gym_bridge_auction.envs import solver_binding
+from gym_bridge_auction.envs.game import NAMES, PBN_RANKS
+
+# Usługa Double Dummy Solver dla wielu procesów na jednej maszynie - osobny proces z jedną pulą wątków solvera
+# przyjmuje przez gniazdo Unix zapytania od środowisk (klientów), łączy je w paczki rozwiązywane jednym wywołaniem
+# CalcAllTablesPBN i przechowuje wyniki we wspólnej pamięci podręcznej. Procesy klientów nie ładują bibliotek solvera.
+#
+# Protokół (liczby w kolejności little-endian):
+# zapytanie - nagłówek (liczba rozdań, długość danych w bajtach), a po nim rozdania PBN rozdzielone znakiem '\n'
+# odpowiedź - nagłówek (liczba rozdań), a po nim dla każdego rozdania 36 liczb int32 jak w calc_tricks_and_par_table
+# (20 liczb lew i zapisy optymalne dla każdego rozdającego i strefy); w przypadku błędu nagłówek zawiera ujemną długość
+# komunikatu błędu, który następuje po nim
+
+REQUEST_HEADER = struct.Struct('<II')
+RESPONSE_HEADER = struct.Struct('<i')
+RESULT_SIZE = solver_binding.PAR_TABLE_RESULT_SIZE
+
+SERVICE_BATCH_SIZE = 40  # liczba rozdań rozwiązywanych jednym wywołaniem CalcAllTablesPBN (MAXNOOFTABLES z dll.h)
+SERVICE_MAX_WAIT = 0.002  # maksymalny czas oczekiwania na kolejne zapytania do paczki (w sekundach)
+SERVICE_CACHE_SIZE = 1 << 18  # liczba rozdań w pamięci podręcznej usługi
+
+
+def _receive(connection, size):
+    """Odczytanie dokładnie size bajtów z gniazda - None, gdy połączenie zostało zamknięte przed pierwszym bajtem"""
+
+    data = bytearray()
+
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+
+        if not chunk:
+            if len(data) == 0:
+                return None
+
+            raise ConnectionError('Solver service connection closed')
+
+        data += chunk
+
+    return bytes(data)
+
+
+def _is_valid_pbn(pbn):
+    """Sprawdzenie poprawności rozdania PBN przed przekazaniem do solvera (niepoprawne rozdanie przerywa proces
+    solvera) - 4 ręce po 13 różnych kart, razem cała talia"""
+
+    hands = pbn[2:].split(' ')
+
+    if pbn[:1] not in NAMES or pbn[1:2] != ':' or len(hands) != 4:
+        return False
+
+    cards = set()
+
+    for hand in hands:
+        suits = hand.split('.')
+
+        if len(suits) != 4 or sum(len(ranks) for ranks in suits) != 13:
+            return False
+
+        cards.update((suit, rank) for suit, ranks in enumerate(suits) for rank in ranks if rank in PBN_RANKS)
+
+    return len(cards) == 52
+
+
+class _Request:
+    """Zapytanie jednego klienta oczekujące na rozwiązanie w paczce"""
+
+    __slots__ = ('pbns', 'result', 'error', 'done')
+
+    def __init__(self, pbns):
+        self.pbns = pbns
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class SolverService:
+    """Serwer usługi solvera - nasłuchuje na gnieździe Unix, obsługuje każde połączenie w osobnym wątku, a jeden wątek
+    solvera łączy oczekujące zapytania w paczki (do batch_size rozdań, czekając na kolejne zapytania najwyżej
+    max_wait sekund). Rozdania obecne w pamięci podręcznej oraz powtórzone w paczce nie są ponownie rozwiązywane."""
+
+    def __init__(self, path, batch_size=SERVICE_BATCH_SIZE, max_wait=SERVICE_MAX_WAIT, cache_size=SERVICE_CACHE_SIZE):
+        """Utworzenie gniazda nasłuchującego,
+        gdzie:
+        path - ścieżka do gniazda Unix
+        batch_size - docelowa liczba rozdań w jednej paczce
+        max_wait - maksymalny czas zbierania zapytań do paczki (w sekundach)
+        cache_size - maksymalna liczba rozdań w pamięci podręcznej (0 - bez pamięci podręcznej)"""
+
+        self.path = path
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+
+        self._cache = collections.OrderedDict()  # rozdanie PBN -> wyniki, kolejność od najdawniej używanego
+        self._requests = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+        self._counters = {'requests': 0, 'deals': 0, 'batches': 0, 'solved': 0, 'hits': 0}
+
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                raise ValueError('Not a socket: ' + path)
+
+            # gniazdo pozostawione przez zakończony proces usługi jest usuwane
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+            try:
+                probe.connect(path)
+                raise RuntimeError('Solver service already running: ' + path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(path)
+            finally:
+                probe.close()
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(path)
+        self._socket.listen(128)
+        self._socket.settimeout(0.1)  # okresowe sprawdzanie, czy usługa nie została zatrzymana
+
+    def start(self):
+        """Uruchomienie wątków usługi w tle - zwraca obiekt usługi"""
+
+        for target in (self._accept_loop, self._solve_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        return self
+
+    def serve_forever(self):
+        """Uruchomienie usługi i oczekiwanie na jej zakończenie (close() lub przerwanie przez użytkownika)"""
+
+        self.start()
+
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """Zatrzymanie usługi i usunięcie gniazda"""
+
+        if self._stop.is_set():
+            return
+
+        self._stop.set()
+
+        for thread in self._threads:
+            thread.join()
+
+        self._socket.close()
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def stats(self):
+        """Liczniki usługi - zapytania, rozdania, paczki, rozdania rozwiązane przez solver, trafienia pamięci
+        podręcznej oraz liczba rozdań w pamięci podręcznej"""
+
+        return dict(self._counters, entries=len(self._cache))
+
+    def _accept_loop(self):
+        """Pętla przyjmowania połączeń - każdy klient obsługiwany jest w osobnym wątku"""
+
+        while not self._stop.is_set():
+            try:
+                connection, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                # gniazdo zostało zamknięte
+                break
+
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection):
+        """Obsługa połączenia jednego klienta - kolejne zapytania są przekazywane do wątku solvera"""
+
+        try:
+            while not self._stop.is_set():
+                header = _receive(connection, REQUEST_HEADER.size)
+
+                if header is None:
+                    break
+
+                count, size = REQUEST_HEADER.unpack(header)
+                pbns = _receive(connection, size).decode().split('\n') if count > 0 else []
+
+                if len(pbns) != count:
+                    raise ValueError('Invalid solver service request')
+
+                invalid = [pbn for pbn in pbns if not _is_valid_pbn(pbn)]
+
+                if invalid:
+                    message = ('Invalid PBN deal: ' + invalid[0]).encode()
+                    connection.sendall(RESPONSE_HEADER.pack(-len(message)) + message)
+                    continue
+
+                request = _Request(pbns)
+                self._requests.put(request)
+                request.done.wait()
+
+                if request.error is not None:
+                    message = request.error.encode()
+                    connection.sendall(RESPONSE_HEADER.pack(-len(message)) + message)
+
+                else:
+                    connection.sendall(RESPONSE_HEADER.pack(count) + request.result.astype('<i4').tobytes())
+
+        except (ConnectionError, ValueError, OSError):
+            pass
+
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        """Zapytania oczekujące w kolejce połączone w jedną paczkę - pusta lista, gdy usługa jest zatrzymywana"""
+
+        try:
+            batch = [self._requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deals = len(batch[0].pbns)
+        deadline = time.monotonic() + self.max_wait
+
+        while deals < self.batch_size:
+            timeout = deadline - time.monotonic()
+
+            try:
+                request = self._requests.get(timeout=timeout) if timeout > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+
+            batch.append(request)
+            deals += len(request.pbns)
+
+        return batch
+
+    def _solve_loop(self):
+        """Pętla wątku solvera - rozwiązanie paczki rozdań nieobecnych w pamięci podręcznej i odpowiedź dla każdego
+        zapytania"""
+
+        while not self._stop.is_set():
+            batch = self._next_batch()
+
+            if not batch:
+                continue
+
+            try:
+                results = {}
+                missing = []
+
+                for request in batch:
+                    for pbn in request.pbns:
+                        if pbn in results:
+                            continue
+
+                        cached = self._cache.get(pbn)
+
+                        if cached is None:
+                            results[pbn] = None
+                            missing.append(pbn)
+
+                        else:
+                            self._cache.move_to_end(pbn)
+                            results[pbn] = cached
+                            self._counters['hits'] += 1
+
+                if missing:
+                    # błąd solvera (RuntimeError z kodem błędu Double Dummy Solver) przerywa paczkę przed zapisaniem
+                    # jakiegokolwiek wyniku w pamięci podręcznej - zapytania z paczki otrzymują opis błędu
+                    for pbn, solver_result in zip(missing, solver_binding.calc_tricks_and_par_table_batch(missing)):
+                        results[pbn] = solver_result
+                        self._store(pbn, solver_result)
+
+                for request in batch:
+                    request.result = np.array([results[pbn] for pbn in request.pbns], dtype=np.int32).reshape(
+                        len(request.pbns), RESULT_SIZE)
+
+                self._counters['requests'] += len(batch)
+                self._counters['deals'] += sum(len(request.pbns) for request in batch)
+                self._counters['batches'] += 1
+                self._counters['solved'] += len(missing)
+
+            except Exception:
+                for request in batch:
+                    request.error = traceback.format_exc()
+
+            for request in batch:
+                request.done.set()
+
+    def _store(self, pbn, solver_result):
+        """Zapisanie wyników w pamięci podręcznej (usunięcie najdawniej używanego rozdania, gdy jest pełna)"""
+
+        if self.cache_size <= 0:
+            return
+
+        self._cache[pbn] = solver_result
+
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+class SolverServiceClient:
+    """Klient usługi solvera - połączenie z gniazdem Unix tworzone przy pierwszym zapytaniu (oraz ponownie w procesie
+    potomnym po fork). Zapytania z wielu wątków procesu są szeregowane."""
+
+    def __init__(self, path, timeout=None):
+        """Parametry:
+            path - ścieżka do gniazda usługi
+            timeout - maksymalny czas oczekiwania na odpowiedź w sekundach (None - bez limitu)"""
+
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        """Połączenie z usługą (osobne dla każdego procesu)"""
+
+        if self._connection is None or self._pid != os.getpid():
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            connection.connect(self.path)
+            self._connection = connection
+            self._pid = os.getpid()
+
+        return self._connection
+
+    def solve(self, pbns):
+        """Liczby lew i zapisy optymalne dla każdego rozdającego i strefy dla listy rozdań PBN - tablica o wymiarach
+        (liczba rozdań, 36) (jak calc_tricks_and_par_table_batch)"""
+
+        payload = '\n'.join(pbns).encode()
+
+        with self._lock:
+            connection = self._connect()
+
+            try:
+                connection.sendall(REQUEST_HEADER.pack(len(pbns), len(payload)) + payload)
+                header = _receive(connection, RESPONSE_HEADER.size)
+
+                if header is None:
+                    raise ConnectionError('Solver service connection closed')
+
+                count, = RESPONSE_HEADER.unpack(header)
+
+                if count < 0:
+                    raise RuntimeError('Solver service error:\n' + _receive(connection, -count).decode())
+
+                data = _receive(connection, count * RESULT_SIZE * 4) if count > 0 else b''
+
+            except (ConnectionError, OSError):
+                # połączenie w nieznanym stanie - kolejne zapytanie utworzy nowe
+                self.close()
+                raise
+
+        return np.frombuffer(data, dtype='<i4').astype(np.int32).reshape(count, RESULT_SIZE)
+
+    def close(self):
+        """Zamknięcie połączenia z usługą"""
+
+        if self._connection is not None:
+            if self._pid == os.getpid():
+                self._connection.close()
+
+            self._connection = None
+
+
+def main():
+    """Uruchomienie usługi solvera z wiersza poleceń:
+    python -m gym_bridge_auction.envs.solver_service /tmp/bridge-solver.sock"""
+
+    parser = argparse.ArgumentParser(description='Double Dummy Solver service for gym-bridge-auction environments')
+    parser.add_argument('path', help='Unix socket path')
+    parser.add_argument('--threads', type=int, default=0, help='solver threads (0 - all cores)')
+    parser.add_argument('--memory-mb', type=int, default=0, help='transposition table memory limit (0 - no limit)')
+    parser.add_argument('--threading', choices=solver_binding.THREADING_BACKENDS, default=None,
+                        help='solver threading backend')
+    parser.add_argument('--batch-size', type=int, default=SERVICE_BATCH_SIZE, help='deals per solver call')
+    parser.add_argument('--max-wait', type=float, default=SERVICE_MAX_WAIT,
+                        help='maximum time to collect requests into a batch (seconds)')
+    parser.add_argument('--cache-size', type=int, default=SERVICE_CACHE_SIZE, help='number of cached deals')
+    arguments = parser.parse_args()
+
+    print(solver_binding.configure(arguments.threads, arguments.memory_mb, arguments.threading))
+    service = SolverService(arguments.path, arguments.batch_size, arguments.max_wait, arguments.cache_size)
+    print('Solver service listening on ' + arguments.path)
+    service.serve_forever()
+    print(service.stats())
+
+
+if __name__ == '__main__':
+    main()
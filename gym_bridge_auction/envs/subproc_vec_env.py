@@ -0,0 +1,315 @@
+import multiprocessing
+import os
+import pickle
+import traceback
+import numpy as np
+from multiprocessing import shared_memory
+from gym_bridge_auction.envs import solver_binding
+from gym_bridge_auction.envs.bridge_auction_env import AuctionEnv, OBSERVATION_SIZE, OBSERVATION_SIZE_WITH_FEATURES
+from gym_bridge_auction.envs.deal_pool import get_deal_pool
+from gym_bridge_auction.envs.solver_results import get_solver_service, set_solver_service
+
+# Komunikaty między procesem głównym a procesami roboczymi (jeden bajt - "dzwonek")
+STEP = b's'
+RESET = b'r'
+CLOSE = b'c'
+STATS = b't'
+RESET_STATS = b'z'
+DONE = b'k'
+ERROR = b'e'
+
+# Tablice we wspólnej pamięci - nazwa, liczba elementów na środowisko, typ (z cechami rąk obserwacje mają długość
+# OBSERVATION_SIZE_WITH_FEATURES)
+SHARED_ARRAYS = [('observations', (OBSERVATION_SIZE,), np.int16),
+                 ('rewards', (2,), np.int32),
+                 ('dones', (), np.bool_),
+                 ('action_masks', (38,), np.bool_),
+                 ('pair_scores', (2,), np.int32),
+                 ('optimum_scores', (2,), np.int32),
+                 ('actions', (), np.int32)]
+
+
+def _create_shared_arrays(num_envs, observation_size=OBSERVATION_SIZE):
+    """Utworzenie jednego bloku wspólnej pamięci (multiprocessing.shared_memory) i widoków tablic NumPy na jego
+    fragmenty - zwraca blok pamięci i słownik tablic"""
+
+    shared_arrays = [(name, (observation_size,) if name == 'observations' else shape, dtype)
+                     for name, shape, dtype in SHARED_ARRAYS]
+    sizes = [num_envs * int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in shared_arrays]
+    # każda tablica zaczyna się od adresu wyrównanego do 64 bajtów
+    offsets = np.cumsum([0] + [(size + 63) // 64 * 64 for size in sizes])
+    memory = shared_memory.SharedMemory(create=True, size=int(offsets[-1]))
+    arrays = {}
+
+    for (name, shape, dtype), offset in zip(shared_arrays, offsets):
+        arrays[name] = np.ndarray((num_envs,) + shape, dtype=dtype, buffer=memory.buf, offset=int(offset))
+        arrays[name].fill(0)
+
+    return memory, arrays
+
+
+def _worker(connection, start, count, env_kwargs, arrays, seeds, solver_preset):
+    """Pętla procesu roboczego - obsługa środowisk o indeksach od start do start + count - 1.
+    Działania odczytywane są z tablicy 'actions', a wyniki zapisywane do pozostałych tablic we wspólnej pamięci.
+    Przez potok przesyłany jest tylko jednobajtowy komunikat w każdą stronę."""
+
+    envs = []
+
+    try:
+        if solver_preset is not None and env_kwargs.get('deal_pool') is None and get_solver_service() is None:
+            # konfiguracja wątków i pamięci solvera w procesie roboczym (raz, przed pierwszym rozdaniem)
+            solver_binding.configure_preset(solver_preset)
+
+        rows = range(start, start + count)
+
+        for row, seed in zip(rows, seeds):
+            if env_kwargs.get('deal_seed') is None:
+                envs.append(AuctionEnv(**env_kwargs))
+
+            else:
+                # środowisko row rozgrywa co num_envs-te rozdanie strumienia (rozłączne ciągi rozdań)
+                step = env_kwargs.get('deal_step', 1)
+                envs.append(AuctionEnv(**dict(env_kwargs, deal_start=env_kwargs.get('deal_start', 0) + row * step,
+                                              deal_step=step * len(arrays['dones']))))
+
+            envs[-1].seed(seed)
+
+        while True:
+            command = connection.recv_bytes()
+
+            if command == CLOSE:
+                break
+
+            if command in (STATS, RESET_STATS):
+                # liczniki czasu etapów działania środowisk (AuctionEnv.stats) przesyłane przez potok
+                message = DONE + pickle.dumps([env.stats() for env in envs])
+
+                if command == RESET_STATS:
+                    for env in envs:
+                        env.reset_stats()
+
+                connection.send_bytes(message)
+                continue
+
+            for row, env in zip(rows, envs):
+                if command == RESET:
+                    observation = env.reset()
+                    arrays['rewards'][row] = 0
+                    arrays['dones'][row] = False
+                    arrays['pair_scores'][row] = 0
+                    arrays['optimum_scores'][row] = 0
+
+                else:
+                    observation, reward, done, info = env.step(int(arrays['actions'][row]))
+                    arrays['rewards'][row] = reward
+                    arrays['dones'][row] = done
+                    arrays['pair_scores'][row] = info['pair score']
+                    arrays['optimum_scores'][row] = info['optimum score']
+
+                    if done:
+                        # automatyczny reset zakończonej licytacji
+                        observation = env.reset()
+
+                arrays['observations'][row] = observation
+                arrays['action_masks'][row] = env.action_space.action_mask
+
+            connection.send_bytes(DONE)
+
+    except EOFError:
+        # proces główny zakończył działanie
+        pass
+
+    # także SystemExit z obsługi błędów solvera (quit()) - proces główny otrzymuje opis błędu zamiast zamkniętego potoku
+    except BaseException:
+        try:
+            connection.send_bytes(ERROR + traceback.format_exc().encode())
+        except OSError:
+            pass
+
+    finally:
+        for env in envs:
+            try:
+                env.close()
+            except SystemExit:
+                # AuctionEnv.close() bez renderowania kończy program
+                pass
+
+        connection.close()
+
+
+class SubprocAuctionVecEnv:
+    """Wiele środowisk AuctionEnv uruchomionych w osobnych procesach (po kilka środowisk w każdym procesie).
+    Obserwacje (tryb 'array' - wektory int16 o długości OBSERVATION_SIZE lub OBSERVATION_SIZE_WITH_FEATURES
+    z hand_features w env_kwargs), nagrody, informacje o końcu licytacji,
+    maski dostępnych działań oraz działania przechowywane są w tablicach NumPy we wspólnej pamięci. W każdym kroku
+    proces główny wysyła do procesów roboczych tylko jednobajtowy komunikat, a obserwacje nie są serializowane.
+
+    Procesy robocze tworzone są przez fork po załadowaniu bibliotek solvera i otwarciu puli rozdań, dzięki czemu
+    współdzielą ich strony pamięci. Zakończone licytacje są automatycznie rozpoczynane od nowa - dla nich zwracana
+    jest obserwacja nowego rozdania, a nagroda i informacje w info dotyczą ostatniego kroku zakończonej licytacji
+    (jak w BridgeAuctionVecEnv).
+
+    Zwracane tablice są widokami na wspólną pamięć i zmieniają się w kolejnych krokach."""
+
+    def __init__(self, num_envs, env_kwargs=None, num_workers=None, seed=None, solver_preset='worker'):
+        """Parametry:
+            num_envs (int) - liczba środowisk
+            env_kwargs (dict) - parametry środowisk AuctionEnv (np. deal_pool, solver_cache, prefetch_depth);
+            z deal_seed środowisko i rozgrywa rozdania strumienia o numerach deal_start + (i + k * num_envs) * deal_step
+            num_workers (int) - liczba procesów roboczych (domyślnie liczba rdzeni procesora)
+            seed (int) - ziarno generatorów liczb losowych środowisk (domyślnie losowe) - każde środowisko otrzymuje
+            własne ziarno wyznaczone z seed i indeksu środowiska, niezależnie od liczby procesów roboczych
+            solver_preset (str) - ustawienia solvera w procesach roboczych (SOLVER_PRESETS, domyślnie 'worker' -
+            jeden wątek solvera na proces; None - domyślna konfiguracja solvera)"""
+
+        env_kwargs = dict(env_kwargs or {})
+        env_kwargs['observation_mode'] = 'array'
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+
+        # biblioteki solvera i pula rozdań ładowane przed utworzeniem procesów (współdzielone strony pamięci);
+        # z usługą solvera procesy robocze nie ładują bibliotek solvera
+        if env_kwargs.get('deal_pool') is None:
+            if env_kwargs.get('solver_service') is not None:
+                set_solver_service(env_kwargs['solver_service'])
+
+            if get_solver_service() is None:
+                solver_binding.load_library()
+
+        else:
+            get_deal_pool(env_kwargs['deal_pool'])
+
+        self.num_envs = num_envs
+        observation_size = OBSERVATION_SIZE_WITH_FEATURES if env_kwargs.get('hand_features') else OBSERVATION_SIZE
+        self._memory, self._arrays = _create_shared_arrays(num_envs, observation_size)
+        self._info = {'pair score': self._arrays['pair_scores'], 'optimum score': self._arrays['optimum_scores'],
+                      'action mask': self._arrays['action_masks']}
+        self.action_masks = self._arrays['action_masks']
+        self._connections = []
+        self._workers = []
+        self._closed = False
+        self._error = None  # opis błędu procesu roboczego - po błędzie środowisko nie może być dalej używane
+
+        context = multiprocessing.get_context('fork')
+        seeds = np.random.SeedSequence(seed).spawn(num_envs)
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+
+        for i in range(0, num_workers):
+            parent_connection, child_connection = context.Pipe()
+            worker = context.Process(target=_worker, args=(child_connection, bounds[i], bounds[i + 1] - bounds[i],
+                                                           env_kwargs, self._arrays, seeds[bounds[i]:bounds[i + 1]],
+                                                           solver_preset),
+                                     daemon=True)
+            worker.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._workers.append(worker)
+
+    def _call(self, command):
+        """Wysłanie komunikatu do wszystkich procesów roboczych i oczekiwanie na zakończenie ich pracy - zwraca
+        odpowiedzi procesów (bez bajtu komunikatu). Błąd procesu roboczego lub jego zakończenie powoduje RuntimeError,
+        zgłaszany też przy każdym kolejnym wywołaniu."""
+
+        if self._error is not None:
+            raise RuntimeError(self._error)
+
+        if self._closed:
+            raise RuntimeError('SubprocAuctionVecEnv is closed')
+
+        errors = []
+        replies = []
+
+        for connection in self._connections:
+            try:
+                connection.send_bytes(command)
+            except OSError:
+                errors.append('worker process is not running')
+
+        if not errors:
+            for connection in self._connections:
+                try:
+                    message = connection.recv_bytes()
+                except (EOFError, OSError):
+                    errors.append('worker process exited unexpectedly')
+                    continue
+
+                if message[:1] == ERROR:
+                    errors.append(message[1:].decode())
+                else:
+                    replies.append(message[1:])
+
+        if errors:
+            self._error = 'AuctionEnv worker error:\n' + errors[0]
+            raise RuntimeError(self._error)
+
+        return replies
+
+    def stats(self, reset=False):
+        """Liczniki czasu i liczby wywołań etapów działania środowisk (AuctionEnv.stats) - lista num_envs słowników
+        (None dla środowisk bez pomiaru, który włącza parametr profile w env_kwargs). Gdy reset jest True, liczniki
+        są zerowane po odczycie."""
+
+        stats = []
+
+        for reply in self._call(RESET_STATS if reset else STATS):
+            stats += pickle.loads(reply)
+
+        return stats
+
+    def reset(self):
+        """Nowe rozdania i początkowy stan wszystkich licytacji - zwraca tablicę obserwacji (num_envs, 214),
+        z cechami rąk (num_envs, 246)"""
+
+        self._call(RESET)
+
+        return self._arrays['observations']
+
+    def step(self, actions):
+        """Wykonanie po jednym działaniu w każdym ze środowisk.
+
+        Parametr:
+            actions - tablica num_envs działań
+
+        Zwraca:
+            observation, reward, done, info : tuple
+                observation (np.ndarray) - obserwacje, wymiary (num_envs, 214), z cechami rąk (num_envs, 246)
+                reward (np.ndarray) - nagrody dla par N-S i E-W, wymiary (num_envs, 2)
+                done (np.ndarray) - informacja o końcu licytacji dla każdego środowiska
+                info (dict) - 'pair score' i 'optimum score' (wymiary (num_envs, 2)) oraz 'action mask' - dostępne
+                działania, wymiary (num_envs, 38)"""
+
+        self._arrays['actions'][:] = actions
+        self._call(STEP)
+
+        return self._arrays['observations'], self._arrays['rewards'], self._arrays['dones'], self._info
+
+    def close(self):
+        """Zakończenie procesów roboczych i zwolnienie wspólnej pamięci"""
+
+        if self._closed:
+            return
+
+        self._closed = True
+
+        for connection in self._connections:
+            try:
+                connection.send_bytes(CLOSE)
+            except OSError:
+                pass
+
+        for worker in self._workers:
+            worker.join()
+
+        for connection in self._connections:
+            connection.close()
+
+        self._arrays = None
+        self._info = None
+        self.action_masks = None
+
+        try:
+            self._memory.close()
+        except BufferError:
+            # zwrócone wcześniej tablice są nadal używane - pamięć zostanie zwolniona razem z nimi
+            pass
+
+        self._memory.unlink()
@@ -5,8 +5,10 @@ import gym
 
 PLAYERS_NAMES = ['N', 'E', 'S', 'W']
 
+# każde wywołanie reset() rozpoczyna licytację dla nowego rozdania
+env = gym.make('BridgeAuction-v0')
+
 for i_episode in range(5):
-    env = gym.make('BridgeAuction-v0')
     observation = env.reset()
     hands = {}
     for number, player in enumerate(PLAYERS_NAMES):
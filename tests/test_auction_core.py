@@ -0,0 +1,285 @@
+import os
+import numpy as np
+from gym_bridge_auction.envs import auction_core
+from gym_bridge_auction.envs.game import WIN_PAIR, random_deals
+from gym_bridge_auction.envs.deal_pool import write_deal_pool, pack_hands
+from gym_bridge_auction.envs.scoring import deal_score_table
+from gym_bridge_auction.envs.bridge_auction_env import AuctionEnv
+from gym_bridge_auction.envs.bridge_auction_vec_env import BridgeAuctionVecEnv
+
+# Test różnicowy rdzenia licytacji - losowe licytacje prowadzone jednocześnie przez auction_core (oraz AuctionEnv
+# i BridgeAuctionVecEnv) i przez kopię wzorcową zasad licytacji sprzed auction_core (_LegacyAuction). Liczbę licytacji
+# ustawia zmienna środowiskowa AUCTION_CORE_TEST_AUCTIONS (np. 1000000 dla pełnego sprawdzenia).
+N_AUCTIONS = int(os.environ.get('AUCTION_CORE_TEST_AUCTIONS', 2000))
+
+
+class _LegacyAuction:
+    """Kopia wzorcowa dawnych zasad licytacji AuctionEnv - _get_game_state, _is_over, Dynamic.set_available_actions
+    i wybór rozgrywającego z _get_reward, z listą graczy w kolejności licytacji i flagami stanu, bez gym i obiektów
+    Player"""
+
+    def __init__(self, dealer):
+        """Stan początkowy licytacji rozpoczynanej przez gracza o indeksie dealer"""
+
+        self._players_order = [(dealer + i) % 4 for i in range(0, 4)]
+        self._index_order = 0
+        self._last_contract = None
+        self._first_bind_pass = False
+        self._double = False
+        self._redouble = False
+        self._pass_number = 0
+        self.declarer = None
+        self.win_auction = [False for _ in range(0, 4)]
+        self.player_contracts = [None for _ in range(0, 4)]
+
+        # przestrzeń akcji (Dynamic)
+        self.new_n = 36
+        self.action_mask = np.zeros(38, dtype=bool)
+        self.action_mask[0:self.new_n] = True
+        self._extra_action = None
+
+    def step(self, action):
+        """Stan licytacji po działaniu action (słownik jak obserwacja AuctionEnv, bez rąk graczy) i koniec
+        licytacji"""
+
+        state = {}
+        player_index = self._players_order[self._index_order]
+        state['whose turn'] = player_index
+        state['whose next turn'] = 0 if player_index == 3 else player_index + 1
+
+        if self._last_contract is None:
+            # początek licytacji
+            state['LAST_contract'] = action
+            self._last_contract = action
+            state['double/redouble'] = 0
+
+            if action == 0:
+                self._first_bind_pass = True
+                self.win_auction[player_index] = False
+
+            else:
+                self.win_auction[player_index] = True
+
+        elif (action < self._last_contract or self._last_contract == 0) and action != 0:
+            # odzywka - nowa odzywka kasuje zgłoszoną kontrę lub rekontrę
+            state['LAST_contract'] = action
+            self._last_contract = action
+            self._first_bind_pass = False
+            self.win_auction = [False for _ in range(0, 4)]
+            self.win_auction[player_index] = True
+            state['double/redouble'] = 0
+            self._redouble = False
+            self._double = False
+
+        else:
+            # kontra/rekontra/pas
+            state['LAST_contract'] = self._last_contract
+
+            if action == 36:
+                state['double/redouble'] = 1
+                self._double = True
+                self._first_bind_pass = False
+
+            elif action == 37:
+                state['double/redouble'] = 2
+                self._redouble = True
+                self._double = False
+                self._first_bind_pass = False
+
+            elif self._double:
+                state['double/redouble'] = 1
+
+            elif self._redouble:
+                state['double/redouble'] = 2
+
+            else:
+                state['double/redouble'] = 0
+
+        self.player_contracts[player_index] = action
+        state['Player_contract'] = action
+        state['winning_pair'] = None
+
+        for player in range(0, 4):
+            if self.win_auction[player]:
+                state['winning_pair'] = 0 if player in WIN_PAIR[0] else 1
+
+        if state['LAST_contract'] == 0:
+            state['winning_pair'] = None
+
+        # rozgrywający (_get_reward) - gracz, który zgłosił najwyższą odzywkę
+        if self._last_contract != 0 and action not in (0, 36, 37):
+            self.declarer = player_index
+
+        self._index_order = (self._index_order + 1) % 4
+
+        return state, self._is_over(action, state)
+
+    def _is_over(self, action, state):
+        """Koniec licytacji (_is_over) i dostępne działania dla następnego gracza (Dynamic.set_available_actions)"""
+
+        self._pass_number = self._pass_number + 1 if action == 0 else 0
+
+        if action not in (0, 36, 37):
+            self.action_mask[action:self.new_n] = False
+            self.new_n = action
+
+        self._extra_action = None
+
+        if state['winning_pair'] is not None and state['double/redouble'] == 0 and \
+                state['whose next turn'] not in WIN_PAIR[state['winning_pair']]:
+            self._extra_action = 36
+
+        elif state['double/redouble'] == 1 and state['whose next turn'] in WIN_PAIR[state['winning_pair']]:
+            self._extra_action = 37
+
+        self.action_mask[36] = self._extra_action == 36
+        self.action_mask[37] = self._extra_action == 37
+
+        return (self._pass_number == 3 and not self._first_bind_pass) or \
+            (self._first_bind_pass and self._pass_number == 4) or (self._last_contract == 1 and self._redouble)
+
+    def reward(self, action, previous_reward, score_table, par):
+        """Nagroda dla pary N-S po działaniu action (_get_reward) - pas po ustalonym kontrakcie nie zmienia nagrody"""
+
+        if self._last_contract == 0:
+            return 0 - par
+
+        if action == 0:
+            return previous_reward
+
+        double = 1 if self._double else 2 if self._redouble else 0
+
+        return int(score_table[self._last_contract, self.declarer, double]) - par
+
+
+def _random_action(rng, mask, p_pass):
+    """Losowe dostępne działanie - pas z prawdopodobieństwem p_pass"""
+
+    return 0 if rng.random() < p_pass else int(rng.choice(np.flatnonzero(mask)))
+
+
+def _write_pool(path, n_deals, rng):
+    """Pula losowych rozdań z losowymi liczbami lew i zapisami optymalnymi (bez solvera) - zwraca słownik:
+    spakowane ręce -> (liczby lew, zapisy optymalne)"""
+
+    hands = random_deals(n_deals, rng)
+    tricks = rng.integers(0, 14, size=(n_deals, 20), dtype=np.uint8)
+    pars = rng.integers(-2000, 2000, size=(n_deals, 16), dtype=np.int16)
+    write_deal_pool(path, hands, tricks, pars)
+
+    return {packed.tobytes(): (tricks[i], pars[i]) for i, packed in enumerate(pack_hands(hands))}
+
+
+def test_auction_core_matches_legacy_rules():
+    """Stany, dostępne działania, koniec licytacji i rozgrywający w auction_core"""
+
+    rng = np.random.default_rng(0)
+
+    for _ in range(0, N_AUCTIONS):
+        dealer = int(rng.integers(4))
+        legacy = _LegacyAuction(dealer)
+        state = auction_core.initial_state(dealer)
+        p_pass = rng.choice([0.2, 0.5, 0.8])
+        done = False
+
+        assert np.array_equal(auction_core.action_mask(state), legacy.action_mask)
+
+        while not done:
+            action = _random_action(rng, legacy.action_mask, p_pass)
+            observation, done = legacy.step(action)
+            state = auction_core.next_state(state, action)
+
+            assert auction_core.last_player(state) == observation['whose turn']
+            assert auction_core.next_player(state) == observation['whose next turn']
+            assert auction_core.contract(state) == observation['LAST_contract']
+            assert auction_core.winning_pair(state) == observation['winning_pair']
+            assert auction_core.double(state) == observation['double/redouble']
+            assert auction_core.is_over(state) == done
+            assert [auction_core.player_call(state, player) for player in range(0, 4)] == \
+                [auction_core.NO_CALL if call is None else call for call in legacy.player_contracts]
+
+            if auction_core.contract(state) > 0:
+                assert auction_core.declarer(state) == legacy.declarer
+
+            if not done:
+                assert np.array_equal(auction_core.action_mask(state), legacy.action_mask)
+                assert [auction_core.is_legal(state, a) for a in range(-1, 39)] == \
+                    [False] + legacy.action_mask.tolist() + [False]
+
+
+def test_auction_env_matches_legacy_rules(tmp_path):
+    """Obserwacje, nagrody, zapisy, koniec licytacji i maski działań AuctionEnv"""
+
+    rng = np.random.default_rng(1)
+    path = str(tmp_path / 'deals.pool')
+    deals = _write_pool(path, 50, rng)
+    env = AuctionEnv(deal_pool=path)
+    env.seed(1)
+
+    for _ in range(0, max(1, N_AUCTIONS // 10)):
+        observation = env.reset()
+        tricks, pars = deals[pack_hands(np.array(observation['Players hands'])[None])[0].tobytes()]
+        legacy = _LegacyAuction(observation['whose next turn'])
+        score_table = deal_score_table(tricks)
+        par = int(pars[observation['whose next turn']])
+        p_pass = rng.choice([0.2, 0.5, 0.8])
+        reward = None
+        done = False
+
+        while not done:
+            action = _random_action(rng, legacy.action_mask, p_pass)
+            expected, expected_done = legacy.step(action)
+            reward = legacy.reward(action, reward, score_table, par)
+            observation, rewards, done, info = env.step(action)
+
+            assert observation == expected
+            assert list(rewards) == [reward, -reward]
+            assert done == expected_done
+            assert list(info['pair score']) == [reward + par, -reward - par]
+
+            if not done:
+                assert np.array_equal(info['action mask'], legacy.action_mask)
+
+
+def test_vec_env_matches_legacy_rules(tmp_path):
+    """Obserwacje, nagrody, koniec licytacji i maski działań BridgeAuctionVecEnv (z automatycznym resetem)"""
+
+    rng = np.random.default_rng(2)
+    path = str(tmp_path / 'deals.pool')
+    deals = _write_pool(path, 50, rng)
+    n_tables = 64
+    env = BridgeAuctionVecEnv(n_tables, path, seed=2)
+    observation = env.reset()
+    tables = [None for _ in range(0, n_tables)]
+
+    def start(row):
+        """Nowa licytacja wzorcowa dla stołu row - rozdanie rozpoznawane po rękach graczy"""
+
+        tricks, pars = deals[pack_hands(observation['Players hands'][row:row + 1])[0].tobytes()]
+        dealer = int(observation['whose next turn'][row])
+        tables[row] = [_LegacyAuction(dealer), deal_score_table(tricks), int(pars[dealer]), 0]
+
+    for row in range(0, n_tables):
+        start(row)
+
+    for _ in range(0, max(1, N_AUCTIONS // 20)):
+        p_pass = rng.choice([0.2, 0.5, 0.8])
+        actions = np.array([_random_action(rng, table[0].action_mask, p_pass) for table in tables])
+        observation, rewards, done, info = env.step(actions)
+
+        for row, (legacy, score_table, par, reward) in enumerate(tables):
+            expected, expected_done = legacy.step(int(actions[row]))
+            reward = legacy.reward(int(actions[row]), reward, score_table, par)
+            tables[row][3] = reward
+
+            assert list(rewards[row]) == [reward, -reward]
+            assert done[row] == expected_done
+
+            if expected_done:
+                start(row)
+                continue
+
+            for key, value in expected.items():
+                assert observation[key][row] == (-1 if value is None else value), key
+
+            assert np.array_equal(info['action mask'][row], legacy.action_mask)
@@ -0,0 +1,31 @@
+import numpy as np
+from gym_bridge_auction.envs.game import random_deals
+from gym_bridge_auction.envs.deal_pool import write_deal_pool
+from gym_bridge_auction.envs.profiling import PHASES
+from gym_bridge_auction.envs.bridge_auction_env import AuctionEnv
+
+
+def test_phase_calls_per_reset_and_step(tmp_path):
+    """Każdy etap liczony jest raz na wywołanie reset() lub step() - bez podwójnego liczenia etapów"""
+
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'deals.pool')
+    write_deal_pool(path, random_deals(10, rng), rng.integers(0, 14, size=(10, 20), dtype=np.uint8),
+                    rng.integers(-2000, 2000, size=(10, 16), dtype=np.int16))
+    env = AuctionEnv(deal_pool=path, profile=True)
+    env.seed(0)
+    env.reset()
+
+    for action in (35, 0, 0, 0):
+        env.step(action)
+
+    calls = {phase: counters['calls'] for phase, counters in env.stats().items()}
+
+    assert set(calls) == set(PHASES)
+    assert calls['reset'] == 1 and calls['step'] == 4 and calls['deal'] == 1
+    assert calls['state'] == 5 and calls['actions'] == 4  # reset() przywraca początkową przestrzeń akcji
+    assert calls['reward'] == 4 and calls['termination'] == 4
+
+    env.reset_stats()
+
+    assert all(counters['calls'] == 0 for counters in env.stats().values())
@@ -0,0 +1,139 @@
+import numpy as np
+from gym_bridge_auction.envs.game import BIND_SUIT, WIN_PAIR, create_available_contracts
+from gym_bridge_auction.envs.solver_results import CONTRACT_POINTS, PENALTY_POINTS, BONUS, \
+    get_solver_result_for_player, max_contract_for_suit
+from gym_bridge_auction.envs.scoring import SCORE_TABLE, N_LEVELS, N_DOUBLE_STATES, N_TRICKS, N_CONTRACTS, \
+    deal_score_table, deal_scores
+
+# Porównanie tablic zapisów (scoring) z zapisem wyznaczanym przez rozgałęzienia dawnej metody AuctionEnv._get_reward
+# (kopia wzorcowa poniżej) dla wszystkich wysokości, mian, stanów kontry/rekontry i liczb lew.
+
+
+def _legacy_score(bind_number, bind_trump, double, max_contract, max_number_of_tricks):
+    """Zapis pary rozgrywającej według dawnej metody AuctionEnv._get_reward,
+    gdzie:
+    bind_number, bind_trump - wysokość i miano kontraktu
+    double - 0 (bez kontry), 1 (kontra) lub 2 (rekontra)
+    max_contract - maksymalny realizowalny kontrakt rozgrywającego w danym mianie (max_contract_for_suit)
+    max_number_of_tricks - maksymalna liczba lew rozgrywającego w danym mianie"""
+
+    number_of_tricks = bind_number + 6
+    trick_difference = number_of_tricks - max_number_of_tricks
+
+    if bind_number <= max_contract:
+        # kontrakt jest realizowalny
+        # punkty za lewy
+        if bind_trump == 'NT':
+            score = CONTRACT_POINTS['NT'][0] + (bind_number - 1) * CONTRACT_POINTS['NT'][1]
+
+        else:
+            score = bind_number * CONTRACT_POINTS[bind_trump]
+
+        # punkty za kontrę lub rekontrę plus premie
+        if double == 1:
+            score *= CONTRACT_POINTS['X']
+            score += BONUS['DOUBLE']
+
+        elif double == 2:
+            score *= CONTRACT_POINTS['XX']
+            score += BONUS['REDOUBLE']
+
+        # premie za częściówki, dograne
+        if score < 100:
+            score += BONUS['PARTIAL-GAME']
+
+        else:
+            score += BONUS['GAME']
+
+        # premie szlemiki, szlemy
+        if bind_number == 6:
+            score += BONUS['SLAM']
+
+        elif bind_number == 7:
+            score += BONUS['GRAND_SLAM']
+
+        # premie za nadróbki
+        if bind_number != max_contract:
+            if double == 0:
+                if bind_trump == 'NT':
+                    score += CONTRACT_POINTS['NT'][1] * (max_contract - bind_number)
+
+                else:
+                    score += CONTRACT_POINTS[bind_trump] * (max_contract - bind_number)
+
+            elif double == 1:
+                score += BONUS['OVERTRICKS_DOUBLE'] * (max_contract - bind_number)
+
+            elif double == 2:
+                score += BONUS['OVERTRICKS_REDOUBLE'] * (max_contract - bind_number)
+
+        return score
+
+    # kontrakt nie jest realizowalny - zapis przeciwników
+    if double == 0:
+        penalty = PENALTY_POINTS['NO DOUBLE/REDOUBLE'] * trick_difference
+
+    elif double == 1:
+        penalty = PENALTY_POINTS['DOUBLE'][0] + PENALTY_POINTS['DOUBLE'][0] * PENALTY_POINTS['DOUBLE'][1] * \
+                  (trick_difference - 1)
+
+        # premia za czwartą i każdą następną lewę wpadkową
+        if trick_difference >= 4:
+            penalty += PENALTY_POINTS['DOUBLE'][0] * (trick_difference - 3)
+
+    else:
+        penalty = PENALTY_POINTS['REDOUBLE'][0] + PENALTY_POINTS['REDOUBLE'][0] * PENALTY_POINTS['REDOUBLE'][1] * \
+                  (trick_difference - 1)
+
+        # premia za czwartą i każdą następną lewę wpadkową
+        if trick_difference >= 4:
+            penalty += PENALTY_POINTS['REDOUBLE'][0] * (trick_difference - 3)
+
+    return - penalty
+
+
+def test_score_table_matches_legacy_formula():
+    """SCORE_TABLE dla każdej wysokości, miana, stanu kontry/rekontry i liczby lew"""
+
+    for level in range(1, N_LEVELS):
+        for strain, suit in enumerate(BIND_SUIT):
+            for double in range(0, N_DOUBLE_STATES):
+                for tricks in range(0, N_TRICKS):
+                    expected = _legacy_score(level, suit, double, max(tricks - 6, 0), tricks)
+
+                    assert SCORE_TABLE[level, strain, double, tricks] == expected, (level, suit, double, tricks)
+
+
+def test_deal_score_table_matches_legacy_reward():
+    """deal_score_table i deal_scores dla losowych wyników solvera - zapis pary N-S wyznaczony z liczb lew gracza
+    rozgrywającego (get_solver_result_for_player, max_contract_for_suit) jak w dawnej metodzie _get_reward"""
+
+    rng = np.random.default_rng(0)
+    contracts = create_available_contracts()
+    number_of_tricks = rng.integers(0, N_TRICKS, size=(50, 20))
+    tables = deal_score_table(number_of_tricks)
+
+    assert tables.shape == (50, N_CONTRACTS, 4, N_DOUBLE_STATES)
+    assert (tables[:, 0] == 0).all()
+
+    for deal, tricks in enumerate(number_of_tricks.tolist()):
+        for declarer in range(0, 4):
+            player_tricks = get_solver_result_for_player(declarer, tricks)
+            max_contracts = max_contract_for_suit(player_tricks)
+
+            for contract in contracts[1:N_CONTRACTS]:
+                for double in range(0, N_DOUBLE_STATES):
+                    score = _legacy_score(contract.number, contract.suit, double, max_contracts[contract.suit],
+                                          player_tricks[contract.suit])
+                    expected = score if declarer in WIN_PAIR[0] else -score
+
+                    assert tables[deal, contract.value, declarer, double] == expected, \
+                        (deal, str(contract), declarer, double)
+
+    # odczyt wsadowy bez tworzenia tablic dla rozdań
+    contract_ids = rng.integers(0, N_CONTRACTS, size=len(number_of_tricks))
+    declarers = rng.integers(0, 4, size=len(number_of_tricks))
+    doubles = rng.integers(0, N_DOUBLE_STATES, size=len(number_of_tricks))
+    expected = tables[np.arange(len(number_of_tricks)), contract_ids, declarers, doubles]
+
+    assert np.array_equal(deal_scores(number_of_tricks, contract_ids, declarers, doubles), expected)
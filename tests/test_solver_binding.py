@@ -0,0 +1,43 @@
+import pytest
+from gym_bridge_auction.envs import solver_binding, deal_dataset
+from gym_bridge_auction.envs.subproc_vec_env import SubprocAuctionVecEnv
+
+# Ustawienia solvera z wrapperem bez interfejsu C (ścieżka cppyy) - biblioteki solvera nie są ładowane, a tryb cppyy
+# oznacza ustawiony moduł _cppyy.
+
+
+@pytest.fixture
+def cppyy_fallback(monkeypatch):
+    """Wrapper bez interfejsu C - load_library nie ładuje bibliotek, a _cppyy jest ustawiony"""
+
+    monkeypatch.setattr(solver_binding, 'load_library', lambda: None)
+    monkeypatch.setattr(solver_binding, '_cppyy', object())
+
+
+def test_configure_preset_is_skipped_without_c_interface(cppyy_fallback):
+    """configure_preset zgłasza ostrzeżenie zamiast błędu, a jawna konfiguracja (configure) zgłasza błąd"""
+
+    for name in solver_binding.SOLVER_PRESETS:
+        with pytest.warns(RuntimeWarning):
+            assert solver_binding.configure_preset(name) is None
+
+    with pytest.raises(KeyError):
+        solver_binding.configure_preset('unknown')
+
+    with pytest.raises(RuntimeError):
+        solver_binding.configure(threads=1)
+
+    with pytest.warns(RuntimeWarning):
+        deal_dataset._init_worker('worker')
+
+
+def test_subproc_workers_start_without_c_interface(cppyy_fallback):
+    """Procesy robocze SubprocAuctionVecEnv z domyślnym solver_preset (bez puli rozdań i usługi solvera) działają
+    mimo braku interfejsu C - procesy tworzone przez fork dziedziczą tryb cppyy"""
+
+    env = SubprocAuctionVecEnv(2, num_workers=2)
+
+    try:
+        assert env.stats() == [None, None]
+    finally:
+        env.close()
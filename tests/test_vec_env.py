@@ -0,0 +1,44 @@
+import numpy as np
+from gym_bridge_auction.envs.game import random_deals
+from gym_bridge_auction.envs.deal_pool import write_deal_pool
+from gym_bridge_auction.envs.bridge_auction_vec_env import BridgeAuctionVecEnv
+
+# Bufory BridgeAuctionVecEnv - tablice zwrócone przez step() i reset() poza 'Players hands', 'Hand features'
+# i info['action mask'] nie są zmieniane przez kolejne wywołania, a tablica działań wywołującego nie jest zmieniana.
+BUFFERS = ('Players hands', 'Hand features')
+
+
+def test_returned_arrays_are_not_overwritten(tmp_path):
+    """Obserwacje, nagrody, done i info z kroku z automatycznym resetem po kolejnym kroku i reset()"""
+
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'deals.pool')
+    write_deal_pool(path, random_deals(20, rng), rng.integers(0, 14, size=(20, 20), dtype=np.uint8),
+                    rng.integers(-2000, 2000, size=(20, 16), dtype=np.int16))
+    env = BridgeAuctionVecEnv(8, path, seed=0, hand_features=True)
+    env.reset()
+
+    # trzy pasy i 7NT z kontrą i rekontrą - część stołów kończy licytację i jest automatycznie resetowana
+    for actions in ([0] * 8, [0] * 8, [0] * 8, [1] * 8, [36] * 8):
+        env.step(np.array(actions))
+
+    actions = np.full(8, 37, dtype=np.int32)
+    results = env.step(actions)
+    copies = [{key: np.copy(value) for key, value in item.items()} if isinstance(item, dict) else np.copy(item)
+              for item in results]
+
+    assert results[2].all()
+    assert (actions == 37).all()
+    assert results[3]['action mask'] is env.action_masks
+
+    env.step(np.zeros(8, dtype=np.int32))
+    env.reset()
+
+    for item, copy in zip(results, copies):
+        if isinstance(item, dict):
+            for key in item:
+                if key not in BUFFERS and key != 'action mask':
+                    assert np.array_equal(item[key], copy[key]), key
+
+        else:
+            assert np.array_equal(item, copy)